@@ -0,0 +1,59 @@
+"""Benchmark Docker Hub tag fetching against a local stand-in.
+
+Usage: python benchmarks/bench_docker.py [--tags N] [--latency SECONDS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import requests
+from semver.version import Version
+
+from standins import FakeDockerHub, docker_tags, serve
+from zero_cache_chart import docker
+
+
+def fetch_sequential(docker_image: str) -> list[Version]:
+    """The original implementation: follow `next` links one page at a time."""
+    url: str | None = f"{docker.DOCKER_HUB_API}/repositories/{docker_image}/tags/?page_size=100"
+    versions: list[Version] = []
+    while url:
+        resp = requests.get(url, timeout=30)
+        resp.raise_for_status()
+        data = resp.json()
+        for tag in data.get("results", []):
+            name = tag.get("name", "")
+            if Version.is_valid(name):
+                versions.append(Version.parse(name))
+        url = data.get("next")
+    versions.sort()
+    return versions
+
+
+def _time(fn, *args) -> tuple[float, list[Version]]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tags", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with serve(FakeDockerHub(docker_tags(args.tags), latency=args.latency)) as hub:
+        docker.DOCKER_HUB_API = hub.api_url
+        seq_time, seq = _time(fetch_sequential, "rocicorp/zero")
+        par_time, par = _time(docker.fetch_docker_versions, "rocicorp/zero")
+
+    assert seq == par, "concurrent fetch returned different versions"
+    print(f"tags={args.tags} latency={args.latency * 1000:.0f}ms versions={len(par)}")
+    print(f"sequential: {seq_time:.3f}s")
+    print(f"concurrent: {par_time:.3f}s ({seq_time / par_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""End-to-end benchmarks against local stand-ins for Docker Hub, GHCR and an OCI registry.
+
+Times the hot paths of `update` and `prune` at realistic scale and records the
+results as JSON, so changes can be compared run over run.
+
+Usage: python benchmarks/bench_suite.py [--tags N] [--package-versions N]
+                                        [--latency SECONDS] [--output PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import ExitStack, chdir
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from click.testing import CliRunner
+
+from standins import FakeDockerHub, FakeGitHubPackages, FakeRegistry, docker_tags, serve
+from zero_cache_chart import cli, docker, github, timing
+from zero_cache_chart.registry import client_for
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CHART_FILES = [".helmignore", "Chart.yaml", "values.yaml", "chart.nix", "templates"]
+IMAGE = "rocicorp/zero"
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """Run `fn` `repeat` times; report min/median wall time and the span summary of the last run."""
+    durations: list[float] = []
+    for _ in range(repeat):
+        timing.reset()
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return {
+        "runs": repeat,
+        "min_seconds": durations[0],
+        "median_seconds": durations[len(durations) // 2],
+        "spans": timing.recorder.summary(),
+    }
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _chart_checkout(workdir: Path) -> Path:
+    """A git checkout of the chart, one upstream release behind, with a bare origin to push to."""
+    origin = workdir / "origin.git"
+    checkout = workdir / "checkout"
+    _git(workdir, "init", "-q", "--bare", "-b", "main", str(origin))
+    _git(workdir, "init", "-q", "-b", "main", str(checkout))
+    for name in CHART_FILES:
+        src = REPO_ROOT / name
+        if src.is_dir():
+            shutil.copytree(src, checkout / name)
+        else:
+            shutil.copy2(src, checkout / name)
+    chart = checkout / "Chart.yaml"
+    chart.write_text(re.sub(r"(?m)^appVersion: .*$", "appVersion: 0.0.0", chart.read_text()))
+    _git(checkout, "config", "user.name", "bench")
+    _git(checkout, "config", "user.email", "bench@example.com")
+    _git(checkout, "add", ".")
+    _git(checkout, "commit", "-q", "-m", "init")
+    _git(checkout, "remote", "add", "origin", str(origin))
+    _git(checkout, "push", "-q", "origin", "main")
+    return checkout
+
+
+def bench_update(registry: FakeRegistry, repeat: int) -> dict[str, Any]:
+    """Full `update` run: newest-tag probe, tag sync, package, push, chart.nix, commit and push."""
+    runner = CliRunner()
+    durations: list[float] = []
+    summary: dict[str, Any] = {}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp, chdir(_chart_checkout(Path(tmp))):
+            os.environ["ZERO_CACHE_CHART_CACHE_DIR"] = str(Path(tmp) / "cache")
+            timing.reset()
+            start = time.perf_counter()
+            result = runner.invoke(cli.main, [
+                "update",
+                "--docker-image", IMAGE,
+                "--oci-registry", registry.host,
+                "--oci-repo", "bench/zero-cache",
+                "--force",
+            ])
+            durations.append(time.perf_counter() - start)
+            if result.exit_code != 0:
+                raise RuntimeError(f"update failed:\n{result.output}") from result.exception
+            summary = timing.recorder.summary()
+    durations.sort()
+    return {
+        "runs": repeat,
+        "min_seconds": durations[0],
+        "median_seconds": durations[len(durations) // 2],
+        "spans": summary,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tags", type=int, default=10_000, help="Docker Hub tags to serve")
+    parser.add_argument("--package-versions", type=int, default=50_000, help="GHCR package versions to serve")
+    parser.add_argument("--latency", type=float, default=0.01, help="Injected per-request latency (seconds)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GITHUB_TOKEN", "bench")
+    results: dict[str, Any] = {}
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as cache:
+        os.environ["ZERO_CACHE_CHART_CACHE_DIR"] = cache
+        hub = stack.enter_context(serve(FakeDockerHub(docker_tags(args.tags), latency=args.latency)))
+        packages = stack.enter_context(serve(FakeGitHubPackages(args.package_versions, latency=args.latency)))
+        registry = stack.enter_context(serve(FakeRegistry(latency=args.latency)))
+        docker.DOCKER_HUB_API = hub.api_url
+        github.GITHUB_API = packages.api_url
+        client_for.cache_clear()
+
+        results["fetch_docker_versions"] = _measure(
+            lambda: docker.fetch_docker_versions(IMAGE), args.repeat
+        )
+        results["list_package_versions"] = _measure(
+            lambda: github.list_package_versions("bench", "zero-cache"), args.repeat
+        )
+        results["prune_untagged.dry_run"] = _measure(
+            lambda: github.prune_untagged("bench", "zero-cache", prune_all=True, dry_run=True), args.repeat
+        )
+        results["prune_untagged"] = _measure(
+            lambda: github.prune_untagged("bench", "zero-cache", prune_all=True), 1
+        )
+        results["update"] = bench_update(registry, args.repeat)
+
+    report = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": {
+            "tags": args.tags,
+            "package_versions": args.package_versions,
+            "latency_seconds": args.latency,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    for name, entry in results.items():
+        print(f"{name:<28} min {entry['min_seconds']:8.3f}s  median {entry['median_seconds']:8.3f}s")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Local HTTP stand-ins for the upstream services the CLI talks to.
+
+Each stand-in runs a threaded HTTP server on 127.0.0.1 with optional
+per-request latency, so benchmarks can measure how the tool behaves at
+realistic scale without touching the network.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _StandinServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs stall every response on a reused keep-alive connection.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _begin(self) -> tuple[str, dict[str, str]]:
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests_served += 1
+        parts = urlsplit(self.path)
+        return parts.path, {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", "0"))
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, body: Any, headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(body).encode()
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        if status == 200 and self.command == "GET":
+            # Like Docker Hub and GitHub: a weak ETag, and 304 for a matching If-None-Match
+            etag = f'W/"{hashlib.sha256(data).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", {"ETag": etag})
+                return
+            headers["ETag"] = etag
+        self._send(status, data, headers)
+
+
+class _StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, handler: type[_Handler], latency: float):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.requests_served = 0
+        self.lock = threading.Lock()
+
+    @property
+    def host(self) -> str:
+        host, port = self.server_address[:2]
+        return f"{host}:{port}"
+
+    def base_url(self) -> str:
+        return f"http://{self.host}"
+
+
+@contextmanager
+def serve(server: _StandinServer) -> Iterator[_StandinServer]:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --- Docker Hub ---------------------------------------------------------------
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class _DockerHubHandler(_Handler):
+    server: FakeDockerHub
+
+    def do_GET(self) -> None:
+        path, query = self._begin()
+        page = int(query.get("page", "1"))
+        page_size = int(query.get("page_size", "10"))
+        tags = self.server.tags
+        if query.get("ordering") == "last_updated":
+            tags = tags[::-1]
+        start = (page - 1) * page_size
+        results = [
+            {
+                "name": name,
+                "digest": f"sha256:{hashlib.sha256(name.encode()).hexdigest()}",
+                "last_updated": self.server.last_updated(name),
+            }
+            for name in tags[start:start + page_size]
+        ]
+        next_url = None
+        if start + page_size < len(tags):
+            next_query = f"page={page + 1}&page_size={page_size}"
+            if "ordering" in query:
+                next_query += f"&ordering={query['ordering']}"
+            next_url = f"{self.server.base_url()}{path}?{next_query}"
+        self._send_json(200, {"count": len(tags), "next": next_url, "results": results})
+
+
+class FakeDockerHub(_StandinServer):
+    """Serves `/v2/repositories/<image>/tags/` with Docker Hub's paging scheme.
+
+    Tags are listed oldest-first; each one was "pushed" a minute after the last.
+    """
+
+    def __init__(self, tags: list[str], *, latency: float = 0.0):
+        super().__init__(_DockerHubHandler, latency)
+        self.tags = tags
+        self._index = {name: i for i, name in enumerate(tags)}
+
+    def last_updated(self, name: str) -> str:
+        stamp = _EPOCH + timedelta(minutes=self._index[name])
+        return stamp.isoformat().replace("+00:00", "Z")
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.base_url()}/v2"
+
+
+def docker_tags(count: int) -> list[str]:
+    """Generate a tag history shaped like rocicorp/zero: mostly canaries."""
+    tags: list[str] = []
+    minor = 0
+    while len(tags) < count:
+        for patch in range(3):
+            tags.extend(f"0.{minor}.{patch}-canary.{n}" for n in range(20))
+            tags.append(f"0.{minor}.{patch}")
+        tags.append(f"0.{minor}")
+        minor += 1
+    return tags[:count]
+
+
+# --- GitHub Packages API --------------------------------------------------------
+
+_VERSIONS_PATH = re.compile(r"/orgs/[^/]+/packages/container/[^/]+/versions(?:/(\d+))?$")
+
+
+class _GitHubHandler(_Handler):
+    server: FakeGitHubPackages
+
+    def do_GET(self) -> None:
+        path, query = self._begin()
+        if not _VERSIONS_PATH.match(path):
+            return self._send(404)
+        page = int(query.get("page", "1"))
+        per_page = int(query.get("per_page", "30"))
+        listing = self.server.listing()
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(listing):
+            headers["Link"] = f'<{self.server.base_url()}{path}?per_page={per_page}&page={page + 1}>; rel="next"'
+        self._send_json(200, listing[start:start + per_page], headers)
+
+    def do_DELETE(self) -> None:
+        path, _ = self._begin()
+        match = _VERSIONS_PATH.match(path)
+        if not match or not match.group(1):
+            return self._send(404)
+        self._send(204 if self.server.delete(int(match.group(1))) else 404)
+
+
+class FakeGitHubPackages(_StandinServer):
+    """Serves the container package versions list/delete endpoints, newest first.
+
+    Deletions shift later pages forward, as they do on GitHub.
+    """
+
+    def __init__(self, count: int, *, untagged_every: int = 10, latency: float = 0.0):
+        super().__init__(_GitHubHandler, latency)
+        now = datetime.now(timezone.utc)
+        self.versions: dict[int, dict[str, Any]] = {}
+        for i in range(count):
+            version_id = count - i
+            tags = [] if i % untagged_every == 0 else [f"1.0.{version_id}"]
+            created = (now - timedelta(hours=i)).isoformat().replace("+00:00", "Z")
+            self.versions[version_id] = {
+                "id": version_id,
+                "name": f"sha256:{hashlib.sha256(str(version_id).encode()).hexdigest()}",
+                "created_at": created,
+                "metadata": {"container": {"tags": tags}},
+            }
+        self._listing: list[dict[str, Any]] | None = None
+
+    def listing(self) -> list[dict[str, Any]]:
+        with self.lock:
+            if self._listing is None:
+                self._listing = list(self.versions.values())
+            return self._listing
+
+    def delete(self, version_id: int) -> bool:
+        with self.lock:
+            self._listing = None
+            return self.versions.pop(version_id, None) is not None
+
+    @property
+    def api_url(self) -> str:
+        return self.base_url()
+
+
+# --- OCI registry ---------------------------------------------------------------
+
+_MANIFEST_PATH = re.compile(r"/v2/(.+)/manifests/([^/]+)$")
+_BLOB_PATH = re.compile(r"/v2/(.+)/blobs/(sha256:[0-9a-f]+)$")
+_UPLOAD_PATH = re.compile(r"/v2/(.+)/blobs/uploads/(.*)$")
+_TAGS_PATH = re.compile(r"/v2/(.+)/tags/list$")
+
+
+class _RegistryHandler(_Handler):
+    server: FakeRegistry
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        path, query = self._begin()
+        if path == "/v2/":
+            return self._send(200)
+        if match := _TAGS_PATH.match(path):
+            return self._list_tags(match.group(1), int(query.get("n", "100")), query.get("last"))
+        if match := _MANIFEST_PATH.match(path):
+            body = self.server.manifests.get((match.group(1), match.group(2)))
+            if body is None:
+                return self._send(404)
+            digest = f"sha256:{hashlib.sha256(body).hexdigest()}"
+            return self._send(200, body, {
+                "Content-Type": "application/vnd.oci.image.manifest.v1+json",
+                "Docker-Content-Digest": digest,
+            })
+        if match := _BLOB_PATH.match(path):
+            body = self.server.blobs.get(match.group(2))
+            return self._send(404) if body is None else self._send(200, body)
+        self._send(404)
+
+    def _list_tags(self, repo: str, n: int, last: str | None) -> None:
+        with self.server.lock:
+            tags = sorted(ref for r, ref in self.server.manifests if r == repo and not ref.startswith("sha256:"))
+        if not tags:
+            return self._send_json(404, {"errors": [{"code": "NAME_UNKNOWN"}]})
+        remaining = [t for t in tags if last is None or t > last]
+        page = remaining[:n]
+        headers = {}
+        if len(remaining) > n:
+            headers["Link"] = f'</v2/{repo}/tags/list?n={n}&last={page[-1]}>; rel="next"'
+        self._send_json(200, {"name": repo, "tags": page}, headers)
+
+    def do_POST(self) -> None:
+        path, _ = self._begin()
+        self._body()
+        if match := _UPLOAD_PATH.match(path):
+            return self._send(202, headers={"Location": f"/v2/{match.group(1)}/blobs/uploads/upload-1"})
+        self._send(404)
+
+    def do_PUT(self) -> None:
+        path, query = self._begin()
+        body = self._body()
+        if match := _MANIFEST_PATH.match(path):
+            digest = f"sha256:{hashlib.sha256(body).hexdigest()}"
+            with self.server.lock:
+                self.server.manifests[(match.group(1), match.group(2))] = body
+                self.server.manifests[(match.group(1), digest)] = body
+            return self._send(201, headers={"Docker-Content-Digest": digest})
+        if _UPLOAD_PATH.match(path):
+            with self.server.lock:
+                self.server.blobs[query["digest"]] = body
+            return self._send(201)
+        self._send(404)
+
+
+class FakeRegistry(_StandinServer):
+    """Unauthenticated OCI distribution registry holding everything in memory."""
+
+    def __init__(self, *, latency: float = 0.0):
+        super().__init__(_RegistryHandler, latency)
+        self.manifests: dict[tuple[str, str], bytes] = {}
+        self.blobs: dict[str, bytes] = {}
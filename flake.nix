@@ -24,7 +24,7 @@
             base = builtins.baseNameOf path;
             relPath = builtins.substring (builtins.stringLength (toString ./.) + 1) (-1) (toString path);
           in
-            builtins.elem base ["Chart.yaml" "values.yaml" "Chart.lock" ".helmignore"]
+            builtins.elem base ["Chart.yaml" "values.yaml" "values.schema.json" "Chart.lock" ".helmignore"]
             || nixpkgs.lib.hasPrefix "templates" relPath;
         };
       in
@@ -58,7 +58,7 @@
             ]);
 
           makeWrapperArgs = [
-            "--prefix PATH : ${pkgs.lib.makeBinPath [pkgs.kubernetes-helm pkgs.oras]}"
+            "--prefix PATH : ${pkgs.lib.makeBinPath [pkgs.kubernetes-helm]}"
           ];
         };
       in {
@@ -0,0 +1,193 @@
+"""Cross-check what was released against what was published.
+
+Four sources describe each chart release: the `v<version>` git tag, the OCI
+tag in the registry, chart.nix (version and NAR hash) and Chart.yaml (chart
+version and appVersion). `audit_releases` downloads every chart it needs to
+look at once, over a thread pool (tarballs come from the chart cache and NAR
+hashes from the hash cache when available), then compares the sources and
+returns a `Finding` for each disagreement.
+"""
+
+from __future__ import annotations
+
+import io
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import requests
+import yaml
+
+from zero_cache_chart.chart import parse_chart_nix, sri_hash_bytes
+from zero_cache_chart.git import Git
+from zero_cache_chart.oci import fetch_chart, published_versions
+from zero_cache_chart.registry import RegistryError
+from zero_cache_chart.retention import git_tag_versions
+from zero_cache_chart.timing import span
+from zero_cache_chart.transport import transport
+from zero_cache_chart.types import DEFAULT_CONCURRENCY
+
+
+@dataclass(frozen=True)
+class Finding:
+    subject: str
+    message: str
+
+
+@dataclass(frozen=True)
+class PublishedChart:
+    """What the registry serves for one chart version."""
+
+    version: str
+    app_version: str | None
+    sri_hash: str
+
+
+@dataclass
+class AuditReport:
+    git_tags: int
+    published: int
+    findings: list[Finding]
+
+    @property
+    def ok(self) -> bool:
+        return not self.findings
+
+
+def _packaged_chart_yaml(data: bytes) -> dict[str, Any]:
+    """Chart.yaml of a packaged chart (`<name>/Chart.yaml` inside the tarball)."""
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tar:
+        for member in tar:
+            if member.isfile() and member.name.count("/") == 1 and member.name.endswith("/Chart.yaml"):
+                return yaml.safe_load(tar.extractfile(member).read()) or {}  # type: ignore[union-attr]
+    return {}
+
+
+def _inspect(registry: str, repo: str, version: str) -> PublishedChart | Finding:
+    with span("audit.inspect", version=version):
+        try:
+            data = fetch_chart(registry, repo, version)
+        except (RuntimeError, RegistryError, requests.RequestException) as e:
+            return Finding(version, f"cannot fetch published chart: {e}")
+        metadata = _packaged_chart_yaml(data)
+        if str(metadata.get("version")) != version:
+            return Finding(version, f"published chart reports version {metadata.get('version')}")
+        app_version = metadata.get("appVersion")
+        return PublishedChart(version, str(app_version) if app_version is not None else None, sri_hash_bytes(data))
+
+
+def _compare(
+    subject: str,
+    version: str,
+    chart_yaml: str | None,
+    chart_nix: str | None,
+    published: dict[str, PublishedChart],
+) -> list[Finding]:
+    """Check one tree's Chart.yaml and chart.nix against the registry."""
+    findings: list[Finding] = []
+    chart = published.get(version)
+    if chart_yaml is not None and chart is not None:
+        app_version = (yaml.safe_load(chart_yaml) or {}).get("appVersion")
+        if app_version is not None and str(app_version) != chart.app_version:
+            findings.append(Finding(
+                subject, f"Chart.yaml appVersion {app_version} but {version} was published with {chart.app_version}"
+            ))
+    if chart_nix is not None:
+        nix = parse_chart_nix(chart_nix)
+        nix_chart = published.get(nix.get("version", ""))
+        if nix_chart is not None and nix.get("chartHash") != nix_chart.sri_hash:
+            findings.append(Finding(
+                subject, f"chart.nix hash for {nix_chart.version} is {nix.get('chartHash')}, "
+                f"published chart hashes to {nix_chart.sri_hash}"
+            ))
+    return findings
+
+
+def _repo_path(git: Git, path: Path) -> str:
+    """`path` relative to the repository root, the form `git show <ref>:<path>` needs."""
+    root = git.toplevel().resolve()
+    try:
+        return path.resolve().relative_to(root).as_posix()
+    except ValueError:
+        raise ValueError(f"{path} is not inside the git repository at {root}") from None
+
+
+def audit_releases(
+    registry: str,
+    repo: str,
+    chart_path: Path,
+    *,
+    git: Git | None = None,
+    jobs: int = DEFAULT_CONCURRENCY,
+) -> AuditReport:
+    """Compare git release tags, OCI tags, chart.nix and Chart.yaml.
+
+    Reports git tags without an OCI artifact and published versions without
+    a git tag; for every tagged release, that the tag's Chart.yaml appVersion
+    and chart.nix hash match the published chart; and the same for the
+    working tree, plus that its chart version and chart.nix version are
+    published at all. A tag whose tree has no Chart.yaml at `chart_path` is
+    reported too. Raises ValueError if `chart_path` is outside the repository.
+    """
+    git = git or Git()
+    nix_path = chart_path.parent / "chart.nix"
+    chart_in_repo, nix_in_repo = _repo_path(git, chart_path), _repo_path(git, nix_path)
+    tagged = sorted(git_tag_versions(git.list_tags("v*")))
+    tagged_versions = [str(v) for v in tagged]
+    oci_tags = published_versions(registry, repo)
+    oci_versions = git_tag_versions(oci_tags)
+
+    head_yaml = chart_path.read_text()
+    head_version = str((yaml.safe_load(head_yaml) or {}).get("version", ""))
+    head_nix = nix_path.read_text() if nix_path.exists() else None
+    head_nix_version = parse_chart_nix(head_nix).get("version") if head_nix else None
+
+    findings: list[Finding] = []
+    for version in tagged_versions:
+        if version not in oci_tags:
+            findings.append(Finding(f"v{version}", "git tag has no OCI artifact"))
+    for version in sorted(oci_versions - set(tagged)):
+        findings.append(Finding(str(version), "published without a git tag"))
+    for label, version in (("Chart.yaml", head_version), ("chart.nix", head_nix_version)):
+        if version and version not in oci_tags:
+            findings.append(Finding(label, f"version {version} is not published"))
+
+    wanted = {v for v in (*tagged_versions, head_version, head_nix_version) if v and v in oci_tags}
+    to_compare = [v for v in tagged_versions if v in oci_tags]
+
+    def inspect(version: str) -> PublishedChart | Finding:
+        return _inspect(registry, repo, version)
+
+    def tag_files(version: str) -> tuple[str | None, str | None]:
+        ref = f"v{version}"
+        return git.show_file(ref, chart_in_repo), git.show_file(ref, nix_in_repo)
+
+    transport().reserve(jobs)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        # map submits eagerly, so registry fetches and git reads share the pool
+        inspecting = pool.map(inspect, sorted(wanted))
+        reading = pool.map(tag_files, to_compare)
+        inspected, trees = list(inspecting), list(reading)
+
+    published: dict[str, PublishedChart] = {}
+    for result in inspected:
+        if isinstance(result, Finding):
+            findings.append(result)
+        else:
+            published[result.version] = result
+
+    # Later trees usually carry the same chart.nix forward; report each problem at the first tree that has it
+    reported: set[str] = set()
+    subjects = [(f"v{v}", v) for v in to_compare] + [("working tree", head_version)]
+    trees.append((head_yaml, head_nix))
+    for (subject, version), (chart_yaml, chart_nix) in zip(subjects, trees):
+        if chart_yaml is None:
+            findings.append(Finding(subject, f"{chart_in_repo} does not exist at the tag"))
+        for finding in _compare(subject, version, chart_yaml, chart_nix, published):
+            if finding.message not in reported:
+                reported.add(finding.message)
+                findings.append(finding)
+
+    return AuditReport(git_tags=len(tagged), published=len(oci_versions), findings=findings)
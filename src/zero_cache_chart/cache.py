@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+
+def cache_dir() -> Path:
+    """Directory for state persisted between runs.
+
+    Honors ZERO_CACHE_CHART_CACHE_DIR, then XDG_CACHE_HOME, then ~/.cache.
+    """
+    override = os.environ.get("ZERO_CACHE_CHART_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "zero-cache-chart"
+
+
+def read_json(path: Path) -> Any | None:
+    """Read a JSON cache file. Returns None if missing or corrupt."""
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """Write a file via a temporary sibling and rename, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Atomically write a JSON cache file."""
+    write_bytes_atomic(path, json.dumps(data, indent=2, sort_keys=True).encode())
+
+
+def evict_lru(root: Path, pattern: str, max_bytes: int, *, max_age: float | None = None) -> None:
+    """Delete files matching `pattern` in `root` until the rest fit in `max_bytes`.
+
+    Caches touch a file whenever they use it, so its mtime is its last use:
+    files unused for `max_age` seconds go first, then the least recently used.
+    """
+    expired = time.time() - max_age if max_age is not None else None
+    entries = []
+    for path in root.glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if expired is not None and stat.st_mtime < expired:
+            path.unlink(missing_ok=True)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+# Enough for a few hundred chart versions.
+DEFAULT_CHART_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class ChartCache:
+    """Content-addressed store of chart tarballs with size-bounded LRU eviction.
+
+    Entries are keyed by chart version and OCI manifest digest, so a re-pushed
+    tag never serves stale bytes.
+    """
+
+    def __init__(self, root: Path | None = None, *, max_bytes: int = DEFAULT_CHART_CACHE_BYTES):
+        self.root = root or cache_dir() / "charts"
+        self.max_bytes = max_bytes
+
+    def _path(self, version: str, manifest_digest: str) -> Path:
+        return self.root / f"{version}@{manifest_digest.replace(':', '-')}.tgz"
+
+    def get(self, version: str, manifest_digest: str) -> bytes | None:
+        path = self._path(version, manifest_digest)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, version: str, manifest_digest: str, data: bytes) -> None:
+        write_bytes_atomic(self._path(version, manifest_digest), data)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        evict_lru(self.root, "*.tgz", self.max_bytes)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 import re
 from pathlib import Path
 
 import yaml
 from semver.version import Version
 
-from zero_cache_chart.types import run
+from zero_cache_chart.cache import cache_dir, write_bytes_atomic
+from zero_cache_chart.nar import nar_hash_tarball
+from zero_cache_chart.timing import span
+
+# Tarball sha256 -> SRI hash, for charts hashed earlier in this process.
+_SRI_CACHE: dict[str, str] = {}
 
 
 def read_chart_version(chart_path: Path) -> Version | None:
@@ -31,9 +37,8 @@ def _is_breaking_upgrade(old: Version, new: Version) -> bool:
     return old.major == 0 and new.minor != old.minor
 
 
-def write_chart_version(chart_path: Path, version: Version) -> str | None:
-    """Update appVersion and bump chart version. Returns new chart version, or None if unchanged."""
-    text = chart_path.read_text()
+def render_chart_version(text: str, version: Version) -> str | None:
+    """Return Chart.yaml text with appVersion set and the chart version bumped, or None if unchanged."""
     data = yaml.safe_load(text)
     current_app_str = str(data.get("appVersion", ""))
     new_app = str(version)
@@ -53,32 +58,54 @@ def write_chart_version(chart_path: Path, version: Version) -> str | None:
     else:
         data["version"] = new_app
 
-    chart_path.write_text(yaml.dump(data, default_flow_style=False, sort_keys=False))
-    return str(data["version"])
+    return yaml.dump(data, default_flow_style=False, sort_keys=False)
+
+
+def write_chart_version(chart_path: Path, version: Version) -> str | None:
+    """Update appVersion and bump chart version. Returns new chart version, or None if unchanged."""
+    text = render_chart_version(chart_path.read_text(), version)
+    if text is None:
+        return None
+    chart_path.write_text(text)
+    return str(yaml.safe_load(text)["version"])
+
+
+def sri_hash_bytes(data: bytes) -> str:
+    """Compute the Nix NAR hash (sha256, SRI) of the chart directory in a tarball.
+
+    Results are cached on disk keyed by the tarball's sha256, so a given
+    chart archive is only ever hashed once.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if digest in _SRI_CACHE:
+        return _SRI_CACHE[digest]
+
+    cached = cache_dir() / "nar" / digest
+    try:
+        result = cached.read_text().strip()
+    except FileNotFoundError:
+        with span("chart.nar_hash") as s:
+            s.bytes = len(data)
+            result = nar_hash_tarball(data)
+        write_bytes_atomic(cached, result.encode())
+
+    _SRI_CACHE[digest] = result
+    return result
 
 
 def sri_hash(tgz_path: Path) -> str:
     """Compute Nix NAR hash (sha256, SRI) of an untarred chart directory."""
-    import tarfile
-    import tempfile
-
-    with tempfile.TemporaryDirectory() as tmp:
-        with tarfile.open(tgz_path) as tar:
-            tar.extractall(tmp)
+    return sri_hash_bytes(tgz_path.read_bytes())
 
-        # helm package creates a single top-level directory inside the tarball
-        entries = list(Path(tmp).iterdir())
-        if len(entries) != 1 or not entries[0].is_dir():
-            raise RuntimeError(f"Expected single chart directory in {tgz_path}, got: {entries}")
 
-        result = run(["nix", "hash", "path", "--type", "sha256", "--sri", str(entries[0])])
-        return result.stdout.strip()
+def parse_chart_nix(text: str) -> dict[str, str]:
+    """The string fields of chart.nix (repo, chart, version, chartHash)."""
+    return dict(re.findall(r'(\w+)\s*=\s*"([^"]*)"', text))
 
 
 def read_chart_nix_version(nix_path: Path) -> str | None:
     """Read the version field from chart.nix."""
-    match = re.search(r'version\s*=\s*"([^"]*)"', nix_path.read_text())
-    return match.group(1) if match else None
+    return parse_chart_nix(nix_path.read_text()).get("version")
 
 
 def write_chart_nix(nix_path: Path, version: str, chart_hash: str) -> None:
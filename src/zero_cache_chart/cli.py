@@ -1,24 +1,22 @@
 from __future__ import annotations
 
-import tempfile
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
-from semver.version import Version
-
-from zero_cache_chart.chart import (
-    read_chart_version,
-    read_chart_oci_version,
-    read_chart_nix_version,
-    write_chart_version,
-    sri_hash,
-    write_chart_nix,
-)
-from zero_cache_chart.docker import fetch_docker_versions
-from zero_cache_chart.git import Git
-from zero_cache_chart.oci import pull_chart, push_if_not_exists, prune_untagged, delete_all_versions
-from zero_cache_chart.types import VersionManagementResult
-from zero_cache_chart.versions import get_latest_stable
+
+from zero_cache_chart import timing
+from zero_cache_chart.types import DEFAULT_CONCURRENCY
+
+if TYPE_CHECKING:
+    from semver.version import Version
+
+    from zero_cache_chart.git import Git
+    from zero_cache_chart.oci import ChartRelease
+    from zero_cache_chart.types import DeletionResult, VersionManagementResult
+
+# Commands import what they use when they run, so `--help` and light commands
+# such as `prune` start without loading requests, yaml, semver or git helpers.
 
 
 def _reconcile_chart_nix(
@@ -26,28 +24,100 @@ def _reconcile_chart_nix(
     oci_registry: str,
     oci_repo: str,
     oci_version: str,
-    package_path: Path | None,
+    release: ChartRelease | None,
+    *,
+    local: ChartRelease | None = None,
+    published_digest: str | None = None,
 ) -> bool:
     """Ensure chart.nix matches the published chart version.
 
-    Hashes the freshly packaged chart when one is available; otherwise, if
-    chart.nix is behind the published version, pulls the chart from the
-    registry to compute the hash. Returns True if chart.nix was rewritten.
+    Hashes `release` when the caller has a local build that is known to
+    match the published chart (just pushed, or digest-checked). Otherwise, if
+    chart.nix is behind the published version, rebuilds the chart locally and
+    hashes that when its digest matches the published layer; only on a
+    mismatch is the published chart fetched (through the local chart cache).
+    Callers that already built `local` pass it with `published_digest` to
+    skip the rebuild and the registry probe. Returns True if chart.nix was
+    rewritten.
     """
+    from zero_cache_chart.chart import read_chart_nix_version, sri_hash_bytes, write_chart_nix
+    from zero_cache_chart.oci import fetch_chart, prepare_release, published_layer_digest
+
     if not nix_path.exists():
         return False
-    if package_path is not None:
-        chart_hash = sri_hash(package_path)
+    if release is not None:
+        chart_hash = release.sri_hash
     else:
         if read_chart_nix_version(nix_path) == oci_version:
             return False
-        with tempfile.TemporaryDirectory() as tmp:
-            pulled = pull_chart(oci_registry, oci_repo, oci_version, Path(tmp))
-            chart_hash = sri_hash(pulled)
+        if local is None:
+            local = prepare_release(nix_path.parent)
+            published_digest = published_layer_digest(oci_registry, oci_repo, oci_version)
+        if local.version == oci_version and published_digest == local.layer_digest:
+            chart_hash = local.sri_hash
+        else:
+            chart_hash = sri_hash_bytes(fetch_chart(oci_registry, oci_repo, oci_version))
     write_chart_nix(nix_path, oci_version, chart_hash)
     return True
 
 
+def _prepare_hashed(chart_dir: Path, chart_yaml: str) -> ChartRelease:
+    from zero_cache_chart.oci import prepare_release
+
+    release = prepare_release(chart_dir, chart_yaml=chart_yaml)
+    release.sri_hash  # computed in the worker, not during publishing
+    return release
+
+
+def _catch_up(
+    chart: Path,
+    targets: list[Version],
+    oci_registry: str,
+    oci_repo: str,
+    git: Git,
+    result: VersionManagementResult,
+) -> None:
+    """Publish one chart version per missing upstream release.
+
+    Chart.yaml revisions are computed up front, then every chart is packaged
+    and hashed in parallel. Releases are published, committed and tagged in
+    semver order, and the branch plus all tags go out in one atomic push.
+    A version that is already published must match the local build, so
+    chart.nix never pins a hash other than the published one; otherwise
+    RuntimeError is raised before anything is pushed to git.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from zero_cache_chart.chart import render_chart_version, write_chart_nix
+    from zero_cache_chart.oci import push_release_if_not_exists
+
+    texts: list[str] = []
+    text = chart.read_text()
+    for version in targets:
+        text = render_chart_version(text, version) or text
+        texts.append(text)
+
+    with ThreadPoolExecutor() as pool:
+        releases = list(pool.map(lambda t: _prepare_hashed(chart.parent, t), texts))
+
+    nix_path = chart.parent / "chart.nix"
+    tags: list[str] = []
+    for version, text, release in zip(targets, texts, releases):
+        if push_release_if_not_exists(oci_registry, oci_repo, release):
+            result.pushed_oci_packages.append(release.version)
+            click.echo(f"Pushed {release.version} (appVersion {version}) to OCI")
+        chart.write_text(text)
+        paths = [str(chart)]
+        if nix_path.exists():
+            write_chart_nix(nix_path, release.version, release.sri_hash)
+            paths.append(str(nix_path))
+        tags += git.stage_release(paths, f"chore(chart): update appVersion to {version}", [f"v{release.version}"])
+
+    git.push_atomic("main", tags)
+    result.main_updated = True
+    result.created_tags.extend(tags)
+
+
 def _split_oci_repo(oci_repo: str) -> tuple[str, str]:
     """Split org/package-path, where package-path may contain slashes."""
     parts = oci_repo.split("/", 1)
@@ -57,8 +127,17 @@ def _split_oci_repo(oci_repo: str) -> tuple[str, str]:
 
 
 @click.group()
-def main() -> None:
+@click.option(
+    "--profile-out",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write a JSON trace of external calls here, plus OpenMetrics to the same path with a .prom suffix",
+)
+@click.pass_context
+def main(ctx: click.Context, profile_out: Path | None) -> None:
     """zero-cache Helm chart version manager."""
+    if profile_out is not None:
+        recorder = timing.reset(keep_spans=True)
+        ctx.call_on_close(lambda: recorder.write(profile_out))
 
 
 @main.command()
@@ -67,92 +146,173 @@ def main() -> None:
 @click.option("--oci-registry", default="ghcr.io", help="OCI registry URL")
 @click.option("--oci-repo", required=True, help="OCI repository path")
 @click.option("--dry-run", is_flag=True, help="Simulate without making changes")
+@click.option(
+    "--incremental/--full-sync",
+    default=True,
+    help="Only fetch Docker tags updated since the last run (cached on disk); --full-sync rebuilds the cache",
+)
+@click.option("--force", is_flag=True, help="Run the full update even if nothing changed since the last run")
+@click.option(
+    "--catch-up",
+    is_flag=True,
+    help="Publish a chart for every missing stable major.minor release, not just the latest",
+)
 def update(
     docker_image: str,
     chart_path: str,
     oci_registry: str,
     oci_repo: str,
     dry_run: bool,
+    incremental: bool,
+    force: bool,
+    catch_up: bool,
 ) -> None:
     """Poll Docker Hub and update chart versions."""
+    import dataclasses
+
+    from zero_cache_chart.cache import cache_dir
+    from zero_cache_chart.chart import read_chart_oci_version, read_chart_version, write_chart_version
+    from zero_cache_chart.docker import fetch_newest_tag, fetch_version_summary
+    from zero_cache_chart.git import Git
+    from zero_cache_chart.oci import (
+        prepare_release,
+        published_layer_digest,
+        published_manifest_digest,
+        push_chart,
+        push_if_not_exists,
+    )
+    from zero_cache_chart.stages import Stage, run_stages
+    from zero_cache_chart.state import RunFingerprint, load_fingerprint, save_fingerprint
+    from zero_cache_chart.types import VersionManagementResult
+
     chart = Path(chart_path)
     git = Git()
     result = VersionManagementResult()
+    state_key = f"{docker_image.replace('/', '_')}.json"
+
+    def manifest_digest() -> str | None:
+        return published_manifest_digest(oci_registry, oci_repo, read_chart_oci_version(chart))
+
+    # 0. Skip everything if neither the chart, upstream nor the published chart changed since the last run
+    state_path = cache_dir() / "run-state" / state_key
+    newest_tag = fetch_newest_tag(docker_image)
+    fingerprint = RunFingerprint.capture(chart, newest_tag)
+    if not force and fingerprint.unchanged_since(load_fingerprint(state_path), manifest_digest):
+        click.echo("Nothing changed since the last run (use --force to run anyway)")
+        return
 
-    # 1. Read current chart version
-    current_version = read_chart_version(chart)
+    def record_run() -> None:
+        after = RunFingerprint.capture(chart, newest_tag)
+        save_fingerprint(state_path, dataclasses.replace(after, oci_manifest_digest=manifest_digest()))
+
+    # 1. Read local chart state, fetch upstream tags and probe the registry concurrently
+    tag_cache = cache_dir() / "docker-tags" / state_key
+    nix_path = chart.parent / "chart.nix"
+    stages = [
+        Stage("current_version", lambda: read_chart_version(chart)),
+        Stage(
+            "versions",
+            lambda: fetch_version_summary(docker_image, tag_cache=tag_cache, refresh_tag_cache=not incremental),
+        ),
+    ]
+    if not dry_run:
+        # Needed only when already up to date, but cheap next to the tag fetch
+        stages += [
+            Stage("oci_version", lambda: read_chart_oci_version(chart)),
+            Stage("local_release", lambda: prepare_release(chart.parent)),
+            Stage(
+                "published_digest",
+                lambda oci_version: published_layer_digest(oci_registry, oci_repo, oci_version),
+                needs=("oci_version",),
+            ),
+        ]
+    state = run_stages(stages)
+
+    current_version = state["current_version"]
     result.current_version = str(current_version) if current_version else None
     click.echo(f"Current appVersion: {current_version or 'unknown'}")
 
-    # 2. Fetch Docker Hub versions
-    all_versions = fetch_docker_versions(docker_image)
-    if not all_versions:
+    versions = state["versions"]
+    if not versions.count:
         click.echo("No versions found on Docker Hub")
         return
 
-    latest = get_latest_stable(all_versions)
+    latest = versions.latest_stable
     click.echo(f"Latest stable upstream: {latest}")
 
     up_to_date = not latest or (current_version and latest <= current_version)
     if up_to_date:
         click.echo("Already up to date")
         if not dry_run:
-            oci_version = read_chart_oci_version(chart)
-            package_path = push_if_not_exists(oci_registry, oci_repo, oci_version)
-            if package_path:
+            oci_version = state["oci_version"]
+            local = state["local_release"]
+            release = None
+            if state["published_digest"] is None:
+                push_chart(local, oci_registry, oci_repo)
+                release = local
                 click.echo(f"Pushed {oci_version} to OCI")
-            nix_path = chart.parent / "chart.nix"
-            if _reconcile_chart_nix(nix_path, oci_registry, oci_repo, oci_version, package_path):
-                git.add(str(nix_path))
-                git.commit(f"chore(chart): update chart.nix hash for {oci_version}")
-                git.push("main")
+            if _reconcile_chart_nix(
+                nix_path, oci_registry, oci_repo, oci_version, release,
+                local=local, published_digest=state["published_digest"],
+            ):
+                git.commit_and_release([str(nix_path)], f"chore(chart): update chart.nix hash for {oci_version}")
                 click.echo(f"Updated chart.nix for {oci_version}")
-            if package_path:
-                package_path.unlink(missing_ok=True)
+            record_run()
         return
 
+    targets = versions.missing_since(current_version) if catch_up else [latest]
+
     if dry_run:
-        click.echo(f"\n[DRY RUN] Would update: {current_version} -> {latest}")
+        click.echo(f"\n[DRY RUN] Would update: {current_version} -> {', '.join(map(str, targets))}")
         click.echo(f"  Push to OCI: {oci_registry}/{oci_repo}")
         return
 
+    if len(targets) > 1:
+        click.echo(f"\nCatching up: {current_version} -> {', '.join(map(str, targets))}")
+        try:
+            _catch_up(chart, targets, oci_registry, oci_repo, git, result)
+        except RuntimeError as e:
+            raise click.ClickException(str(e)) from e
+        record_run()
+        _print_summary(result, latest)
+        return
+
     # 3. Update Chart.yaml (appVersion + bump chart patch)
     click.echo(f"\nUpdating: {current_version} -> {latest}")
     new_chart_version = write_chart_version(chart, latest)
 
     # 4. Push to OCI registry (uses chart version as tag, not appVersion)
     oci_version = read_chart_oci_version(chart)
-    package_path = push_if_not_exists(oci_registry, oci_repo, oci_version)
-    if package_path:
+    try:
+        release, pushed = push_if_not_exists(oci_registry, oci_repo, oci_version, chart.parent)
+    except RuntimeError as e:
+        raise click.ClickException(str(e)) from e
+    if pushed:
         result.pushed_oci_packages.append(oci_version)
         click.echo(f"Pushed {oci_version} to OCI")
     else:
         click.echo(f"OCI package {oci_version} already exists")
 
     # 5. Update chart.nix with version and hash of the published chart
-    nix_path = chart.parent / "chart.nix"
-    if _reconcile_chart_nix(nix_path, oci_registry, oci_repo, oci_version, package_path):
+    if _reconcile_chart_nix(nix_path, oci_registry, oci_repo, oci_version, release):
         click.echo(f"Updated chart.nix for {oci_version}")
-    if package_path:
-        package_path.unlink(missing_ok=True)
 
-    # 6. Commit and push
-    git.add(chart_path)
+    # 6. Commit, tag (based on chart version, not appVersion) and push in one go
+    paths = [chart_path]
     if nix_path.exists():
-        git.add(str(nix_path))
-    git.commit(f"chore(chart): update appVersion to {latest}")
-    git.push("main")
+        paths.append(str(nix_path))
+    tag_name = f"v{oci_version}"
+    created = git.commit_and_release(paths, f"chore(chart): update appVersion to {latest}", tags=[tag_name])
     result.main_updated = True
+    result.created_tags.extend(created)
+    for tag in created:
+        click.echo(f"Created tag {tag}")
+    record_run()
 
-    # 7. Create release tag (based on chart version, not appVersion)
-    tag_name = f"v{oci_version}"
-    if not git.tag_exists(tag_name):
-        git.create_tag(tag_name)
-        git.push_tag(tag_name)
-        result.created_tags.append(tag_name)
-        click.echo(f"Created tag {tag_name}")
+    _print_summary(result, latest)
 
-    # Summary
+
+def _print_summary(result: VersionManagementResult, latest: Version) -> None:
     click.echo("\n=== Summary ===")
     click.echo(f"Updated: {result.current_version} -> {latest}")
     if result.created_tags:
@@ -161,41 +321,282 @@ def update(
         click.echo(f"OCI: {', '.join(result.pushed_oci_packages)}")
 
 
+def _report_deletions(result: DeletionResult, noun: str, dry_run: bool) -> None:
+    action = "Would delete" if dry_run else "Deleted"
+    click.echo(f"{action} {result.deleted} {noun}(s)")
+    if result.failed:
+        for version_id, error in sorted(result.failed.items()):
+            click.echo(f"  Failed to delete {version_id}: {error}", err=True)
+        raise click.ClickException(f"Failed to delete {len(result.failed)} of {result.attempted} {noun}(s)")
+
+
 @main.command()
 @click.option("--oci-repo", required=True, help="org/package format")
 @click.option("--max-age-days", default=7, help="Delete untagged versions older than N days")
 @click.option("--all", "prune_all", is_flag=True, help="Delete ALL untagged versions regardless of age")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Parallel DELETE requests",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=True,
+    help="Continue an interrupted prune from its checkpoint instead of starting over",
+)
 @click.option("--dry-run", is_flag=True)
 def prune(
     oci_repo: str,
     max_age_days: int,
     prune_all: bool,
+    concurrency: int,
+    resume: bool,
     dry_run: bool,
 ) -> None:
     """Prune untagged OCI versions from the registry."""
+    from zero_cache_chart.cache import cache_dir
+    from zero_cache_chart.github import prune_untagged
+
     org, package_name = _split_oci_repo(oci_repo)
     click.echo(f"Pruning untagged versions from {org}/{package_name}")
 
+    checkpoint = cache_dir() / "prune" / f"{org}_{package_name.replace('/', '_')}.json"
+    if not resume:
+        checkpoint.unlink(missing_ok=True)
+    elif checkpoint.exists() and not dry_run:
+        click.echo(f"Resuming from checkpoint {checkpoint}")
+
     if dry_run:
         click.echo("[DRY RUN]")
 
-    count = prune_untagged(org, package_name, max_age_days=max_age_days, prune_all=prune_all, dry_run=dry_run)
-    action = "Would delete" if dry_run else "Deleted"
-    click.echo(f"{action} {count} untagged version(s)")
+    result = prune_untagged(
+        org,
+        package_name,
+        max_age_days=max_age_days,
+        prune_all=prune_all,
+        dry_run=dry_run,
+        concurrency=concurrency,
+        checkpoint=checkpoint,
+    )
+    _report_deletions(result, "untagged version", dry_run)
 
 
 @main.command("cleanup-all")
 @click.option("--oci-repo", required=True, help="org/package format")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Parallel DELETE requests",
+)
 @click.option("--dry-run", is_flag=True)
 @click.confirmation_option(prompt="This will delete ALL chart versions from the registry. Continue?")
-def cleanup_all(oci_repo: str, dry_run: bool) -> None:
+def cleanup_all(oci_repo: str, concurrency: int, dry_run: bool) -> None:
     """Delete ALL OCI chart versions (one-time cleanup)."""
+    from zero_cache_chart.github import delete_all_versions
+
     org, package_name = _split_oci_repo(oci_repo)
     click.echo(f"Deleting ALL versions from {org}/{package_name}")
 
     if dry_run:
         click.echo("[DRY RUN]")
 
-    count = delete_all_versions(org, package_name, dry_run=dry_run)
-    action = "Would delete" if dry_run else "Deleted"
-    click.echo(f"{action} {count} version(s)")
+    result = delete_all_versions(org, package_name, dry_run=dry_run, concurrency=concurrency)
+    _report_deletions(result, "version", dry_run)
+
+
+def _format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    for unit in ("KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+@main.command()
+@click.option("--oci-repo", required=True, help="org/package format")
+@click.option("--oci-registry", default="ghcr.io", help="OCI registry URL")
+@click.option(
+    "--keep-patches",
+    default=3,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Stable releases to keep per major.minor line",
+)
+@click.option(
+    "--keep-days",
+    default=30,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help="Keep versions published within N days",
+)
+@click.option(
+    "--keep-git-tags/--ignore-git-tags",
+    default=True,
+    help="Keep every version with a v<version> tag in this checkout",
+)
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Parallel requests",
+)
+@click.option("--dry-run", is_flag=True, help="Report what would be deleted and the storage it frees")
+@click.option("--yes", is_flag=True, help="Delete without asking for confirmation")
+def retain(
+    oci_repo: str,
+    oci_registry: str,
+    keep_patches: int,
+    keep_days: int,
+    keep_git_tags: bool,
+    concurrency: int,
+    dry_run: bool,
+    yes: bool,
+) -> None:
+    """Delete tagged OCI chart versions the retention policy does not keep."""
+    from zero_cache_chart.git import Git
+    from zero_cache_chart.github import delete_versions, list_package_versions
+    from zero_cache_chart.retention import RetentionPolicy, estimate_storage, git_tag_versions, plan_retention
+
+    org, package_name = _split_oci_repo(oci_repo)
+    pinned = git_tag_versions(Git().list_tags("v*")) if keep_git_tags else frozenset()
+    if keep_git_tags and not pinned:
+        # e.g. a shallow CI checkout: pinning nothing would delete released versions
+        raise click.ClickException(
+            "No v<version> git tags found in this checkout; fetch them (git fetch --tags) or pass --ignore-git-tags"
+        )
+    policy = RetentionPolicy(keep_patches=keep_patches, keep_days=keep_days, pinned=pinned)
+    plan = plan_retention(list_package_versions(org, package_name), policy)
+
+    reasons = ", ".join(f"{count} {reason}" for reason, count in plan.kept_by().items() if count)
+    summary = f"Keeping {len(plan.keep)} of {len(plan.keep) + len(plan.delete)} tagged version(s)"
+    click.echo(f"{summary} ({reasons})" if reasons else summary)
+    click.echo(
+        f"Listing: {plan.listed_before} -> {plan.listed_after} version(s), "
+        f"{plan.pages(plan.listed_before)} -> {plan.pages(plan.listed_after)} page(s)"
+    )
+
+    if dry_run:
+        click.echo("[DRY RUN]")
+        storage = estimate_storage(oci_registry, f"{org}/{package_name}", plan, concurrency=concurrency)
+        click.echo(
+            f"Storage: {_format_bytes(storage.before)} -> {_format_bytes(storage.before - storage.reclaimed)} "
+            f"(frees {_format_bytes(storage.reclaimed)})"
+        )
+        if storage.unknown:
+            click.echo(f"  {storage.unknown} manifest(s) could not be read and are not counted", err=True)
+    elif plan.delete and not yes:
+        click.confirm(f"Delete {len(plan.delete)} tagged version(s) from {org}/{package_name}?", abort=True)
+
+    ids = [ver["id"] for ver in plan.delete]
+    result = delete_versions(org, package_name, ids, concurrency=concurrency, dry_run=dry_run)
+    _report_deletions(result, "tagged version", dry_run)
+
+
+@main.command()
+@click.option("--chart-path", default="Chart.yaml", help="Path to Chart.yaml")
+@click.option("--oci-registry", default="ghcr.io", help="OCI registry URL")
+@click.option("--oci-repo", required=True, help="OCI repository path")
+@click.option(
+    "--jobs",
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Charts fetched and hashed in parallel",
+)
+def audit(chart_path: str, oci_registry: str, oci_repo: str, jobs: int) -> None:
+    """Check git tags, published charts, chart.nix and Chart.yaml agree."""
+    from zero_cache_chart.audit import audit_releases
+
+    try:
+        report = audit_releases(oci_registry, oci_repo, Path(chart_path), jobs=jobs)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from e
+    for finding in report.findings:
+        click.echo(f"DRIFT {finding.subject}: {finding.message}", err=True)
+    click.echo(f"Audited {report.git_tags} git tag(s) and {report.published} published version(s)")
+    if not report.ok:
+        raise click.ClickException(f"{len(report.findings)} drift finding(s)")
+    click.echo("No drift found")
+
+
+@main.command()
+@click.option("--chart-dir", default=".", type=click.Path(file_okay=False, path_type=Path), help="Chart directory")
+@click.option(
+    "--app-version",
+    "app_versions",
+    multiple=True,
+    help="appVersion to render (repeatable; default: both sides of every semverCompare boundary plus Chart.yaml's)",
+)
+@click.option("--jobs", type=click.IntRange(min=1), default=None, help="Worker processes (default: one per CPU)")
+@click.option("--no-cache", is_flag=True, help="Re-render every case even if its inputs are unchanged")
+def verify(chart_dir: Path, app_versions: tuple[str, ...], jobs: int | None, no_cache: bool) -> None:
+    """Render the chart for every example values file, appVersion and mode, and validate it."""
+    from zero_cache_chart.verify import build_matrix, verify_chart
+
+    cases = build_matrix(chart_dir, app_versions)
+    try:
+        results = verify_chart(chart_dir, cases, jobs=jobs, use_cache=not no_cache)
+    except RuntimeError as e:
+        raise click.ClickException(str(e)) from e
+
+    failed = [r for r in results if not r.ok]
+    for r in results:
+        status = "ok" if r.ok else "FAIL"
+        click.echo(f"{status:<4} {r.case.name}{' (cached)' if r.cached else ''}")
+    for r in failed:
+        click.echo(f"\n--- {r.case.name} ---\n{r.output}", err=True)
+    cached = sum(r.cached for r in results)
+    click.echo(f"\n{len(results) - len(failed)}/{len(results)} passed ({cached} cached)")
+    if failed:
+        raise click.ClickException(f"{len(failed)} render case(s) failed validation")
+
+
+@main.command("generate-schema")
+@click.option("--chart-dir", default=".", type=click.Path(file_okay=False, path_type=Path), help="Chart directory")
+@click.option("--check", is_flag=True, help="Fail if the committed schema is out of date instead of writing it")
+def generate_schema_command(chart_dir: Path, check: bool) -> None:
+    """Generate values.schema.json from values.yaml and the templates."""
+    from zero_cache_chart.schema import SCHEMA_FILE, dump_schema, generate_schema
+
+    path = chart_dir / SCHEMA_FILE
+    text = dump_schema(generate_schema(chart_dir))
+    if check:
+        if not path.exists() or path.read_text() != text:
+            raise click.ClickException(f"{path} is out of date; run `zero-cache-chart generate-schema`")
+        click.echo(f"{path} is up to date")
+        return
+    path.write_text(text)
+    click.echo(f"Wrote {path}")
+
+
+@main.command("validate-values")
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--chart-dir", default=".", type=click.Path(file_okay=False, path_type=Path), help="Chart directory")
+def validate_values(files: tuple[Path, ...], chart_dir: Path) -> None:
+    """Check values files against the chart's values.schema.json."""
+    import json
+
+    from zero_cache_chart.schema import SCHEMA_FILE, compile_schema, generate_schema, validate_values_file
+
+    schema_path = chart_dir / SCHEMA_FILE
+    schema = json.loads(schema_path.read_text()) if schema_path.exists() else generate_schema(chart_dir)
+    validate = compile_schema(schema)
+
+    invalid = 0
+    for path in files:
+        errors = validate_values_file(validate, path)
+        if errors:
+            invalid += 1
+            for error in errors:
+                click.echo(f"{path}: {error}", err=True)
+    click.echo(f"{len(files) - invalid}/{len(files)} values file(s) valid")
+    if invalid:
+        raise click.ClickException(f"{invalid} values file(s) failed validation")
@@ -1,26 +1,192 @@
 from __future__ import annotations
 
-import requests
+import math
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 from semver.version import Version
 
+from zero_cache_chart.cache import read_json, write_json
+from zero_cache_chart.httpcache import http_cache
+from zero_cache_chart.timing import span
+from zero_cache_chart.versions import VersionSummary, iter_versions, summarize_versions
+
+
+DOCKER_HUB_API = "https://hub.docker.com/v2"
+
+# Docker Hub rate-limits aggressive clients; keep the fan-out modest.
+DEFAULT_MAX_WORKERS = 8
 
-def fetch_docker_versions(docker_image: str) -> list[Version]:
-    url: str | None = (
-        f"https://hub.docker.com/v2/repositories/{docker_image}/tags/?page_size=100"
-    )
-    versions: list[Version] = []
+DockerTag = dict[str, Any]
 
-    while url:
-        resp = requests.get(url, timeout=30)
+
+def _tags_url(docker_image: str, *, ordering: str | None = None) -> str:
+    url = f"{DOCKER_HUB_API}/repositories/{docker_image}/tags/?page_size=100"
+    if ordering:
+        url += f"&ordering={ordering}"
+    return url
+
+
+def _fetch_page(url: str) -> dict[str, Any]:
+    with span("docker.tags_page", url=url) as s:
+        resp = http_cache().get(url)
         resp.raise_for_status()
-        data = resp.json()
+        s.bytes = len(resp.content)
+        s.attrs["cached"] = resp.from_cache
+        return resp.json()
+
+
+def _page_url(next_url: str, page: int) -> str:
+    """Rewrite the `page` query parameter of Docker Hub's `next` link."""
+    parts = urlsplit(next_url)
+    query = [(k, str(page) if k == "page" else v) for k, v in parse_qsl(parts.query)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _iter_pages(url: str, max_workers: int) -> Iterator[dict[str, Any]]:
+    """Yield every page starting at `url`, in order.
+
+    The first page reports the total tag `count`; the remaining pages are
+    fetched concurrently over the shared connection pool, with at most
+    `2 * max_workers` pages requested ahead of the consumer so memory does
+    not grow with the size of the history. If the response does not carry
+    enough information to compute the page range, falls back to walking the
+    `next` links.
+    """
+    first = _fetch_page(url)
+    yield first
+    next_url = first.get("next")
+    per_page = len(first.get("results", []))
+
+    count = first.get("count")
+    if next_url and isinstance(count, int) and per_page:
+        pages = math.ceil(count / per_page)
+        urls = (_page_url(next_url, page) for page in range(2, pages + 1))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = deque(pool.submit(_fetch_page, u) for u in islice(urls, 2 * max_workers))
+            while pending:
+                data = pending.popleft().result()
+                for u in islice(urls, 1):
+                    pending.append(pool.submit(_fetch_page, u))
+                yield data
+    else:
+        while next_url:
+            data = _fetch_page(next_url)
+            yield data
+            next_url = data.get("next")
+
 
-        for tag in data.get("results", []):
-            name = tag.get("name", "")
-            if Version.is_valid(name):
-                versions.append(Version.parse(name))
+def _iter_tags(url: str, max_workers: int) -> Iterator[DockerTag]:
+    for page in _iter_pages(url, max_workers):
+        yield from page.get("results", [])
 
-        url = data.get("next")
 
+def _iter_tags_since(url: str, watermark: datetime) -> Iterator[DockerTag]:
+    """Walk tags newest-first, stopping at the first one not newer than `watermark`."""
+    for tag in _iter_tags(url, max_workers=1):
+        updated = tag.get("last_updated")
+        if updated and _parse_timestamp(updated) <= watermark:
+            return
+        yield tag
+
+
+def _sync_tag_cache(
+    docker_image: str,
+    tag_cache: Path,
+    max_workers: int,
+    refresh: bool = False,
+) -> list[str]:
+    """Bring the on-disk tag cache up to date and return all known tag names.
+
+    The cache stores every tag name seen so far plus the newest `last_updated`
+    timestamp (the watermark). Tags are requested newest-first, so a run with a
+    watermark stops paginating as soon as it reaches already-seen history.
+    Tags deleted upstream stay in the cache until `refresh` rebuilds it from
+    the full listing.
+    """
+    cached = {} if refresh else read_json(tag_cache) or {}
+    watermark = cached.get("watermark")
+    url = _tags_url(docker_image, ordering="last_updated")
+
+    if watermark:
+        new_tags = _iter_tags_since(url, _parse_timestamp(watermark))
+    else:
+        new_tags = _iter_tags(url, max_workers)
+
+    names = set(cached.get("tags", []))
+    latest = watermark
+    for tag in new_tags:
+        names.add(tag.get("name", ""))
+        updated = tag.get("last_updated")
+        if updated and (latest is None or _parse_timestamp(updated) > _parse_timestamp(latest)):
+            latest = updated
+    names.discard("")
+    tag_names = sorted(names)
+    write_json(tag_cache, {"watermark": latest, "tags": tag_names})
+    return tag_names
+
+
+def fetch_newest_tag(docker_image: str) -> DockerTag | None:
+    """Return the most recently updated tag of an image, in a single small request."""
+    url = f"{DOCKER_HUB_API}/repositories/{docker_image}/tags/?page_size=1&ordering=last_updated"
+    with span("docker.newest_tag", url=url) as s:
+        resp = http_cache().get(url)
+        resp.raise_for_status()
+        s.bytes = len(resp.content)
+        s.attrs["cached"] = resp.from_cache
+    results = resp.json().get("results", [])
+    return results[0] if results else None
+
+
+def _iter_tag_names(
+    docker_image: str,
+    max_workers: int,
+    tag_cache: Path | None,
+    refresh_tag_cache: bool = False,
+) -> Iterator[str]:
+    """Tag names as they arrive, page by page; the tag cache has to hold every name anyway."""
+    if tag_cache is not None:
+        yield from _sync_tag_cache(docker_image, tag_cache, max_workers, refresh_tag_cache)
+        return
+    for tag in _iter_tags(_tags_url(docker_image), max_workers):
+        yield tag.get("name", "")
+
+
+def fetch_docker_versions(
+    docker_image: str,
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    tag_cache: Path | None = None,
+    refresh_tag_cache: bool = False,
+) -> list[Version]:
+    """Fetch all semver tags of a Docker Hub image, sorted ascending.
+
+    With `tag_cache`, only tags updated since the previous run are downloaded
+    and merged into the cache file; otherwise the full history is fetched.
+    `refresh_tag_cache` fetches the full history and rewrites the cache file.
+    """
+    versions = list(iter_versions(_iter_tag_names(docker_image, max_workers, tag_cache, refresh_tag_cache)))
     versions.sort()
     return versions
+
+
+def fetch_version_summary(
+    docker_image: str,
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    tag_cache: Path | None = None,
+    refresh_tag_cache: bool = False,
+) -> VersionSummary:
+    """Like `fetch_docker_versions`, but streamed into a `VersionSummary` instead of a sorted list."""
+    names = _iter_tag_names(docker_image, max_workers, tag_cache, refresh_tag_cache)
+    return summarize_versions(iter_versions(names))
@@ -4,6 +4,7 @@ import re
 import subprocess
 from pathlib import Path
 
+from zero_cache_chart.timing import span
 from zero_cache_chart.types import CommandResult, CommandError
 
 
@@ -20,7 +21,8 @@ class Git:
 
     def _run(self, *args: str, check: bool = True) -> CommandResult:
         cmd = ["git", *args]
-        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=self.cwd)
+        with span("git", subcommand=args[0]):
+            proc = subprocess.run(cmd, capture_output=True, text=True, cwd=self.cwd)
         result = CommandResult(
             stdout=proc.stdout.strip(),
             stderr=proc.stderr.strip(),
@@ -68,10 +70,51 @@ class Git:
         args.extend(["origin", name])
         self._run(*args)
 
+    def list_tags(self, pattern: str = "*") -> list[str]:
+        return [tag for tag in self._run("tag", "-l", pattern).stdout.split("\n") if tag]
+
+    def toplevel(self) -> Path:
+        return Path(self._run("rev-parse", "--show-toplevel").stdout)
+
+    def show_file(self, ref: str, path: str) -> str | None:
+        """Contents of `path` (relative to the repository root) at `ref`, or None if it does not exist there."""
+        result = self._run("show", f"{ref}:{path}", check=False)
+        return result.stdout if result.returncode == 0 else None
+
     def tag_exists(self, name: str) -> bool:
         result = self._run("tag", "-l", name)
         return name in result.stdout.split("\n")
 
+    def stage_release(self, paths: list[str], message: str, tags: list[str]) -> list[str]:
+        """Stage, commit and tag locally. Returns the tags that were newly created."""
+        self.add(*paths)
+        self.commit(message)
+        existing = set(self._run("tag", "-l", *tags).stdout.split("\n")) if tags else set()
+        created = [tag for tag in tags if tag not in existing]
+        for tag in created:
+            self.create_tag(tag)
+        return created
+
+    def push_atomic(self, branch: str, tags: list[str]) -> None:
+        """Push a branch and tags in one round trip; the remote takes all refs or none."""
+        self._run("push", "--atomic", "origin", branch, *(f"refs/tags/{tag}" for tag in tags))
+
+    def commit_and_release(
+        self,
+        paths: list[str],
+        message: str,
+        *,
+        branch: str = "main",
+        tags: list[str] | None = None,
+    ) -> list[str]:
+        """Commit, tag and publish the branch plus any new tags atomically.
+
+        Returns the tags that were newly created.
+        """
+        created = self.stage_release(paths, message, tags or [])
+        self.push_atomic(branch, created)
+        return created
+
     def list_remote_branches(self) -> list[str]:
         result = self._run("branch", "-r")
         return [
@@ -0,0 +1,226 @@
+"""GitHub Packages API: list, delete and prune versions of a container package.
+
+Kept apart from the OCI registry code so `prune`, `cleanup-all` and
+`retain` do not load chart packaging.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from zero_cache_chart.cache import read_json, write_json
+from zero_cache_chart.httpcache import http_cache
+from zero_cache_chart.timing import span
+from zero_cache_chart.transport import transport
+from zero_cache_chart.types import DEFAULT_CONCURRENCY, DeletionResult
+
+
+PackageVersion = dict[str, Any]
+
+GITHUB_API = "https://api.github.com"
+
+
+def _parse_package_versions(
+    versions: list[PackageVersion],
+) -> tuple[list[PackageVersion], list[PackageVersion]]:
+    tagged = [v for v in versions if v["metadata"]["container"]["tags"]]
+    untagged = [v for v in versions if not v["metadata"]["container"]["tags"]]
+    return tagged, untagged
+
+
+def _authenticate_github() -> None:
+    """Put the GitHub API headers on the shared session for `GITHUB_API`, once per transport."""
+    session = transport().session(GITHUB_API)
+    if "Authorization" not in session.headers:
+        session.headers.update({
+            "Authorization": f"Bearer {os.environ.get('GITHUB_TOKEN', '')}",
+            "Accept": "application/vnd.github+json",
+        })
+
+
+def _versions_url(org: str, package_name: str) -> str:
+    # GHCR nests chart name under repo path (e.g. "zero-cache-chart/zero-cache").
+    # The GitHub API requires URL-encoding the slash.
+    encoded_name = package_name.replace("/", "%2F")
+    return f"{GITHUB_API}/orgs/{org}/packages/container/{encoded_name}/versions"
+
+
+def _fetch_versions_page(url: str) -> tuple[list[PackageVersion], str | None]:
+    """One page of package versions plus the `rel="next"` link, if any."""
+    _authenticate_github()
+    with span("github.versions_page", url=url) as s:
+        resp = http_cache().get(url)
+        resp.raise_for_status()
+        s.bytes = len(resp.content)
+        s.attrs["cached"] = resp.from_cache
+
+    next_url = None
+    for part in resp.headers.get("Link", "").split(","):
+        if 'rel="next"' in part:
+            next_url = part.split(";")[0].strip().strip("<>")
+    return resp.json(), next_url
+
+
+def list_package_versions(org: str, package_name: str) -> list[PackageVersion]:
+    """List all versions of a container package using GitHub API."""
+    url: str | None = f"{_versions_url(org, package_name)}?per_page=100"
+    all_versions: list[PackageVersion] = []
+
+    while url:
+        versions, url = _fetch_versions_page(url)
+        all_versions.extend(versions)
+
+    return all_versions
+
+
+def delete_package_version(org: str, package_name: str, version_id: int) -> None:
+    _authenticate_github()
+    with span("github.delete_version", version_id=version_id):
+        resp = transport().delete(f"{_versions_url(org, package_name)}/{version_id}", timeout=30)
+        resp.raise_for_status()
+
+
+def delete_versions(
+    org: str,
+    package_name: str,
+    version_ids: list[int],
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    dry_run: bool = False,
+) -> DeletionResult:
+    """Delete package versions over a bounded worker pool.
+
+    Failures are collected per version instead of aborting the batch, so
+    `result.attempted` always equals the number of versions a dry run reports.
+    """
+    result = DeletionResult()
+    if dry_run:
+        result.deleted = len(version_ids)
+        return result
+
+    transport().reserve(concurrency)
+
+    def delete(version_id: int) -> tuple[int, str | None]:
+        try:
+            delete_package_version(org, package_name, version_id)
+        except requests.RequestException as e:
+            return version_id, str(e)
+        return version_id, None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for version_id, error in pool.map(delete, version_ids):
+            if error is None:
+                result.deleted += 1
+            else:
+                result.failed[version_id] = error
+
+    return result
+
+
+def _load_checkpoint(checkpoint: Path | None, criteria: dict[str, Any]) -> tuple[int, DeletionResult]:
+    """Page to resume from and the counts so far, if `checkpoint` was written for the same criteria."""
+    state = read_json(checkpoint) if checkpoint is not None else None
+    if not state or state.get("criteria") != criteria:
+        return 1, DeletionResult()
+    failed = {int(version_id): error for version_id, error in state["failed"].items()}
+    return state["page"], DeletionResult(deleted=state["deleted"], failed=failed)
+
+
+def _delete_streaming(
+    org: str,
+    package_name: str,
+    eligible: Callable[[PackageVersion], bool],
+    *,
+    concurrency: int,
+    dry_run: bool,
+    checkpoint: Path | None = None,
+    criteria: dict[str, Any] | None = None,
+) -> DeletionResult:
+    """Delete eligible versions page by page, as the listing arrives.
+
+    Only one page is held in memory. Deleting versions shifts later ones
+    forward, so a page that had deletions is fetched again before moving on;
+    versions that failed to delete are skipped on the refetch. With a
+    checkpoint, the current page, the deleted count and any failures are
+    saved after every batch, so an interrupted run resumes where it stopped. Pages before the checkpoint
+    hold nothing we delete, so their numbering is stable across runs.
+    """
+    criteria = criteria or {}
+    checkpoint = None if dry_run else checkpoint
+    page, result = _load_checkpoint(checkpoint, criteria)
+    base_url = _versions_url(org, package_name)
+
+    while True:
+        versions, next_url = _fetch_versions_page(f"{base_url}?per_page=100&page={page}")
+        ids = [v["id"] for v in versions if eligible(v) and v["id"] not in result.failed]
+        batch = delete_versions(org, package_name, ids, concurrency=concurrency, dry_run=dry_run)
+        result.deleted += batch.deleted
+        result.failed.update(batch.failed)
+
+        refetch = bool(batch.deleted) and not dry_run
+        if not refetch:
+            if next_url is None:
+                break
+            page += 1
+        if checkpoint is not None:
+            write_json(checkpoint, {
+                "criteria": criteria,
+                "page": page,
+                "deleted": result.deleted,
+                "failed": {str(k): v for k, v in result.failed.items()},
+            })
+
+    if checkpoint is not None:
+        checkpoint.unlink(missing_ok=True)
+    return result
+
+
+def prune_untagged(
+    org: str,
+    package_name: str,
+    *,
+    max_age_days: int = 7,
+    prune_all: bool = False,
+    dry_run: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    checkpoint: Path | None = None,
+) -> DeletionResult:
+    """Delete untagged versions older than `max_age_days` (or all of them with `prune_all`).
+
+    Pass `checkpoint` to make the run resumable; see `_delete_streaming`.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+
+    def eligible(ver: PackageVersion) -> bool:
+        if ver["metadata"]["container"]["tags"]:
+            return False
+        return prune_all or datetime.fromisoformat(ver["created_at"].replace("Z", "+00:00")) < cutoff
+
+    criteria = {"untagged": True, "max_age_days": None if prune_all else max_age_days}
+    return _delete_streaming(
+        org,
+        package_name,
+        eligible,
+        concurrency=concurrency,
+        dry_run=dry_run,
+        checkpoint=checkpoint,
+        criteria=criteria,
+    )
+
+
+def delete_all_versions(
+    org: str,
+    package_name: str,
+    *,
+    dry_run: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> DeletionResult:
+    """Delete ALL package versions (tagged and untagged). One-time cleanup."""
+    return _delete_streaming(org, package_name, lambda _: True, concurrency=concurrency, dry_run=dry_run)
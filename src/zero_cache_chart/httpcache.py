@@ -0,0 +1,115 @@
+"""On-disk cache of HTTP GET responses, revalidated with ETag/Last-Modified.
+
+Every request is still sent, but with `If-None-Match`/`If-Modified-Since`
+when a cached copy exists; a 304 is answered from disk. Listing pages that
+did not change therefore cost an empty response instead of the full JSON,
+and on GitHub a 304 does not count against the rate limit.
+
+Entries are one file per URL: a JSON header line (validators and response
+headers) followed by the raw body, evicted with `cache.evict_lru`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import cache
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from zero_cache_chart.cache import cache_dir, evict_lru, write_bytes_atomic
+from zero_cache_chart.transport import transport
+
+# Listing pages are a few tens of KiB each.
+DEFAULT_HTTP_CACHE_BYTES = 32 * 1024 * 1024
+DEFAULT_HTTP_CACHE_AGE = 14 * 24 * 3600
+
+# Response headers replayed on a cache hit; the rest describe the original transfer.
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+
+class HttpCache:
+    def __init__(
+        self,
+        root: Path | None = None,
+        *,
+        max_bytes: int = DEFAULT_HTTP_CACHE_BYTES,
+        max_age: float = DEFAULT_HTTP_CACHE_AGE,
+    ):
+        self.root = root or cache_dir() / "http"
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode()).hexdigest()}.http"
+
+    def _load(self, path: Path) -> tuple[dict[str, str], bytes] | None:
+        try:
+            header, _, body = path.read_bytes().partition(b"\n")
+            return json.loads(header), body
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _store(self, path: Path, resp: requests.Response) -> None:
+        headers = {key: resp.headers[key] for key in _KEPT_HEADERS if key in resp.headers}
+        write_bytes_atomic(path, json.dumps(headers).encode() + b"\n" + resp.content)
+
+    def get(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        timeout: float = 30,
+    ) -> requests.Response:
+        """GET `url`, revalidating a cached copy; `resp.from_cache` is True when served from disk.
+
+        Only successful responses carrying a validator are stored.
+        """
+        path = self._path(url)
+        entry = self._load(path)
+        request_headers = dict(headers or {})
+        if entry is not None:
+            cached_headers, body = entry
+            if "ETag" in cached_headers:
+                request_headers["If-None-Match"] = cached_headers["ETag"]
+            if "Last-Modified" in cached_headers:
+                request_headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        resp = transport().get(url, headers=request_headers, timeout=timeout)
+        if resp.status_code == 304 and entry is not None:
+            os.utime(path)
+            return _replay(url, cached_headers, body)
+        resp.from_cache = False
+        if resp.status_code == 200 and ("ETag" in resp.headers or "Last-Modified" in resp.headers):
+            self._store(path, resp)
+        return resp
+
+    def evict(self) -> None:
+        """Drop entries unused for `max_age`, then the least recently used until under `max_bytes`."""
+        evict_lru(self.root, "*.http", self.max_bytes, max_age=self.max_age)
+
+
+def _replay(url: str, headers: dict[str, str], body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp.headers = CaseInsensitiveDict(headers)
+    resp._content = body
+    resp.encoding = "utf-8"
+    resp.from_cache = True
+    return resp
+
+
+@cache
+def _shared(root: Path) -> HttpCache:
+    http_cache = HttpCache(root)
+    http_cache.evict()
+    return http_cache
+
+
+def http_cache() -> HttpCache:
+    """The process-wide cache under the cache directory, evicted once when first used."""
+    return _shared(cache_dir() / "http")
@@ -0,0 +1,98 @@
+"""In-process Nix Archive (NAR) hashing of chart tarballs.
+
+Produces the same digest as `nix hash path` over the extracted tarball
+without touching disk or requiring Nix to be installed.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import struct
+import tarfile
+from typing import IO, Any
+
+NAR_MAGIC = b"nix-archive-1"
+
+# A directory maps entry names to child nodes; files are (contents, executable);
+# symlinks are their target as a str.
+_Node = dict[str, Any] | tuple[bytes, bool] | str
+
+
+class _NarWriter:
+    """Feeds NAR framing straight into a hash object."""
+
+    def __init__(self, sink: Any):
+        self.sink = sink
+
+    def write_str(self, data: bytes) -> None:
+        self.sink.update(struct.pack("<Q", len(data)))
+        self.sink.update(data)
+        padding = -len(data) % 8
+        if padding:
+            self.sink.update(b"\0" * padding)
+
+    def write(self, *tokens: bytes) -> None:
+        for token in tokens:
+            self.write_str(token)
+
+    def dump(self, node: _Node) -> None:
+        self.write(b"(")
+        if isinstance(node, dict):
+            self.write(b"type", b"directory")
+            for name in sorted(node, key=lambda n: n.encode()):
+                self.write(b"entry", b"(", b"name", name.encode(), b"node")
+                self.dump(node[name])
+                self.write(b")")
+        elif isinstance(node, tuple):
+            contents, executable = node
+            self.write(b"type", b"regular")
+            if executable:
+                self.write(b"executable", b"")
+            self.write(b"contents", contents)
+        else:
+            self.write(b"type", b"symlink", b"target", node.encode())
+        self.write(b")")
+
+
+def _tree_from_tar(fileobj: IO[bytes]) -> dict[str, _Node]:
+    """Read tar members sequentially into an in-memory directory tree."""
+    root: dict[str, _Node] = {}
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            parts = [p for p in member.name.split("/") if p not in ("", ".")]
+            if not parts:
+                continue
+            parent = root
+            for part in parts[:-1]:
+                child = parent.setdefault(part, {})
+                if not isinstance(child, dict):
+                    raise RuntimeError(f"Tar member {member.name} is nested under a non-directory")
+                parent = child
+            name = parts[-1]
+            if member.isdir():
+                if not isinstance(parent.get(name), dict):
+                    parent[name] = {}
+            elif member.isfile():
+                extracted = tar.extractfile(member)
+                assert extracted is not None
+                parent[name] = (extracted.read(), bool(member.mode & 0o100))
+            elif member.issym():
+                parent[name] = member.linkname
+            else:
+                raise RuntimeError(f"Unsupported tar member type for {member.name}")
+    return root
+
+
+def nar_hash_tarball(data: bytes) -> str:
+    """SRI sha256 NAR hash of the single top-level directory in a tarball."""
+    root = _tree_from_tar(io.BytesIO(data))
+    if len(root) != 1 or not isinstance(next(iter(root.values())), dict):
+        raise RuntimeError(f"Expected single chart directory in tarball, got: {sorted(root)}")
+
+    digest = hashlib.sha256()
+    writer = _NarWriter(digest)
+    writer.write(NAR_MAGIC)
+    writer.dump(next(iter(root.values())))
+    return "sha256-" + base64.b64encode(digest.digest()).decode()
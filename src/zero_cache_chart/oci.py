@@ -1,45 +1,153 @@
 from __future__ import annotations
 
-import os
-from datetime import datetime, timezone, timedelta
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
-import requests
+from zero_cache_chart.cache import ChartCache
+from zero_cache_chart.chart import sri_hash_bytes
+from zero_cache_chart.package import ChartArchive, build_chart_archive
+from zero_cache_chart.registry import client_for
+from zero_cache_chart.timing import span
 
-from zero_cache_chart.types import run
 
+HELM_CONFIG_MEDIA_TYPE = "application/vnd.cncf.helm.config.v1+json"
+HELM_CHART_MEDIA_TYPE = "application/vnd.cncf.helm.chart.content.v1.tar+gzip"
+OCI_MANIFEST_MEDIA_TYPE = "application/vnd.oci.image.manifest.v1+json"
 
-PackageVersion = dict[str, Any]
+
+def published_versions(registry: str, repo: str) -> set[str]:
+    """Every tag of the chart repository, listed once per run and updated by our own pushes."""
+    return client_for(registry).tag_set(f"{repo}/zero-cache")
 
 
 def version_exists_in_registry(registry: str, repo: str, version: str) -> bool:
     """Check if a chart version already exists in the OCI registry."""
-    result = run(
-        ["oras", "manifest", "fetch", f"{registry}/{repo}/zero-cache:{version}"],
-        check=False,
-    )
-    return result.returncode == 0
+    return version in published_versions(registry, repo)
+
+
+def package_chart(chart_dir: Path = Path(".")) -> ChartArchive:
+    return build_chart_archive(chart_dir)
+
+
+def _blob_descriptor(media_type: str, data: bytes) -> dict[str, Any]:
+    return {
+        "mediaType": media_type,
+        "digest": f"sha256:{hashlib.sha256(data).hexdigest()}",
+        "size": len(data),
+    }
+
+
+def chart_manifest(archive: ChartArchive) -> tuple[bytes, bytes]:
+    """Build the Helm OCI config blob and image manifest for a chart archive."""
+    config = json.dumps(archive.metadata, separators=(",", ":"), sort_keys=True).encode()
+    annotations = {
+        "org.opencontainers.image.title": archive.name,
+        "org.opencontainers.image.version": archive.version,
+    }
+    if archive.metadata.get("description"):
+        annotations["org.opencontainers.image.description"] = str(archive.metadata["description"])
+    manifest = {
+        "schemaVersion": 2,
+        "mediaType": OCI_MANIFEST_MEDIA_TYPE,
+        "config": _blob_descriptor(HELM_CONFIG_MEDIA_TYPE, config),
+        "layers": [_blob_descriptor(HELM_CHART_MEDIA_TYPE, archive.data)],
+        "annotations": annotations,
+    }
+    return config, json.dumps(manifest, separators=(",", ":")).encode()
+
+
+@dataclass
+class ChartRelease:
+    """Everything derived from one in-memory chart archive: the push payload,
+    the OCI layer digest and the Nix hash, so the chart is built exactly once."""
+
+    archive: ChartArchive
+    config: bytes
+    manifest: bytes
+
+    @property
+    def version(self) -> str:
+        return self.archive.version
+
+    @property
+    def layer_digest(self) -> str:
+        return self.archive.digest
+
+    @property
+    def manifest_digest(self) -> str:
+        return f"sha256:{hashlib.sha256(self.manifest).hexdigest()}"
+
+    @cached_property
+    def sri_hash(self) -> str:
+        return sri_hash_bytes(self.archive.data)
+
+
+def prepare_release(chart_dir: Path = Path("."), *, chart_yaml: str | None = None) -> ChartRelease:
+    with span("oci.package") as s:
+        archive = build_chart_archive(chart_dir, chart_yaml=chart_yaml)
+        s.bytes = len(archive.data)
+    config, manifest = chart_manifest(archive)
+    return ChartRelease(archive=archive, config=config, manifest=manifest)
+
+
+def push_chart(release: ChartRelease, registry: str, repo: str) -> None:
+    """Push a chart as a Helm OCI artifact, skipping blobs the registry already holds."""
+    client = client_for(registry)
+    name = f"{repo}/{release.archive.name}"
+    for data in (release.config, release.archive.data):
+        digest = f"sha256:{hashlib.sha256(data).hexdigest()}"
+        if not client.blob_exists(name, digest):
+            client.upload_blob(name, data, digest)
+    client.put_manifest(name, release.version, release.manifest, OCI_MANIFEST_MEDIA_TYPE)
 
 
-def package_chart(chart_dir: Path = Path(".")) -> Path:
-    result = run(["helm", "package", str(chart_dir)])
-    for line in result.stdout.split("\n"):
-        if line.endswith(".tgz"):
-            return Path(line.split(": ")[-1])
-    raise RuntimeError(f"Failed to find packaged chart in output: {result.stdout}")
+def published_layer_digest(registry: str, repo: str, version: str) -> str | None:
+    """Digest of the chart layer published under `version`, or None if not published."""
+    client = client_for(registry)
+    if not client.manifest_exists(f"{repo}/zero-cache", version):
+        return None
+    manifest, _ = client.get_manifest(f"{repo}/zero-cache", version)
+    return _chart_layer(manifest)
 
 
-def push_chart(package_path: Path, registry: str, repo: str) -> None:
-    run(["helm", "push", str(package_path), f"oci://{registry}/{repo}"])
+def published_manifest_digest(registry: str, repo: str, version: str) -> str | None:
+    """Manifest digest published under `version` (one HEAD), or None if not published."""
+    return client_for(registry).manifest_digest(f"{repo}/zero-cache", version)
 
 
 def tag_version(registry: str, repo: str, source_tag: str, target_tag: str) -> None:
-    run([
-        "oras", "tag",
-        f"{registry}/{repo}/zero-cache:{source_tag}",
-        target_tag,
-    ])
+    client = client_for(registry)
+    manifest, media_type = client.get_manifest(f"{repo}/zero-cache", source_tag)
+    client.put_manifest(f"{repo}/zero-cache", target_tag, manifest, media_type)
+
+
+def _check_published_content(registry: str, repo: str, release: ChartRelease) -> None:
+    """Raise RuntimeError if `release.version` is published with a different manifest.
+
+    Packaging is deterministic, so the same chart always has the same manifest digest.
+    """
+    published = published_manifest_digest(registry, repo, release.version)
+    if published is not None and published != release.manifest_digest:
+        raise RuntimeError(
+            f"Chart {release.version} is already published in {registry}/{repo} with different content "
+            f"({published}, local build {release.manifest_digest}); bump the chart version"
+        )
+
+
+def push_release_if_not_exists(registry: str, repo: str, release: ChartRelease) -> bool:
+    """Push a prepared release unless its version is already published. Returns True if pushed.
+
+    Raises RuntimeError if the published version has different content.
+    """
+    if version_exists_in_registry(registry, repo, release.version):
+        _check_published_content(registry, repo, release)
+        return False
+    push_chart(release, registry, repo)
+    return True
 
 
 def push_if_not_exists(
@@ -47,120 +155,59 @@ def push_if_not_exists(
     repo: str,
     version: str,
     chart_dir: Path = Path("."),
-) -> Path | None:
-    """Push chart if not already in registry. Returns package path if pushed, None otherwise."""
-    if version_exists_in_registry(registry, repo, version):
-        return None
-    package_path = package_chart(chart_dir)
-    push_chart(package_path, registry, repo)
-    return package_path
+) -> tuple[ChartRelease, bool]:
+    """Package the chart once and push it unless `version` is already published.
+
+    Returns the release and whether it was pushed. The release is returned
+    either way so callers can hash it instead of packaging the chart again;
+    if `version` is already published with different content, RuntimeError
+    is raised (see push_release_if_not_exists).
+    """
+    release = prepare_release(chart_dir)
+    if release.version != version:
+        raise ValueError(f"Chart in {chart_dir} is version {release.version}, expected {version}")
+    return release, push_release_if_not_exists(registry, repo, release)
+
+
+def _chart_layer(manifest: bytes) -> str | None:
+    for layer in json.loads(manifest).get("layers", []):
+        if layer.get("mediaType") == HELM_CHART_MEDIA_TYPE:
+            return layer["digest"]
+    return None
+
+
+def fetch_chart(
+    registry: str,
+    repo: str,
+    version: str,
+    *,
+    cache: ChartCache | None = None,
+) -> bytes:
+    """Return the published chart tarball, served from the local cache when possible.
+
+    Only a manifest HEAD is needed on a cache hit; the tarball is downloaded
+    (and verified against its layer digest) on a miss.
+    """
+    cache = cache or ChartCache()
+    client = client_for(registry)
+    name = f"{repo}/zero-cache"
+    manifest_digest = client.manifest_digest(name, version)
+    if manifest_digest is None:
+        raise RuntimeError(f"Chart {version} not found in {registry}/{name}")
+
+    data = cache.get(version, manifest_digest)
+    if data is None:
+        manifest, _ = client.get_manifest(name, manifest_digest)
+        layer = _chart_layer(manifest)
+        if layer is None:
+            raise RuntimeError(f"No Helm chart layer in {registry}/{name}:{version}")
+        data = client.get_blob(name, layer)
+        cache.put(version, manifest_digest, data)
+    return data
 
 
 def pull_chart(registry: str, repo: str, version: str, dest_dir: Path) -> Path:
     """Pull a published chart from the OCI registry. Returns the tarball path."""
-    run([
-        "helm", "pull",
-        f"oci://{registry}/{repo}/zero-cache",
-        "--version", version,
-        "--destination", str(dest_dir),
-    ])
-    return dest_dir / f"zero-cache-{version}.tgz"
-
-
-def _parse_package_versions(
-    versions: list[PackageVersion],
-) -> tuple[list[PackageVersion], list[PackageVersion]]:
-    tagged = [v for v in versions if v["metadata"]["container"]["tags"]]
-    untagged = [v for v in versions if not v["metadata"]["container"]["tags"]]
-    return tagged, untagged
-
-
-def list_package_versions(org: str, package_name: str) -> list[PackageVersion]:
-    """List all versions of a container package using GitHub API."""
-    token = os.environ.get("GITHUB_TOKEN", "")
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
-    # GHCR nests chart name under repo path (e.g. "zero-cache-chart/zero-cache").
-    # The GitHub API requires URL-encoding the slash.
-    encoded_name = package_name.replace("/", "%2F")
-    url: str | None = (
-        f"https://api.github.com/orgs/{org}/packages/container/{encoded_name}/versions"
-        f"?per_page=100"
-    )
-    all_versions: list[PackageVersion] = []
-
-    while url:
-        resp = requests.get(url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        all_versions.extend(resp.json())
-
-        link = resp.headers.get("Link", "")
-        url = None
-        for part in link.split(","):
-            if 'rel="next"' in part:
-                url = part.split(";")[0].strip().strip("<>")
-
-    return all_versions
-
-
-def delete_package_version(org: str, package_name: str, version_id: int) -> None:
-    token = os.environ.get("GITHUB_TOKEN", "")
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
-    encoded_name = package_name.replace("/", "%2F")
-    resp = requests.delete(
-        f"https://api.github.com/orgs/{org}/packages/container/{encoded_name}/versions/{version_id}",
-        headers=headers,
-        timeout=30,
-    )
-    resp.raise_for_status()
-
-
-def prune_untagged(
-    org: str,
-    package_name: str,
-    *,
-    max_age_days: int = 7,
-    prune_all: bool = False,
-    dry_run: bool = False,
-) -> int:
-    versions = list_package_versions(org, package_name)
-    _, untagged = _parse_package_versions(versions)
-
-    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
-    count = 0
-
-    for ver in untagged:
-        created = datetime.fromisoformat(ver["created_at"].replace("Z", "+00:00"))
-        if prune_all or created < cutoff:
-            if dry_run:
-                count += 1
-            else:
-                delete_package_version(org, package_name, ver["id"])
-                count += 1
-
-    return count
-
-
-def delete_all_versions(
-    org: str,
-    package_name: str,
-    *,
-    dry_run: bool = False,
-) -> int:
-    """Delete ALL package versions (tagged and untagged). One-time cleanup."""
-    versions = list_package_versions(org, package_name)
-    count = 0
-
-    for ver in versions:
-        if dry_run:
-            count += 1
-        else:
-            delete_package_version(org, package_name, ver["id"])
-            count += 1
-
-    return count
+    path = dest_dir / f"zero-cache-{version}.tgz"
+    path.write_bytes(fetch_chart(registry, repo, version))
+    return path
@@ -0,0 +1,183 @@
+"""Deterministic in-process chart packaging.
+
+Builds the same archive layout as `helm package` (every file under a
+`<chart name>/` prefix, filtered by .helmignore), but with sorted members and
+fixed metadata so identical inputs always produce an identical tarball.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import re
+import tarfile
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+# helm always skips hidden files under templates/
+_DEFAULT_IGNORES = ["templates/.?*"]
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern[str]:
+    """Translate a Go filepath.Match pattern; unlike fnmatch, `*` stops at `/`."""
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("^"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+@dataclass
+class _Rule:
+    regex: re.Pattern[str]
+    negate: bool
+    must_dir: bool
+    basename_only: bool
+
+    def matches(self, path: str) -> bool:
+        name = path.rsplit("/", 1)[-1] if self.basename_only else path
+        return self.regex.match(name) is not None
+
+
+@dataclass
+class HelmIgnore:
+    """`.helmignore` rules with helm's matching semantics.
+
+    Patterns without a slash match the basename, patterns with a slash match
+    the path relative to the chart root, and a trailing slash restricts a rule
+    to directories.
+    """
+
+    rules: list[_Rule] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, text: str) -> HelmIgnore:
+        rules: list[_Rule] = []
+        for line in [*text.splitlines(), *_DEFAULT_IGNORES]:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "**" in line:
+                raise ValueError(f"double-star (**) syntax is not supported: {line}")
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            must_dir = line.endswith("/")
+            line = line.rstrip("/")
+            basename_only = "/" not in line
+            rules.append(_Rule(_glob_to_regex(line.lstrip("/")), negate, must_dir, basename_only))
+        return cls(rules)
+
+    @classmethod
+    def load(cls, chart_dir: Path) -> HelmIgnore:
+        path = chart_dir / ".helmignore"
+        return cls.parse(path.read_text() if path.exists() else "")
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        for rule in self.rules:
+            # helm treats a negated rule as "ignore everything that doesn't match"
+            if rule.negate:
+                if (rule.must_dir and not is_dir) or not rule.matches(path):
+                    return True
+                continue
+            if rule.must_dir and not is_dir:
+                continue
+            if rule.matches(path):
+                return True
+        return False
+
+
+def chart_files(chart_dir: Path, ignore: HelmIgnore | None = None) -> list[str]:
+    """Relative paths of all files helm would package, in sorted order."""
+    ignore = ignore or HelmIgnore.load(chart_dir)
+    files: list[str] = []
+
+    def walk(directory: Path, prefix: str) -> None:
+        for entry in sorted(directory.iterdir(), key=lambda p: p.name):
+            rel = f"{prefix}{entry.name}"
+            is_dir = entry.is_dir()
+            if ignore.ignored(rel, is_dir):
+                continue
+            if is_dir:
+                walk(entry, f"{rel}/")
+            else:
+                files.append(rel)
+
+    walk(chart_dir, "")
+    return files
+
+
+@dataclass
+class ChartArchive:
+    name: str
+    version: str
+    metadata: dict[str, Any]
+    data: bytes
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}-{self.version}.tgz"
+
+    @cached_property
+    def digest(self) -> str:
+        """OCI content digest of the archive (the chart layer digest)."""
+        return f"sha256:{hashlib.sha256(self.data).hexdigest()}"
+
+
+def _tar_info(name: str, size: int) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    info.mtime = 0
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    return info
+
+
+def build_chart_archive(chart_dir: Path = Path("."), *, chart_yaml: str | None = None) -> ChartArchive:
+    """Package a chart directory into an in-memory .tgz.
+
+    `chart_yaml` replaces the on-disk Chart.yaml contents, for packaging a
+    version without rewriting the working tree.
+    """
+    chart_text = chart_yaml if chart_yaml is not None else (chart_dir / "Chart.yaml").read_text()
+    metadata = yaml.safe_load(chart_text)
+    name = str(metadata["name"])
+    version = str(metadata["version"])
+
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0, filename="") as gz:
+        with tarfile.open(fileobj=gz, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            for rel in chart_files(chart_dir):
+                if rel == "Chart.yaml":
+                    content = chart_text.encode()
+                else:
+                    content = (chart_dir / rel).read_bytes()
+                tar.addfile(_tar_info(f"{name}/{rel}", len(content)), io.BytesIO(content))
+
+    return ChartArchive(name=name, version=version, metadata=metadata, data=buf.getvalue())
@@ -0,0 +1,251 @@
+"""Minimal OCI Distribution API client.
+
+Covers the handful of registry operations the tool needs, sending requests
+through the shared transport (pooled connections, retries) and caching bearer
+tokens per repository scope so repeated calls within a run skip both process
+startup and the token exchange.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+from functools import cache
+from pathlib import Path
+from urllib.parse import urlencode, urljoin
+
+import requests
+
+from zero_cache_chart.timing import span
+from zero_cache_chart.transport import transport
+
+MANIFEST_ACCEPT = ", ".join([
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+])
+
+
+class RegistryError(Exception):
+    def __init__(self, method: str, url: str, status: int, body: str):
+        self.status = status
+        super().__init__(f"{method} {url} failed with status {status}: {body[:200]}")
+
+
+def _docker_credentials(registry: str) -> tuple[str, str] | None:
+    """Look up credentials stored by `docker login` (or docker/login-action).
+
+    Only inline `auths` entries are supported, not credential helpers. Falls
+    back to GITHUB_TOKEN for ghcr.io.
+    """
+    config_dir = os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker"
+    try:
+        config = json.loads((Path(config_dir) / "config.json").read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        config = {}
+    for key in (registry, f"https://{registry}"):
+        auth = config.get("auths", {}).get(key, {}).get("auth")
+        if auth:
+            user, _, password = base64.b64decode(auth).decode().partition(":")
+            return user, password
+    token = os.environ.get("GITHUB_TOKEN")
+    if registry == "ghcr.io" and token:
+        return "token", token
+    return None
+
+
+def _parse_challenge(header: str) -> tuple[str, dict[str, str]]:
+    scheme, _, params = header.partition(" ")
+    return scheme.lower(), dict(re.findall(r'(\w+)="([^"]*)"', params))
+
+
+class RegistryClient:
+    def __init__(
+        self,
+        registry: str,
+        *,
+        plain_http: bool = False,
+        credentials: tuple[str, str] | None = None,
+    ):
+        self.registry = registry
+        self.base_url = f"{'http' if plain_http else 'https'}://{registry}"
+        self.credentials = credentials if credentials is not None else _docker_credentials(registry)
+        self._tokens: dict[str, str] = {}
+        self._tag_sets: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _authenticate(self, challenge: str, scope: str) -> str | None:
+        scheme, params = _parse_challenge(challenge)
+        if scheme == "basic" and self.credentials:
+            return "Basic " + base64.b64encode(":".join(self.credentials).encode()).decode()
+        if scheme != "bearer" or "realm" not in params:
+            return None
+        query = {"scope": scope}
+        if "service" in params:
+            query["service"] = params["service"]
+        resp = transport().get(params["realm"], params=query, auth=self.credentials, timeout=30)
+        if not resp.ok:
+            raise RegistryError("GET", params["realm"], resp.status_code, resp.text)
+        data = resp.json()
+        token = data.get("token") or data.get("access_token")
+        return f"Bearer {token}" if token else None
+
+    def request(
+        self,
+        method: str,
+        repo: str,
+        path: str,
+        *,
+        actions: str = "pull",
+        headers: dict[str, str] | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send a request to /v2/<repo>/<path>, authenticating on a 401 challenge."""
+        url = path if path.startswith(("http://", "https://")) else f"{self.base_url}/v2/{repo}/{path}"
+        scope = f"repository:{repo}:{actions}"
+        headers = dict(headers or {})
+        with self._lock:
+            auth = self._tokens.get(scope)
+        if auth:
+            headers["Authorization"] = auth
+
+        with span("registry.request", method=method, url=url) as s:
+            resp = transport().request(method, url, headers=headers, timeout=30, **kwargs)
+            if resp.status_code == 401:
+                auth = self._authenticate(resp.headers.get("WWW-Authenticate", ""), scope)
+                if auth:
+                    with self._lock:
+                        self._tokens[scope] = auth
+                    headers["Authorization"] = auth
+                    s.retries += 1
+                    resp = transport().request(method, url, headers=headers, timeout=30, **kwargs)
+            s.bytes = len(kwargs.get("data") or b"") + len(resp.content)
+            s.attrs["status"] = resp.status_code
+        return resp
+
+    def _check(self, resp: requests.Response) -> requests.Response:
+        if not resp.ok:
+            raise RegistryError(resp.request.method or "", resp.url, resp.status_code, resp.text)
+        return resp
+
+    def manifest_digest(self, repo: str, reference: str) -> str | None:
+        """Resolve a reference to its manifest digest with a HEAD. None if missing."""
+        resp = self.request("HEAD", repo, f"manifests/{reference}", headers={"Accept": MANIFEST_ACCEPT})
+        if resp.status_code == 404:
+            return None
+        self._check(resp)
+        digest = resp.headers.get("Docker-Content-Digest")
+        if digest:
+            return digest
+        manifest, _ = self.get_manifest(repo, reference)
+        return f"sha256:{hashlib.sha256(manifest).hexdigest()}"
+
+    def manifest_exists(self, repo: str, reference: str) -> bool:
+        resp = self.request("HEAD", repo, f"manifests/{reference}", headers={"Accept": MANIFEST_ACCEPT})
+        if resp.status_code == 404:
+            return False
+        self._check(resp)
+        return True
+
+    def get_manifest(self, repo: str, reference: str) -> tuple[bytes, str]:
+        """Return the raw manifest and its media type."""
+        resp = self._check(
+            self.request("GET", repo, f"manifests/{reference}", headers={"Accept": MANIFEST_ACCEPT})
+        )
+        return resp.content, resp.headers.get("Content-Type", "")
+
+    def blob_exists(self, repo: str, digest: str) -> bool:
+        resp = self.request("HEAD", repo, f"blobs/{digest}")
+        if resp.status_code == 404:
+            return False
+        self._check(resp)
+        return True
+
+    def get_blob(self, repo: str, digest: str) -> bytes:
+        """Download a blob and verify it against its digest."""
+        data = self._check(self.request("GET", repo, f"blobs/{digest}")).content
+        algorithm, _, expected = digest.partition(":")
+        if hashlib.new(algorithm, data).hexdigest() != expected:
+            raise RegistryError("GET", f"{self.base_url}/v2/{repo}/blobs/{digest}", 200, "digest mismatch")
+        return data
+
+    def upload_blob(self, repo: str, data: bytes, digest: str) -> None:
+        """Monolithic blob upload: POST to open a session, then PUT the content."""
+        resp = self._check(self.request("POST", repo, "blobs/uploads/", actions="pull,push"))
+        location = urljoin(f"{self.base_url}/", resp.headers["Location"])
+        separator = "&" if "?" in location else "?"
+        self._check(self.request(
+            "PUT",
+            repo,
+            f"{location}{separator}{urlencode({'digest': digest})}",
+            actions="pull,push",
+            headers={"Content-Type": "application/octet-stream"},
+            data=data,
+        ))
+
+    def put_manifest(self, repo: str, reference: str, manifest: bytes, media_type: str) -> None:
+        self._check(self.request(
+            "PUT",
+            repo,
+            f"manifests/{reference}",
+            actions="pull,push",
+            headers={"Content-Type": media_type},
+            data=manifest,
+        ))
+        if not _is_digest(reference):
+            with self._lock:
+                if repo in self._tag_sets:
+                    self._tag_sets[repo].add(reference)
+
+    def list_tags(self, repo: str, *, page_size: int = 1000) -> list[str]:
+        """Every tag of `repo`, following `Link` pagination. Empty if the repository does not exist."""
+        tags: list[str] = []
+        path: str | None = f"tags/list?n={page_size}"
+        while path:
+            resp = self.request("GET", repo, path)
+            if resp.status_code == 404:
+                break
+            self._check(resp)
+            tags.extend(resp.json().get("tags") or [])
+            path = _next_link(resp.headers.get("Link", ""), self.base_url)
+        return tags
+
+    def tag_set(self, repo: str) -> set[str]:
+        """Tags of `repo`, listed once per client and kept current by `put_manifest`.
+
+        Treat the result as read-only; it is shared by every caller.
+        """
+        with self._lock:
+            tags = self._tag_sets.get(repo)
+        if tags is None:
+            listed = set(self.list_tags(repo))
+            with self._lock:
+                tags = self._tag_sets.setdefault(repo, listed)
+        return tags
+
+    def has_tag(self, repo: str, tag: str) -> bool:
+        """O(1) after the first call for `repo`: answered from `tag_set`."""
+        return tag in self.tag_set(repo)
+
+
+def _is_digest(reference: str) -> bool:
+    return ":" in reference
+
+
+def _next_link(header: str, base_url: str) -> str | None:
+    """Absolute URL of the `rel="next"` entry of a Link header, if any."""
+    for part in header.split(","):
+        if 'rel="next"' in part:
+            return urljoin(f"{base_url}/", part.split(";")[0].strip().strip("<>"))
+    return None
+
+
+@cache
+def client_for(registry: str) -> RegistryClient:
+    """Shared per-registry client, so tokens and connections are reused across calls."""
+    plain_http = registry.startswith(("localhost:", "127.0.0.1:"))
+    return RegistryClient(registry, plain_http=plain_http)
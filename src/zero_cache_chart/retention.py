@@ -0,0 +1,200 @@
+"""Retention policy for published chart versions.
+
+GHCR keeps every tagged chart version forever, so the package listing (and
+every client that walks it) only grows. A `RetentionPolicy` decides which
+tagged versions are worth keeping: the newest releases of each major.minor
+line, every version a git tag points at, and anything published recently.
+`plan_retention` applies it to a package listing; the rest can be deleted
+in bulk with `delete_versions`.
+
+Untagged versions and tags that are not semver are left alone; `prune`
+handles the former.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import requests
+from semver.version import Version
+
+from zero_cache_chart.github import PackageVersion
+from zero_cache_chart.registry import RegistryError, client_for
+from zero_cache_chart.transport import transport
+from zero_cache_chart.types import DEFAULT_CONCURRENCY
+from zero_cache_chart.versions import VersionIndex, iter_versions
+
+PAGE_SIZE = 100
+
+# Why a version was kept, in the order the rules are checked
+KEEP_GIT_TAG = "git tag"
+KEEP_LATEST = "latest patches"
+KEEP_RECENT = "recent"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Which tagged chart versions to keep; everything else may be deleted.
+
+    `keep_patches` stable releases are kept per major.minor line, so the
+    latest release of every line always survives. `keep_days=None` disables
+    the age rule.
+    """
+
+    keep_patches: int = 3
+    keep_days: int | None = 30
+    pinned: frozenset[Version] = frozenset()
+
+    def __post_init__(self) -> None:
+        if self.keep_patches < 1:
+            raise ValueError("keep_patches must be at least 1")
+
+
+def git_tag_versions(tags: Iterable[str]) -> frozenset[Version]:
+    """Chart versions referenced by release tags (`v1.2.3`)."""
+    return frozenset(iter_versions(tag.removeprefix("v") for tag in tags))
+
+
+def _package_semver(ver: PackageVersion) -> list[Version]:
+    return list(iter_versions(ver["metadata"]["container"]["tags"]))
+
+
+def _latest_patches(index: VersionIndex, keep: int) -> set[Version]:
+    kept: set[Version] = set()
+    for latest in index.latest_per_line():
+        start = Version(latest.major, latest.minor, 0)
+        line = index.range(start, start.bump_minor(), stable=True)
+        kept.update(line[-keep:])
+    return kept
+
+
+@dataclass
+class RetentionPlan:
+    """Tagged versions split into those to keep and those to delete.
+
+    `other` holds the versions the policy does not govern (untagged, or with
+    no semver tag). `reasons` maps each kept version id to the first rule
+    that kept it.
+    """
+
+    keep: list[PackageVersion] = field(default_factory=list)
+    delete: list[PackageVersion] = field(default_factory=list)
+    other: list[PackageVersion] = field(default_factory=list)
+    reasons: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def listed_before(self) -> int:
+        return len(self.keep) + len(self.delete) + len(self.other)
+
+    @property
+    def listed_after(self) -> int:
+        return len(self.keep) + len(self.other)
+
+    @staticmethod
+    def pages(count: int) -> int:
+        """Listing requests needed for `count` versions at the API's maximum page size."""
+        return max(1, -(-count // PAGE_SIZE))
+
+    def kept_by(self) -> dict[str, int]:
+        counts = dict.fromkeys((KEEP_GIT_TAG, KEEP_LATEST, KEEP_RECENT), 0)
+        for reason in self.reasons.values():
+            counts[reason] += 1
+        return counts
+
+
+def plan_retention(
+    versions: list[PackageVersion],
+    policy: RetentionPolicy,
+    *,
+    now: datetime | None = None,
+) -> RetentionPlan:
+    """Decide which package versions `policy` keeps.
+
+    A package version with several tags is kept if any of them is.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=policy.keep_days) if policy.keep_days is not None else None
+
+    governed = [(ver, semver) for ver in versions if (semver := _package_semver(ver))]
+    index = VersionIndex(v for _, semver in governed for v in semver)
+    latest = _latest_patches(index, policy.keep_patches)
+
+    plan = RetentionPlan(other=[ver for ver in versions if not _package_semver(ver)])
+    for ver, semver in governed:
+        if any(v in policy.pinned for v in semver):
+            reason = KEEP_GIT_TAG
+        elif any(v in latest for v in semver):
+            reason = KEEP_LATEST
+        elif cutoff is not None and datetime.fromisoformat(ver["created_at"].replace("Z", "+00:00")) >= cutoff:
+            reason = KEEP_RECENT
+        else:
+            plan.delete.append(ver)
+            continue
+        plan.keep.append(ver)
+        plan.reasons[ver["id"]] = reason
+    return plan
+
+
+@dataclass
+class StorageEstimate:
+    """Registry storage held by the governed versions, and what deleting the plan frees.
+
+    Blobs shared with a kept version are not counted as reclaimed. `unknown`
+    counts versions whose manifest could not be read.
+    """
+
+    before: int = 0
+    reclaimed: int = 0
+    unknown: int = 0
+
+
+def _manifest_blobs(registry: str, name: str, digest: str | None) -> dict[str, int] | None:
+    """Sizes of the manifest and every blob it references, by digest."""
+    if not digest:
+        return None
+    try:
+        manifest, _ = client_for(registry).get_manifest(name, digest)
+    except (RegistryError, requests.RequestException):
+        return None
+    data = json.loads(manifest)
+    blobs = {digest: len(manifest)}
+    for descriptor in [data.get("config", {}), *data.get("layers", [])]:
+        if "digest" in descriptor:
+            blobs[descriptor["digest"]] = descriptor.get("size", 0)
+    return blobs
+
+
+def estimate_storage(
+    registry: str,
+    name: str,
+    plan: RetentionPlan,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> StorageEstimate:
+    """Fetch the manifest of every governed version to size the plan's deletions.
+
+    `name` is the registry repository (`org/package`); package versions are
+    looked up by their manifest digest.
+    """
+    governed = plan.keep + plan.delete
+    transport().reserve(concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        manifests = list(pool.map(lambda ver: _manifest_blobs(registry, name, ver.get("name")), governed))
+
+    estimate = StorageEstimate()
+    kept: dict[str, int] = {}
+    deleted: dict[str, int] = {}
+    for i, blobs in enumerate(manifests):
+        if blobs is None:
+            estimate.unknown += 1
+        elif i < len(plan.keep):
+            kept.update(blobs)
+        else:
+            deleted.update(blobs)
+    estimate.before = sum({**kept, **deleted}.values())
+    estimate.reclaimed = sum(size for digest, size in deleted.items() if digest not in kept)
+    return estimate
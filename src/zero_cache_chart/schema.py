@@ -0,0 +1,266 @@
+"""values.schema.json generation and a compiled validator for it.
+
+The schema is derived from values.yaml: nested mappings become closed
+objects (so a misspelled key is an error), as do empty mappings whose
+subkeys the templates read (`url: {}` used as `.value`/`.valueFrom`);
+scalars keep the type of their default, and comments directly above a key
+become its description. The
+templates fill in what values.yaml cannot say: keys they read that have no
+default are allowed, and mappings they pass through `toYaml` (resources,
+affinity, securityContext, ...) accept anything.
+
+`compile_schema` turns the schema into a tree of closures once, so checking
+many values files costs one walk per file rather than a schema interpretation.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable
+from difflib import get_close_matches
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+SCHEMA_FILE = "values.schema.json"
+JSON_SCHEMA_DRAFT = "http://json-schema.org/draft-07/schema#"
+
+_VALUES_REF = re.compile(r"\.Values((?:\.\w+)+)")
+_TO_YAML = re.compile(r"toYaml\s+\.Values((?:\.\w+)+)")
+# `{{- with .Values.x }}` whose first action is `toYaml .`
+_WITH_TO_YAML = re.compile(r"with\s+\.Values((?:\.\w+)+)\s*-?\}\}[^{]*\{\{-?\s*toYaml\s+\.\s")
+_KEY_LINE = re.compile(r"^(\s*)([A-Za-z_][\w-]*):")
+
+# Kubernetes IntOrString fields: a count or a percentage
+_INT_OR_STRING = {"minAvailable", "maxUnavailable", "maxSurge"}
+
+_KeyPath = tuple[str, ...]
+
+
+def _template_paths(templates: list[str]) -> tuple[set[_KeyPath], set[_KeyPath]]:
+    """Values paths the templates read, and those they pass through verbatim."""
+    read: set[_KeyPath] = set()
+    passthrough: set[_KeyPath] = set()
+    for text in templates:
+        read.update(tuple(m.group(1)[1:].split(".")) for m in _VALUES_REF.finditer(text))
+        for pattern in (_TO_YAML, _WITH_TO_YAML):
+            passthrough.update(tuple(m.group(1)[1:].split(".")) for m in pattern.finditer(text))
+    return read, passthrough
+
+
+def _descriptions(values_text: str) -> dict[_KeyPath, str]:
+    """Comment lines directly above each key (same indentation, no blank line between)."""
+    out: dict[_KeyPath, str] = {}
+    stack: list[tuple[int, str]] = []
+    comments: list[str] = []
+    comment_indent = -1
+    for line in values_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            comments = []
+            continue
+        indent = len(line) - len(line.lstrip())
+        if stripped.startswith("#"):
+            if comments and indent != comment_indent:
+                comments = []
+            comment_indent = indent
+            comments.append(stripped.lstrip("#").strip())
+            continue
+        match = _KEY_LINE.match(line)
+        if match:
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            stack.append((indent, match.group(2)))
+            if comments and comment_indent == indent:
+                out[tuple(key for _, key in stack)] = " ".join(c for c in comments if c)
+        comments = []
+    return out
+
+
+def _scalar_schema(value: Any) -> dict[str, Any]:
+    if value is None:
+        return {}
+    if isinstance(value, bool):
+        return {"type": "boolean"}
+    if isinstance(value, int):
+        return {"type": "integer"}
+    if isinstance(value, float):
+        return {"type": "number"}
+    if isinstance(value, list):
+        return {"type": "array"}
+    return {"type": "string"}
+
+
+def _reads_below(path: _KeyPath, read: set[_KeyPath]) -> bool:
+    return any(len(ref) > len(path) and ref[:len(path)] == path for ref in read)
+
+
+def _node_schema(
+    value: Any,
+    path: _KeyPath,
+    read: set[_KeyPath],
+    passthrough: set[_KeyPath],
+    descriptions: dict[_KeyPath, str],
+) -> dict[str, Any]:
+    if path and path[-1] in _INT_OR_STRING and isinstance(value, int):
+        node: dict[str, Any] = {"type": ["integer", "string"]}
+    elif not isinstance(value, dict) or path in passthrough or not (value or _reads_below(path, read)):
+        node = {"type": "object"} if isinstance(value, dict) else _scalar_schema(value)
+    else:
+        # an empty default (`url: {}`) is closed too when the templates read known subkeys
+        properties = {
+            str(key): _node_schema(child, (*path, str(key)), read, passthrough, descriptions)
+            for key, child in value.items()
+        }
+        # keys the templates read without a default in values.yaml
+        for ref in read:
+            if len(ref) > len(path) and ref[:len(path)] == path and ref[len(path)] not in properties:
+                properties[ref[len(path)]] = {}
+        node = {
+            "type": "object",
+            "properties": dict(sorted(properties.items())),
+            "additionalProperties": False,
+        }
+    if path in descriptions:
+        node = {"description": descriptions[path], **node}
+    return node
+
+
+def generate_schema(chart_dir: Path) -> dict[str, Any]:
+    """Build the values schema from values.yaml and the chart templates."""
+    values_text = (chart_dir / "values.yaml").read_text()
+    values = yaml.safe_load(values_text) or {}
+    templates = [p.read_text() for p in sorted((chart_dir / "templates").glob("*")) if p.is_file()]
+    read, passthrough = _template_paths(templates)
+    schema = _node_schema(values, (), read, passthrough, _descriptions(values_text))
+    # helm passes `global` to every chart, whether or not it is used
+    schema["properties"].setdefault("global", {"type": "object"})
+    schema["properties"] = dict(sorted(schema["properties"].items()))
+    return {"$schema": JSON_SCHEMA_DRAFT, "title": "zero-cache chart values", **schema}
+
+
+def dump_schema(schema: dict[str, Any]) -> str:
+    return json.dumps(schema, indent=2) + "\n"
+
+
+# --- validation -----------------------------------------------------------------
+
+Validator = Callable[[Any, str, list[str]], None]
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+_SUPPORTED_KEYWORDS = {
+    "$schema", "title", "description", "type", "properties", "additionalProperties", "items", "required", "enum",
+}
+
+
+def _join(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def _compile(schema: dict[str, Any]) -> Validator:
+    unsupported = set(schema) - _SUPPORTED_KEYWORDS
+    if unsupported:
+        raise ValueError(f"Unsupported schema keyword(s): {', '.join(sorted(unsupported))}")
+
+    checks: list[Validator] = []
+
+    if "type" in schema:
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+        expected = " or ".join(types)
+
+        def check_type(value: Any, path: str, errors: list[str]) -> None:
+            if not any(check(value) for check in type_checks):
+                errors.append(f"{path or '<root>'}: expected {expected}, got {type(value).__name__}")
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+
+        def check_enum(value: Any, path: str, errors: list[str]) -> None:
+            if value not in allowed:
+                errors.append(f"{path or '<root>'}: {value!r} is not one of {allowed!r}")
+
+        checks.append(check_enum)
+
+    properties = {key: _compile(sub) for key, sub in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    extra = _compile(additional) if isinstance(additional, dict) else None
+    required = schema.get("required", [])
+    if properties or additional is not True or required:
+        known = sorted(properties)
+
+        def check_object(value: Any, path: str, errors: list[str]) -> None:
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(f"{_join(path, key)}: required")
+            for key, child in value.items():
+                validator = properties.get(key, extra)
+                if validator is not None:
+                    validator(child, _join(path, key), errors)
+                elif additional is False:
+                    hint = get_close_matches(str(key), known, n=1)
+                    suggestion = f" (did you mean {hint[0]!r}?)" if hint else ""
+                    errors.append(f"{_join(path, str(key))}: unknown key{suggestion}")
+
+        checks.append(check_object)
+
+    if isinstance(schema.get("items"), dict):
+        item = _compile(schema["items"])
+
+        def check_items(value: Any, path: str, errors: list[str]) -> None:
+            if isinstance(value, list):
+                for i, child in enumerate(value):
+                    item(child, f"{path}[{i}]", errors)
+
+        checks.append(check_items)
+
+    def validate(value: Any, path: str, errors: list[str]) -> None:
+        # helm drops null values when merging, so they never reach the schema
+        if value is None:
+            return
+        for check in checks:
+            check(value, path, errors)
+
+    return validate
+
+
+def compile_schema(schema: dict[str, Any]) -> Callable[[Any], list[str]]:
+    """Compile a schema into a function returning the errors for a values document.
+
+    Supports the JSON Schema subset `generate_schema` emits, plus `items`,
+    `required` and `enum`; other keywords raise ValueError.
+    """
+    validator = _compile(schema)
+
+    def validate(values: Any) -> list[str]:
+        errors: list[str] = []
+        validator(values if values is not None else {}, "", errors)
+        return errors
+
+    return validate
+
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def validate_values_file(validate: Callable[[Any], list[str]], path: Path) -> list[str]:
+    try:
+        values = yaml.load(path.read_text(), Loader=_Loader)
+    except yaml.YAMLError as e:
+        return [f"<root>: invalid YAML: {e}"]
+    return validate(values)
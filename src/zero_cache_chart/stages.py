@@ -0,0 +1,81 @@
+"""Run independent steps concurrently, as a small dependency graph.
+
+Each `Stage` names the stages whose results it needs; those results are
+passed to its function as keyword arguments. A stage starts as soon as all of
+its inputs are available, so the wall time of a graph is its critical path
+rather than the sum of its stages.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from zero_cache_chart.timing import span
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    func: Callable[..., Any]
+    needs: tuple[str, ...] = ()
+
+
+def _check_graph(stages: list[Stage]) -> None:
+    names = [stage.name for stage in stages]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate stage names: {', '.join(sorted(duplicates))}")
+    for stage in stages:
+        unknown = set(stage.needs) - set(names)
+        if unknown:
+            raise ValueError(f"Stage {stage.name} needs unknown stage(s): {', '.join(sorted(unknown))}")
+
+    resolved: set[str] = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if resolved.issuperset(stage.needs)]
+        if not ready:
+            raise ValueError(f"Stage dependency cycle among: {', '.join(s.name for s in remaining)}")
+        resolved.update(stage.name for stage in ready)
+        remaining = [stage for stage in remaining if stage.name not in resolved]
+
+
+def _run_stage(stage: Stage, inputs: dict[str, Any]) -> Any:
+    with span("stage", stage=stage.name):
+        return stage.func(**inputs)
+
+
+def run_stages(stages: Iterable[Stage], *, max_workers: int | None = None) -> dict[str, Any]:
+    """Run every stage once its dependencies finish; return results by stage name.
+
+    The first stage to raise stops scheduling: stages that have not started
+    are cancelled, running ones are waited for, and the exception propagates.
+    """
+    stages = list(stages)
+    _check_graph(stages)
+    results: dict[str, Any] = {}
+    pending = {stage.name: stage for stage in stages}
+    running: dict[Future[Any], Stage] = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if all(need in results for need in stage.needs):
+                    inputs = {need: results[need] for need in stage.needs}
+                    running[pool.submit(_run_stage, stage, inputs)] = stage
+                    del pending[name]
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                results[stage.name] = future.result()
+
+    return results
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from zero_cache_chart.cache import read_json, write_json
+from zero_cache_chart.chart import read_chart_nix_version
+from zero_cache_chart.docker import DockerTag
+
+
+@dataclass(frozen=True)
+class RunFingerprint:
+    """Everything an `update` run's outcome depends on.
+
+    If the fingerprint taken at the start of a run equals the one recorded at
+    the end of the last successful run, and the registry still serves the
+    manifest that run published, the run has nothing to do.
+    """
+
+    chart_yaml_sha256: str
+    chart_nix_version: str | None
+    upstream_tag: str | None
+    upstream_digest: str | None
+    upstream_updated: str | None
+    # Manifest digest of the chart version in the registry, recorded at the end of a run
+    oci_manifest_digest: str | None = None
+
+    @classmethod
+    def capture(cls, chart: Path, newest_tag: DockerTag | None) -> RunFingerprint:
+        """Fingerprint the local chart state and the most recently updated upstream tag."""
+        nix_path = chart.parent / "chart.nix"
+        newest_tag = newest_tag or {}
+        return cls(
+            chart_yaml_sha256=hashlib.sha256(chart.read_bytes()).hexdigest(),
+            chart_nix_version=read_chart_nix_version(nix_path) if nix_path.exists() else None,
+            upstream_tag=newest_tag.get("name"),
+            upstream_digest=newest_tag.get("digest"),
+            upstream_updated=newest_tag.get("last_updated"),
+        )
+
+    def unchanged_since(self, saved: RunFingerprint | None, manifest_digest: Callable[[], str | None]) -> bool:
+        """True if `saved` matches this run and its manifest is still published.
+
+        `manifest_digest` (one registry HEAD) is only called once everything
+        local and upstream matched, so a chart version deleted from the
+        registry by `retain`, `cleanup-all` or by hand makes the run go ahead
+        and push it again.
+        """
+        if saved is None or saved.oci_manifest_digest is None:
+            return False
+        if dataclasses.replace(self, oci_manifest_digest=saved.oci_manifest_digest) != saved:
+            return False
+        return manifest_digest() == saved.oci_manifest_digest
+
+
+def load_fingerprint(path: Path) -> RunFingerprint | None:
+    data = read_json(path)
+    if not isinstance(data, dict):
+        return None
+    try:
+        return RunFingerprint(**data)
+    except TypeError:
+        return None
+
+
+def save_fingerprint(path: Path, fingerprint: RunFingerprint) -> None:
+    write_json(path, dataclasses.asdict(fingerprint))
@@ -0,0 +1,153 @@
+"""Timing spans around external calls, exportable as a JSON trace or OpenMetrics.
+
+Spans are always added to per-name totals (the overhead is a couple of
+clock reads per external call). Individual spans, needed only for the JSON
+trace, are kept only when `--profile-out` asks for one, so a long run does
+not hold one span per request.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class Span:
+    name: str
+    attrs: dict[str, Any] = field(default_factory=dict)
+    start: float = 0.0
+    duration: float = 0.0
+    bytes: int = 0
+    retries: int = 0
+    error: str | None = None
+    thread: int = 0
+
+
+class Recorder:
+    def __init__(self, *, keep_spans: bool = False) -> None:
+        self.keep_spans = keep_spans
+        self.spans: list[Span] = []
+        self.started = time.time()
+        self._totals: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            entry = self._totals.setdefault(
+                span.name, {"count": 0, "seconds": 0.0, "bytes": 0, "retries": 0, "errors": 0}
+            )
+            entry["count"] += 1
+            entry["seconds"] += span.duration
+            entry["bytes"] += span.bytes
+            entry["retries"] += span.retries
+            entry["errors"] += span.error is not None
+            if self.keep_spans:
+                self.spans.append(span)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Per span name: call count, total seconds, bytes, retries and errors."""
+        with self._lock:
+            return {name: dict(entry) for name, entry in sorted(self._totals.items())}
+
+    def to_trace(self) -> dict[str, Any]:
+        """Chrome trace-event JSON (loadable in Perfetto or chrome://tracing) plus a summary.
+
+        The events are empty unless the recorder was created with `keep_spans`.
+        """
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": round((span.start - self.started) * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": os.getpid(),
+                "tid": span.thread,
+                "args": {
+                    **span.attrs,
+                    "bytes": span.bytes,
+                    "retries": span.retries,
+                    **({"error": span.error} if span.error else {}),
+                },
+            }
+            for span in self.spans
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "summary": self.summary(),
+            "wallSeconds": time.time() - self.started,
+        }
+
+    def to_openmetrics(self) -> str:
+        summary = self.summary()
+        metrics = [
+            ("spans", "count", "External calls made"),
+            ("span_seconds", "seconds", "Time spent in external calls"),
+            ("span_bytes", "bytes", "Bytes transferred by external calls"),
+            ("span_retries", "retries", "Retries made by external calls"),
+            ("span_errors", "errors", "External calls that raised"),
+        ]
+        lines: list[str] = []
+        for metric, key, help_text in metrics:
+            name = f"zero_cache_chart_{metric}"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"# HELP {name} {help_text}.")
+            for span_name, entry in summary.items():
+                lines.append(f'{name}_total{{span="{span_name}"}} {entry[key]:g}')
+        lines.append("# TYPE zero_cache_chart_run_seconds gauge")
+        lines.append("# HELP zero_cache_chart_run_seconds Wall-clock duration of the run.")
+        lines.append(f"zero_cache_chart_run_seconds {time.time() - self.started:g}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, trace_path: Path) -> Path:
+        """Write the JSON trace to `trace_path` and OpenMetrics next to it. Returns the metrics path."""
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        trace_path.write_text(json.dumps(self.to_trace(), indent=2))
+        metrics_path = trace_path.with_suffix(".prom")
+        metrics_path.write_text(self.to_openmetrics())
+        return metrics_path
+
+
+recorder = Recorder()
+
+
+def reset(*, keep_spans: bool = False) -> Recorder:
+    global recorder
+    recorder = Recorder(keep_spans=keep_spans)
+    return recorder
+
+
+_active = threading.local()
+
+
+def current_span() -> Span | None:
+    """Innermost span open in this thread, so helpers can attribute retries to their caller."""
+    stack = getattr(_active, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """Time a block; callers may set `bytes` and `retries` on the yielded span."""
+    current = Span(name=name, attrs=attrs, start=time.time(), thread=threading.get_ident())
+    stack = _active.__dict__.setdefault("stack", [])
+    stack.append(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        stack.pop()
+        recorder.add(current)
@@ -0,0 +1,193 @@
+"""Shared HTTP transport: pooled keep-alive sessions, retries and a circuit breaker per host.
+
+Every client (Docker Hub, the GitHub packages API, OCI registries) sends its
+requests through `transport()`, so a long pagination reuses one connection
+pool per host instead of paying a TLS handshake per page.
+
+Idempotent requests are retried on connection errors, timeouts, 429 and 5xx,
+with full-jitter exponential backoff; a `Retry-After` header overrides the
+backoff. Retries are added to the enclosing timing span. After
+`failure_threshold` consecutive failed requests to a host its circuit opens
+and requests fail fast with `CircuitOpenError` until `reset_after` seconds
+have passed; then a single probe request decides whether it closes again.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import cache
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from zero_cache_chart.timing import current_span
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+# Connections kept per host; wider fan-outs (--concurrency, --jobs) call `reserve`.
+DEFAULT_POOL_SIZE = 16
+
+# Tests replace this to retry without waiting.
+_sleep = time.sleep
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """A host failed repeatedly; the request was not sent."""
+
+
+@dataclass
+class _Circuit:
+    failures: int = 0
+    opened_at: float | None = None
+    probing: bool = False
+
+
+def _retry_after(resp: requests.Response) -> float | None:
+    """Seconds to wait from a `Retry-After` header (delta-seconds or an HTTP date)."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class Transport:
+    def __init__(
+        self,
+        *,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_retry_after: float = 120.0,
+        failure_threshold: int = 5,
+        reset_after: float = 30.0,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.pool_size = pool_size
+        self._sessions: dict[str, requests.Session] = {}
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def session(self, url: str) -> requests.Session:
+        """The keep-alive session for the scheme and host of `url`."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount(f"{parts.scheme}://", adapter)
+                self._sessions[origin] = session
+        return session
+
+    def reserve(self, connections: int) -> None:
+        """Grow every host's pool to `connections`, before fanning out over that many workers.
+
+        Otherwise urllib3 discards the connections that do not fit back into
+        the pool ("Connection pool is full") and the next request opens a new one.
+        """
+        with self._lock:
+            if connections <= self.pool_size:
+                return
+            self.pool_size = connections
+            for origin, session in self._sessions.items():
+                scheme = urlsplit(origin).scheme
+                session.mount(f"{scheme}://", HTTPAdapter(pool_connections=1, pool_maxsize=connections))
+
+    def _admit(self, host: str) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if circuit.opened_at is None:
+                return
+            if circuit.probing or time.monotonic() - circuit.opened_at < self.reset_after:
+                raise CircuitOpenError(f"Circuit open for {host} after {circuit.failures} consecutive failures")
+            circuit.probing = True
+
+    def _record(self, host: str, failed: bool) -> None:
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if not failed:
+                self._circuits[host] = _Circuit()
+                return
+            circuit.failures += 1
+            if circuit.probing or circuit.failures >= self.failure_threshold:
+                circuit.opened_at = time.monotonic()
+                circuit.probing = False
+
+    def _delay(self, attempt: int, resp: requests.Response | None) -> float | None:
+        """How long to wait before retry `attempt`, or None to give up."""
+        if attempt >= self.retries:
+            return None
+        if resp is not None:
+            retry_after = _retry_after(resp)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request, retrying transient failures of idempotent methods.
+
+        Raises CircuitOpenError without sending if the host's circuit is open.
+        The last response is returned even if its status is an error.
+        """
+        host = urlsplit(url).netloc
+        retryable = method.upper() in IDEMPOTENT_METHODS
+        self._admit(host)
+        # Recorded however the request ends, so an unexpected error in a probe cannot leave it pending
+        failed = True
+        try:
+            attempt = 0
+            while True:
+                resp: requests.Response | None = None
+                try:
+                    resp = self.session(url).request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if not retryable or (delay := self._delay(attempt, None)) is None:
+                        raise
+                else:
+                    if not retryable or resp.status_code not in RETRY_STATUSES or (
+                        delay := self._delay(attempt, resp)
+                    ) is None:
+                        failed = resp.status_code >= 500
+                        return resp
+                    resp.close()
+
+                span = current_span()
+                if span is not None:
+                    span.retries += 1
+                _sleep(delay)
+                attempt += 1
+        finally:
+            self._record(host, failed=failed)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+
+@cache
+def transport() -> Transport:
+    """Process-wide transport, so connection pools and circuit state are shared by every client."""
+    return Transport()
@@ -3,6 +3,11 @@ from __future__ import annotations
 import subprocess
 from dataclasses import dataclass, field
 
+from zero_cache_chart.timing import span
+
+# Parallel requests for bulk registry and GitHub API operations.
+DEFAULT_CONCURRENCY = 8
+
 
 @dataclass
 class CommandResult:
@@ -20,8 +25,10 @@ class CommandError(Exception):
         )
 
 
-def run(cmd: list[str], *, check: bool = True) -> CommandResult:
-    proc = subprocess.run(cmd, capture_output=True, text=True)
+def run(cmd: list[str], *, check: bool = True, input: str | None = None) -> CommandResult:
+    with span("run", command=cmd[0]) as s:
+        proc = subprocess.run(cmd, capture_output=True, text=True, input=input)
+        s.bytes = len(proc.stdout)
     result = CommandResult(
         stdout=proc.stdout.strip(),
         stderr=proc.stderr.strip(),
@@ -38,3 +45,19 @@ class VersionManagementResult:
     created_tags: list[str] = field(default_factory=list)
     pushed_oci_packages: list[str] = field(default_factory=list)
     current_version: str | None = None
+
+
+@dataclass
+class DeletionResult:
+    """Outcome of a bulk deletion. In dry-run mode `deleted` counts what would be deleted.
+
+    Only failures are kept per version, so the result stays small however
+    many versions a prune walks through.
+    """
+
+    deleted: int = 0
+    failed: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def attempted(self) -> int:
+        return self.deleted + len(self.failed)
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import re
+from bisect import bisect_left, insort
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
 from semver.version import Version
 
+# Cheap shape check run before semver parsing: rejects tags like "latest",
+# "0.26" or "sha-1a2b3c" without building a Version or raising.
+_SEMVER_PREFILTER = re.compile(r"(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)\.(?:0|[1-9]\d*)(?:[-+][0-9A-Za-z.+-]+)?")
+
 
 def is_stable(version: Version) -> bool:
     return version.prerelease is None
@@ -16,6 +25,179 @@ def build_version_map(versions: list[Version]) -> dict[str, Version]:
     return vmap
 
 
+def iter_versions(tags: Iterable[str]) -> Iterator[Version]:
+    """Yield the semver tags among `tags`, in input order."""
+    for tag in tags:
+        if not _SEMVER_PREFILTER.fullmatch(tag):
+            continue
+        try:
+            yield Version.parse(tag)
+        except ValueError:
+            continue
+
+
+@dataclass
+class VersionSummary:
+    """Streaming reduction of a tag history down to what `update` needs.
+
+    Feed versions in any order with `add`; only the latest stable release
+    overall and the latest stable release of each major.minor line are kept,
+    so memory is bounded by the number of release lines, not tags.
+    """
+
+    count: int = 0
+    latest_stable: Version | None = None
+    stable_by_minor: dict[str, Version] = field(default_factory=dict)
+
+    def add(self, version: Version) -> None:
+        self.count += 1
+        if not is_stable(version):
+            return
+        if self.latest_stable is None or version > self.latest_stable:
+            self.latest_stable = version
+        mm = f"{version.major}.{version.minor}"
+        current = self.stable_by_minor.get(mm)
+        if current is None or version > current:
+            self.stable_by_minor[mm] = version
+
+    def missing_since(self, current: Version | None) -> list[Version]:
+        """Latest stable release of every major.minor line newer than `current`, ascending."""
+        return sorted(v for v in self.stable_by_minor.values() if current is None or v > current)
+
+
+def summarize_versions(versions: Iterable[Version]) -> VersionSummary:
+    summary = VersionSummary()
+    for version in versions:
+        summary.add(version)
+    return summary
+
+
+# A prerelease identifier: `(0, n)` for numeric ones, `(1, s)` for alphanumeric ones
+_PrereleasePart = tuple[int, int | str]
+# (major, minor, patch, is_release, prerelease identifiers)
+VersionKey = tuple[int, int, int, int, tuple[_PrereleasePart, ...]]
+
+
+def version_key(version: Version) -> VersionKey:
+    """Tuple that sorts in semver precedence order (build metadata is ignored).
+
+    Releases are `(major, minor, patch, 1, ())`; prereleases are
+    `(major, minor, patch, 0, identifiers)`, with numeric identifiers encoded
+    as `(0, n)` so they sort below alphanumeric ones, encoded as `(1, s)`.
+    """
+    if version.prerelease is None:
+        return (version.major, version.minor, version.patch, 1, ())
+    parts = tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in version.prerelease.split(".")
+    )
+    return (version.major, version.minor, version.patch, 0, parts)
+
+
+def key_version(key: VersionKey) -> Version:
+    """The `Version` a key was made from, without its build metadata."""
+    major, minor, patch, is_release, parts = key
+    prerelease = None if is_release else ".".join(str(part) for _, part in parts)
+    return Version(major, minor, patch, prerelease=prerelease)
+
+
+def _breaking_boundary(version: Version) -> tuple[int, ...]:
+    """Smallest key prefix of a breaking upgrade from `version`: the next major, or the next minor before 1.0."""
+    if version.major == 0:
+        return (0, version.minor + 1)
+    return (version.major + 1,)
+
+
+class VersionIndex:
+    """Sorted, de-duplicated versions with logarithmic-time lookups.
+
+    Only keys from `version_key` are stored (plain tuples: integers, plus the
+    strings of alphanumeric prerelease identifiers), in sorted arrays (all
+    versions, and stable releases only) searched with `bisect`; queries build a
+    `Version` for what they return, without build metadata. `insert` keeps
+    the arrays sorted, so one index can be built once and extended as tags
+    arrive.
+    """
+
+    def __init__(self, versions: Iterable[Version] = ()):
+        self._keys: list[VersionKey] = []
+        self._stable_keys: list[VersionKey] = []
+        for key in sorted(map(version_key, versions)):
+            if self._keys and self._keys[-1] == key:
+                continue
+            self._keys.append(key)
+            if key[3]:
+                self._stable_keys.append(key)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[Version]:
+        return map(key_version, self._keys)
+
+    def __contains__(self, version: object) -> bool:
+        if not isinstance(version, Version):
+            return False
+        key = version_key(version)
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def insert(self, version: Version) -> bool:
+        """Add a version; returns False if an equal version was already indexed."""
+        key = version_key(version)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return False
+        self._keys.insert(i, key)
+        if key[3]:
+            insort(self._stable_keys, key)
+        return True
+
+    def _keys_for(self, stable: bool) -> list[VersionKey]:
+        return self._stable_keys if stable else self._keys
+
+    def latest_stable(self) -> Version | None:
+        return key_version(self._stable_keys[-1]) if self._stable_keys else None
+
+    def latest_in_line(self, major: int, minor: int, *, stable: bool = True) -> Version | None:
+        """Highest version of the `major.minor` line, or None if the line has none."""
+        keys = self._keys_for(stable)
+        i = bisect_left(keys, (major, minor + 1)) - 1
+        if i >= 0 and keys[i][:2] == (major, minor):
+            return key_version(keys[i])
+        return None
+
+    def range(
+        self,
+        lower: Version | None = None,
+        upper: Version | None = None,
+        *,
+        stable: bool = False,
+    ) -> list[Version]:
+        """Versions `v` with `lower <= v < upper`, ascending; either bound may be omitted."""
+        keys = self._keys_for(stable)
+        start = bisect_left(keys, version_key(lower)) if lower is not None else 0
+        end = bisect_left(keys, version_key(upper)) if upper is not None else len(keys)
+        return [key_version(key) for key in keys[start:end]]
+
+    def next_breaking(self, version: Version) -> Version | None:
+        """First stable release that would be a breaking upgrade from `version`."""
+        i = bisect_left(self._stable_keys, _breaking_boundary(version))
+        return key_version(self._stable_keys[i]) if i < len(self._stable_keys) else None
+
+    def latest_per_line(self, *, stable: bool = True) -> list[Version]:
+        """Highest version of every major.minor line, ascending."""
+        keys = self._keys_for(stable)
+        out: list[Version] = []
+        i = len(keys)
+        while i > 0:
+            major, minor = keys[i - 1][:2]
+            out.append(key_version(keys[i - 1]))
+            i = bisect_left(keys, (major, minor), 0, i - 1)
+        out.reverse()
+        return out
+
+
 def get_latest_stable(versions: list[Version]) -> Version | None:
     """Return the latest stable (non-prerelease) version."""
     stable = [v for v in versions if is_stable(v)]
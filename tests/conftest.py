@@ -0,0 +1,134 @@
+import hashlib
+import json
+import re
+
+import pytest
+import responses
+from zero_cache_chart import transport
+from zero_cache_chart.registry import client_for
+
+MANIFEST_TYPE = "application/vnd.oci.image.manifest.v1+json"
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(monkeypatch, tmp_path_factory):
+    """Keep on-disk caches out of the user's home directory."""
+    monkeypatch.setenv("ZERO_CACHE_CHART_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry_clients():
+    """Drop registry clients (and their cached tokens) between tests."""
+    client_for.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_transport(monkeypatch):
+    """Start every test with closed circuits, and retry without waiting."""
+    transport.transport.cache_clear()
+    monkeypatch.setattr(transport, "_sleep", lambda seconds: None)
+
+
+class FakeRegistry:
+    """Token-authenticated stand-in for a registry's /v2 manifest and blob endpoints."""
+
+    def __init__(self, rsps: responses.RequestsMock, host: str = "registry.test"):
+        self.host = host
+        self.manifests: dict[tuple[str, str], bytes] = {}
+        self.blobs: dict[tuple[str, str], bytes] = {}
+        self.token_requests = 0
+        self.uploads = 0
+        self.blob_downloads = 0
+        self.tag_list_requests = 0
+        rsps.add_callback(responses.GET, f"https://{host}/token", callback=self._token)
+        manifests = re.compile(rf"https://{host}/v2/(.+)/manifests/([^/]+)")
+        for method in (responses.HEAD, responses.GET, responses.PUT):
+            rsps.add_callback(method, manifests, callback=self._manifest)
+        blobs = re.compile(rf"https://{host}/v2/(.+)/blobs/(sha256:[0-9a-f]+)")
+        for method in (responses.HEAD, responses.GET):
+            rsps.add_callback(method, blobs, callback=self._blob)
+        rsps.add_callback(responses.GET, re.compile(rf"https://{host}/v2/(.+)/tags/list.*"), callback=self._tags)
+        uploads = re.compile(rf"https://{host}/v2/(.+)/blobs/uploads/.*")
+        rsps.add_callback(responses.POST, uploads, callback=self._upload)
+        rsps.add_callback(responses.PUT, uploads, callback=self._upload)
+
+    def _token(self, request):
+        self.token_requests += 1
+        scope = request.params["scope"]
+        return 200, {}, json.dumps({"token": f"token-for:{scope}"})
+
+    def _authorized(self, request) -> bool:
+        return request.headers.get("Authorization", "").startswith("Bearer token-for:")
+
+    def _challenge(self):
+        challenge = f'Bearer realm="https://{self.host}/token",service="{self.host}"'
+        return 401, {"WWW-Authenticate": challenge}, ""
+
+    def _manifest(self, request):
+        if not self._authorized(request):
+            return self._challenge()
+        path = request.path_url.removeprefix("/v2/")
+        repo, _, reference = path.rpartition("/manifests/")
+        if request.method == "PUT":
+            assert request.headers["Authorization"].endswith(",push")
+            self.manifests[(repo, reference)] = request.body
+            digest = f"sha256:{hashlib.sha256(request.body).hexdigest()}"
+            self.manifests[(repo, digest)] = request.body
+            return 201, {}, ""
+        body = self.manifests.get((repo, reference))
+        if body is None:
+            return 404, {}, ""
+        headers = {
+            "Content-Type": MANIFEST_TYPE,
+            "Docker-Content-Digest": f"sha256:{hashlib.sha256(body).hexdigest()}",
+        }
+        return 200, headers, b"" if request.method == "HEAD" else body
+
+    def _tags(self, request):
+        if not self._authorized(request):
+            return self._challenge()
+        self.tag_list_requests += 1
+        repo = request.path_url.removeprefix("/v2/").split("/tags/list")[0]
+        tags = sorted(ref for r, ref in self.manifests if r == repo and not ref.startswith("sha256:"))
+        if not tags:
+            return 404, {}, json.dumps({"errors": [{"code": "NAME_UNKNOWN"}]})
+        n = int(request.params.get("n", len(tags)))
+        last = request.params.get("last")
+        remaining = [t for t in tags if last is None or t > last]
+        page = remaining[:n]
+        headers = {}
+        if len(remaining) > n:
+            headers["Link"] = f'</v2/{repo}/tags/list?n={n}&last={page[-1]}>; rel="next"'
+        return 200, headers, json.dumps({"name": repo, "tags": page})
+
+    def _blob(self, request):
+        if not self._authorized(request):
+            return self._challenge()
+        path = request.path_url.removeprefix("/v2/")
+        repo, _, digest = path.rpartition("/blobs/")
+        body = self.blobs.get((repo, digest))
+        if body is None:
+            return 404, {}, ""
+        if request.method == "HEAD":
+            return 200, {}, b""
+        self.blob_downloads += 1
+        return 200, {}, body
+
+    def _upload(self, request):
+        if not self._authorized(request):
+            return self._challenge()
+        path = request.path_url.removeprefix("/v2/")
+        repo = path.split("/blobs/uploads/")[0]
+        if request.method == "POST":
+            return 202, {"Location": f"/v2/{repo}/blobs/uploads/session-1?state=abc"}, ""
+        digest = request.params["digest"]
+        assert digest == f"sha256:{hashlib.sha256(request.body).hexdigest()}"
+        self.blobs[(repo, digest)] = request.body
+        self.uploads += 1
+        return 201, {}, ""
+
+
+@pytest.fixture
+def registry():
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        yield FakeRegistry(rsps)
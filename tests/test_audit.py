@@ -0,0 +1,109 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from zero_cache_chart.audit import Finding, _packaged_chart_yaml, audit_releases
+from zero_cache_chart.git import Git
+from zero_cache_chart.oci import prepare_release, push_chart
+
+from tests.test_git import init_repo
+
+NIX = 'repo = "oci://registry.test/org/chart";\nversion = "{version}";\nchartHash = "{hash}";\n'
+
+
+def _chart_yaml(version: str, app_version: str) -> str:
+    return f"apiVersion: v2\nname: zero-cache\nversion: {version}\nappVersion: {app_version}\n"
+
+
+def _release(repo: Path, version: str, app_version: str, *, push: bool = True, nix_hash: str | None = None) -> None:
+    """Commit Chart.yaml (and chart.nix) for `version`, tag it, and optionally publish it."""
+    (repo / "Chart.yaml").write_text(_chart_yaml(version, app_version))
+    if push:
+        release = prepare_release(repo)
+        push_chart(release, "registry.test", "org/chart")
+        (repo / "chart.nix").write_text(NIX.format(version=version, hash=nix_hash or release.sri_hash))
+    subprocess.run(["git", "add", "-A"], cwd=repo, check=True, capture_output=True)
+    subprocess.run(["git", "commit", "-m", version], cwd=repo, check=True, capture_output=True)
+    Git(cwd=repo).create_tag(f"v{version}")
+
+
+def test_packaged_chart_yaml(tmp_path: Path):
+    (tmp_path / "Chart.yaml").write_text(_chart_yaml("1.2.3", "0.26.0"))
+    metadata = _packaged_chart_yaml(prepare_release(tmp_path).archive.data)
+    assert (metadata["version"], metadata["appVersion"]) == ("1.2.3", "0.26.0")
+
+
+def test_clean_release_history_has_no_findings(tmp_path: Path, registry, monkeypatch):
+    repo = init_repo(tmp_path)
+    monkeypatch.chdir(repo)
+    _release(repo, "1.0.0", "0.1.0")
+    _release(repo, "1.0.1", "0.2.0")
+
+    report = audit_releases("registry.test", "org/chart", Path("Chart.yaml"), jobs=4)
+    assert report.ok, report.findings
+    assert (report.git_tags, report.published) == (2, 2)
+
+
+def test_reports_drift_between_git_registry_and_chart_files(tmp_path: Path, registry, monkeypatch):
+    repo = init_repo(tmp_path)
+    monkeypatch.chdir(repo)
+    _release(repo, "1.0.0", "0.1.0")
+    _release(repo, "1.0.1", "0.2.0", nix_hash="sha256-stale")
+    # published with 0.3.0, but the tagged Chart.yaml says 0.3.1
+    (repo / "Chart.yaml").write_text(_chart_yaml("1.0.2", "0.3.0"))
+    push_chart(prepare_release(repo), "registry.test", "org/chart")
+    _release(repo, "1.0.2", "0.3.1", push=False)
+    _release(repo, "1.0.3", "0.4.0", push=False)
+    registry.manifests[("org/chart/zero-cache", "0.9.0")] = b"{}"
+
+    report = audit_releases("registry.test", "org/chart", Path("Chart.yaml"), jobs=4)
+
+    subjects = [(f.subject, f.message.split(" ")[0]) for f in report.findings]
+    assert sorted(subjects) == [
+        ("0.9.0", "published"),
+        ("Chart.yaml", "version"),
+        ("v1.0.1", "chart.nix"),
+        ("v1.0.2", "Chart.yaml"),
+        ("v1.0.3", "git"),
+    ]
+    assert Finding("v1.0.3", "git tag has no OCI artifact") in report.findings
+    assert Finding("Chart.yaml", "version 1.0.3 is not published") in report.findings
+    assert registry.tag_list_requests == 1
+
+
+def test_resolves_chart_path_against_the_repository_root(tmp_path: Path, registry, monkeypatch):
+    (tmp_path / "repo").mkdir()
+    repo = init_repo(tmp_path / "repo")
+    (repo / "chart").mkdir()
+    monkeypatch.chdir(repo / "chart")
+    # published with 0.1.0, but the tagged chart/Chart.yaml says 0.1.1
+    (repo / "chart" / "Chart.yaml").write_text(_chart_yaml("1.0.0", "0.1.0"))
+    push_chart(prepare_release(repo / "chart"), "registry.test", "org/chart")
+    _release(repo / "chart", "1.0.0", "0.1.1", push=False)
+
+    drift = Finding("v1.0.0", "Chart.yaml appVersion 0.1.1 but 1.0.0 was published with 0.1.0")
+    for chart_path in (repo / "chart" / "Chart.yaml", Path("./Chart.yaml"), Path("../chart/Chart.yaml")):
+        report = audit_releases("registry.test", "org/chart", chart_path, jobs=2)
+        assert report.findings == [drift], chart_path
+
+
+def test_reports_chart_yaml_missing_at_a_tag(tmp_path: Path, registry, monkeypatch):
+    repo = init_repo(tmp_path)
+    monkeypatch.chdir(repo)
+    Git(cwd=repo).create_tag("v0.9.0")  # a tree without Chart.yaml
+    (repo / "Chart.yaml").write_text(_chart_yaml("0.9.0", "0.1.0"))
+    push_chart(prepare_release(repo), "registry.test", "org/chart")
+    _release(repo, "1.0.0", "0.2.0")
+
+    report = audit_releases("registry.test", "org/chart", repo / "Chart.yaml", jobs=2)
+    assert report.findings == [Finding("v0.9.0", "Chart.yaml does not exist at the tag")]
+
+
+def test_rejects_chart_path_outside_the_repository(tmp_path: Path, monkeypatch):
+    (tmp_path / "repo").mkdir()
+    repo = init_repo(tmp_path / "repo")
+    monkeypatch.chdir(repo)
+    (tmp_path / "Chart.yaml").write_text(_chart_yaml("1.0.0", "0.1.0"))
+    with pytest.raises(ValueError, match="not inside the git repository"):
+        audit_releases("registry.test", "org/chart", tmp_path / "Chart.yaml")
@@ -0,0 +1,75 @@
+import os
+import time
+from pathlib import Path
+
+from zero_cache_chart.cache import ChartCache, cache_dir, evict_lru, read_json, write_json
+
+
+def test_cache_dir_override(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("ZERO_CACHE_CHART_CACHE_DIR", str(tmp_path))
+    assert cache_dir() == tmp_path
+
+
+def test_cache_dir_xdg(monkeypatch, tmp_path: Path):
+    monkeypatch.delenv("ZERO_CACHE_CHART_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache_dir() == tmp_path / "zero-cache-chart"
+
+
+def test_json_round_trip(tmp_path: Path):
+    path = tmp_path / "nested" / "state.json"
+    write_json(path, {"a": [1, 2]})
+    assert read_json(path) == {"a": [1, 2]}
+
+
+def test_read_json_missing_or_corrupt(tmp_path: Path):
+    assert read_json(tmp_path / "missing.json") is None
+    (tmp_path / "bad.json").write_text("{not json")
+    assert read_json(tmp_path / "bad.json") is None
+
+
+def test_chart_cache_round_trip(tmp_path: Path):
+    cache = ChartCache(tmp_path)
+    assert cache.get("1.0.0", "sha256:aa") is None
+    cache.put("1.0.0", "sha256:aa", b"tgz")
+    assert cache.get("1.0.0", "sha256:aa") == b"tgz"
+    # A different manifest digest under the same tag is a different entry
+    assert cache.get("1.0.0", "sha256:bb") is None
+
+
+def _entry(root: Path, name: str, size: int, age: float) -> Path:
+    path = root / name
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_evict_lru_drops_expired_then_least_recently_used(tmp_path: Path):
+    expired = _entry(tmp_path, "expired.http", 10, age=1000)
+    old = _entry(tmp_path, "old.http", 60, age=30)
+    new = _entry(tmp_path, "new.http", 60, age=10)
+    other = _entry(tmp_path, "other.tgz", 500, age=2000)
+
+    evict_lru(tmp_path, "*.http", 100, max_age=100)
+
+    assert not expired.exists()
+    assert not old.exists()
+    assert new.exists()
+    assert other.exists()
+
+
+def test_chart_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ChartCache(tmp_path, max_bytes=10)
+    cache.put("1.0.0", "sha256:aa", b"12345")
+    cache.put("1.0.1", "sha256:bb", b"12345")
+    old = tmp_path / "1.0.0@sha256-aa.tgz"
+    newer = tmp_path / "1.0.1@sha256-bb.tgz"
+    os.utime(old, (1, 1))
+    os.utime(newer, (2, 2))
+    assert cache.get("1.0.0", "sha256:aa") == b"12345"  # marks 1.0.0 as recently used
+
+    cache.put("1.0.2", "sha256:cc", b"12345")
+    assert cache.get("1.0.1", "sha256:bb") is None
+    assert cache.get("1.0.0", "sha256:aa") == b"12345"
+    assert cache.get("1.0.2", "sha256:cc") == b"12345"
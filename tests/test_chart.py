@@ -2,11 +2,14 @@ from pathlib import Path
 
 import yaml
 from semver.version import Version
+from zero_cache_chart import chart as chart_module
 from zero_cache_chart.chart import (
     read_chart_version,
     read_chart_oci_version,
     read_chart_nix_version,
+    render_chart_version,
     write_chart_version,
+    sri_hash,
     _is_breaking_upgrade,
 )
 
@@ -107,3 +110,34 @@ def test_read_chart_nix_version_missing_field(tmp_path: Path):
     nix = tmp_path / "chart.nix"
     nix.write_text('{\n  chartHash = "sha256-abc";\n}\n')
     assert read_chart_nix_version(nix) is None
+
+
+def test_sri_hash_cached_by_tarball_digest(tmp_path: Path, mocker):
+    import io
+    import tarfile
+
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        info = tarfile.TarInfo("zero-cache/Chart.yaml")
+        info.size = 4
+        tar.addfile(info, io.BytesIO(b"x: 1"))
+    tgz = tmp_path / "zero-cache-1.0.0.tgz"
+    tgz.write_bytes(buf.getvalue())
+
+    spy = mocker.spy(chart_module, "nar_hash_tarball")
+    first = sri_hash(tgz)
+    chart_module._SRI_CACHE.clear()
+    assert sri_hash(tgz) == first
+    assert first.startswith("sha256-")
+    assert spy.call_count == 1
+
+
+def test_render_chart_version_chains():
+    text = "apiVersion: v2\nappVersion: 0.25.0\nversion: 1.0.5\nname: zero-cache\n"
+    first = render_chart_version(text, Version.parse("0.25.2"))
+    assert first is not None
+    second = render_chart_version(first, Version.parse("0.26.0"))
+    assert second is not None
+    assert yaml.safe_load(first)["version"] == "1.0.6"
+    assert yaml.safe_load(second)["version"] == "2.0.0"
+    assert render_chart_version(second, Version.parse("0.26.0")) is None
@@ -1,7 +1,17 @@
+import dataclasses
+import json
 from pathlib import Path
 
+import pytest
 from click.testing import CliRunner
-from zero_cache_chart.cli import main, _reconcile_chart_nix
+from zero_cache_chart.cache import cache_dir
+from semver.version import Version
+from zero_cache_chart import timing
+from zero_cache_chart.audit import AuditReport, Finding
+from zero_cache_chart.cli import main, _catch_up, _reconcile_chart_nix
+from zero_cache_chart.state import RunFingerprint, save_fingerprint
+from zero_cache_chart.types import DeletionResult, VersionManagementResult
+from zero_cache_chart.versions import VersionSummary, summarize_versions
 
 
 def test_main_help():
@@ -28,6 +38,7 @@ def test_prune_help():
     assert "--oci-repo" in result.output
     assert "--max-age-days" in result.output
     assert "--all" in result.output
+    assert "--concurrency" in result.output
 
 
 def test_cleanup_all_help():
@@ -38,6 +49,220 @@ def test_cleanup_all_help():
     assert "--dry-run" in result.output
 
 
+def test_prune_reports_failures(mocker):
+    mocker.patch(
+        "zero_cache_chart.github.prune_untagged",
+        return_value=DeletionResult(deleted=2, failed={3: "500 Server Error"}),
+    )
+    runner = CliRunner()
+    result = runner.invoke(main, ["prune", "--oci-repo=org/repo/zero-cache", "--concurrency=4"])
+    assert result.exit_code == 1
+    assert "Deleted 2 untagged version(s)" in result.output
+    assert "Failed to delete 1 of 3" in result.output
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["prune", "--oci-repo=org/repo", "--concurrency=0"],
+        ["cleanup-all", "--oci-repo=org/repo", "--yes", "--concurrency=0"],
+        ["retain", "--oci-repo=org/repo", "--concurrency=0"],
+        ["audit", "--oci-repo=org/repo", "--jobs=0"],
+        ["verify", "--jobs=0"],
+    ],
+)
+def test_worker_counts_must_be_positive(args):
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 2
+    assert "x>=1" in result.output
+
+
+def test_prune_checkpoint_and_no_resume(mocker):
+    prune = mocker.patch("zero_cache_chart.github.prune_untagged", return_value=DeletionResult())
+    checkpoint = cache_dir() / "prune" / "org_repo_zero-cache.json"
+    checkpoint.parent.mkdir(parents=True)
+    checkpoint.write_text("{}")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["prune", "--oci-repo=org/repo/zero-cache"])
+    assert result.exit_code == 0
+    assert "Resuming from checkpoint" in result.output
+    assert prune.call_args.kwargs["checkpoint"] == checkpoint
+
+    result = runner.invoke(main, ["prune", "--oci-repo=org/repo/zero-cache", "--no-resume"])
+    assert result.exit_code == 0
+    assert "Resuming" not in result.output
+    assert not checkpoint.exists()
+
+
+def test_retain_dry_run_reports_reduction(mocker):
+    versions = [
+        {"id": i, "name": f"sha256:{i}", "metadata": {"container": {"tags": [f"1.0.{i}"]}},
+         "created_at": "2020-01-01T00:00:00Z"}
+        for i in range(150)
+    ]
+    mocker.patch("zero_cache_chart.github.list_package_versions", return_value=versions)
+    mocker.patch("zero_cache_chart.git.Git").return_value.list_tags.return_value = ["v1.0.7"]
+    estimate = mocker.patch("zero_cache_chart.retention.estimate_storage")
+    estimate.return_value.before = 3 * 1024 * 1024
+    estimate.return_value.reclaimed = 2 * 1024 * 1024
+    estimate.return_value.unknown = 0
+    delete = mocker.patch("zero_cache_chart.github.delete_versions", return_value=DeletionResult(deleted=1))
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["retain", "--oci-repo=org/repo/zero-cache", "--keep-patches=2", "--dry-run"])
+    assert result.exit_code == 0, result.output
+    assert "Keeping 3 of 150 tagged version(s) (1 git tag, 2 latest patches)" in result.output
+    assert "Listing: 150 -> 3 version(s), 2 -> 1 page(s)" in result.output
+    assert "Storage: 3.0 MiB -> 1.0 MiB (frees 2.0 MiB)" in result.output
+    assert len(delete.call_args.args[2]) == 147
+    assert delete.call_args.kwargs["dry_run"] is True
+
+
+def _retain_mocks(mocker, git_tags: list[str]):
+    versions = [
+        {"id": i, "name": f"sha256:{i}", "metadata": {"container": {"tags": [f"1.0.{i}"]}},
+         "created_at": "2020-01-01T00:00:00Z"}
+        for i in range(5)
+    ]
+    mocker.patch("zero_cache_chart.github.list_package_versions", return_value=versions)
+    mocker.patch("zero_cache_chart.git.Git").return_value.list_tags.return_value = git_tags
+    return mocker.patch("zero_cache_chart.github.delete_versions", return_value=DeletionResult(deleted=2))
+
+
+def test_retain_asks_before_deleting(mocker):
+    delete = _retain_mocks(mocker, ["v1.0.4"])
+    runner = CliRunner()
+    args = ["retain", "--oci-repo=org/repo/zero-cache", "--keep-patches=1"]
+
+    result = runner.invoke(main, args, input="n\n")
+    assert result.exit_code == 1
+    assert "Delete 4 tagged version(s) from org/repo/zero-cache?" in result.output
+    delete.assert_not_called()
+
+    assert runner.invoke(main, args, input="y\n").exit_code == 0
+    assert runner.invoke(main, [*args, "--yes"]).exit_code == 0
+    assert delete.call_count == 2
+
+
+def test_retain_refuses_to_run_without_git_tags(mocker):
+    delete = _retain_mocks(mocker, [])
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["retain", "--oci-repo=org/repo/zero-cache", "--yes"])
+    assert result.exit_code == 1
+    assert "No v<version> git tags found" in result.output
+    delete.assert_not_called()
+
+    result = runner.invoke(main, ["retain", "--oci-repo=org/repo/zero-cache", "--ignore-git-tags", "--yes"])
+    assert result.exit_code == 0, result.output
+
+
+def _chart_dir(tmp_path: Path) -> Path:
+    chart = tmp_path / "Chart.yaml"
+    chart.write_text("apiVersion: v2\nappVersion: 0.26.0\nversion: 2.1.3\nname: zero-cache\n")
+    return chart
+
+
+def test_update_skips_when_nothing_changed(tmp_path: Path, mocker):
+    chart = _chart_dir(tmp_path)
+    tag = {"name": "0.26.0", "digest": "sha256:abc", "last_updated": "2026-02-01T00:00:00Z"}
+    mocker.patch("zero_cache_chart.docker.fetch_newest_tag", return_value=tag)
+    fetch = mocker.patch("zero_cache_chart.docker.fetch_version_summary")
+    mocker.patch("zero_cache_chart.oci.published_layer_digest", return_value=None)
+    head = mocker.patch("zero_cache_chart.oci.published_manifest_digest", return_value="sha256:m1")
+    save_fingerprint(
+        cache_dir() / "run-state" / "rocicorp_zero.json",
+        dataclasses.replace(RunFingerprint.capture(chart, tag), oci_manifest_digest="sha256:m1"),
+    )
+
+    runner = CliRunner()
+    args = ["update", "--docker-image=rocicorp/zero", "--oci-repo=org/repo", f"--chart-path={chart}"]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert "Nothing changed" in result.output
+    fetch.assert_not_called()
+    head.assert_called_once_with("ghcr.io", "org/repo", "2.1.3")
+
+    fetch.return_value = VersionSummary()
+    result = runner.invoke(main, [*args, "--force"])
+    assert result.exit_code == 0
+    fetch.assert_called_once()
+
+
+def test_update_runs_when_published_chart_was_deleted(tmp_path: Path, mocker):
+    chart = _chart_dir(tmp_path)
+    tag = {"name": "0.26.0", "digest": "sha256:abc", "last_updated": "2026-02-01T00:00:00Z"}
+    mocker.patch("zero_cache_chart.docker.fetch_newest_tag", return_value=tag)
+    fetch = mocker.patch("zero_cache_chart.docker.fetch_version_summary", return_value=VersionSummary())
+    mocker.patch("zero_cache_chart.oci.published_manifest_digest", return_value=None)
+    save_fingerprint(
+        cache_dir() / "run-state" / "rocicorp_zero.json",
+        dataclasses.replace(RunFingerprint.capture(chart, tag), oci_manifest_digest="sha256:m1"),
+    )
+
+    result = CliRunner().invoke(
+        main, ["update", "--docker-image=rocicorp/zero", "--oci-repo=org/repo", f"--chart-path={chart}", "--dry-run"]
+    )
+    assert result.exit_code == 0
+    assert "Nothing changed" not in result.output
+    fetch.assert_called_once()
+
+
+def test_update_full_sync_rebuilds_the_tag_cache(tmp_path: Path, mocker):
+    chart = _chart_dir(tmp_path)
+    mocker.patch("zero_cache_chart.docker.fetch_newest_tag", return_value=None)
+    fetch = mocker.patch("zero_cache_chart.docker.fetch_version_summary", return_value=VersionSummary())
+
+    args = ["update", "--docker-image=rocicorp/zero", "--oci-repo=org/repo", f"--chart-path={chart}", "--dry-run"]
+    assert CliRunner().invoke(main, [*args, "--full-sync"]).exit_code == 0
+    assert fetch.call_args.kwargs == {
+        "tag_cache": cache_dir() / "docker-tags" / "rocicorp_zero.json",
+        "refresh_tag_cache": True,
+    }
+
+
+def test_update_up_to_date_pushes_unpublished_chart(tmp_path: Path, mocker):
+    chart = _chart_dir(tmp_path)
+    mocker.patch("zero_cache_chart.docker.fetch_newest_tag", return_value=None)
+    mocker.patch(
+        "zero_cache_chart.docker.fetch_version_summary",
+        return_value=summarize_versions([Version.parse("0.25.0"), Version.parse("0.26.0")]),
+    )
+    local = mocker.Mock(version="2.1.3")
+    prepare = mocker.patch("zero_cache_chart.oci.prepare_release", return_value=local)
+    probe = mocker.patch("zero_cache_chart.oci.published_layer_digest", return_value=None)
+    push = mocker.patch("zero_cache_chart.oci.push_chart")
+    mocker.patch("zero_cache_chart.oci.published_manifest_digest", return_value="sha256:m1")
+
+    runner = CliRunner()
+    args = ["update", "--docker-image=rocicorp/zero", "--oci-repo=org/repo", f"--chart-path={chart}"]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert "Already up to date" in result.output
+    assert "Pushed 2.1.3 to OCI" in result.output
+    probe.assert_called_once_with("ghcr.io", "org/repo", "2.1.3")
+    prepare.assert_called_once_with(tmp_path)
+    push.assert_called_once_with(local, "ghcr.io", "org/repo")
+
+
+def test_update_dry_run_skips_registry(tmp_path: Path, mocker):
+    chart = _chart_dir(tmp_path)
+    mocker.patch("zero_cache_chart.docker.fetch_newest_tag", return_value=None)
+    mocker.patch(
+        "zero_cache_chart.docker.fetch_version_summary",
+        return_value=summarize_versions([Version.parse("0.26.0"), Version.parse("0.27.0")]),
+    )
+    probe = mocker.patch("zero_cache_chart.oci.published_layer_digest")
+
+    runner = CliRunner()
+    args = ["update", "--docker-image=rocicorp/zero", "--oci-repo=org/repo", f"--chart-path={chart}", "--dry-run"]
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert "Would update: 0.26.0 -> 0.27.0" in result.output
+    probe.assert_not_called()
+
+
 def test_update_requires_docker_image():
     runner = CliRunner()
     result = runner.invoke(main, ["update", "--oci-repo=foo/bar"])
@@ -60,22 +285,38 @@ def _write_nix(tmp_path: Path, version: str) -> Path:
 
 def test_reconcile_chart_nix_hashes_fresh_package(tmp_path: Path, mocker):
     nix = _write_nix(tmp_path, "2.1.1")
-    package = tmp_path / "zero-cache-2.1.2.tgz"
-    mocker.patch("zero_cache_chart.cli.sri_hash", return_value="sha256-new")
-    pull = mocker.patch("zero_cache_chart.cli.pull_chart")
+    release = mocker.Mock(sri_hash="sha256-new")
+    pull = mocker.patch("zero_cache_chart.oci.fetch_chart")
 
-    assert _reconcile_chart_nix(nix, "ghcr.io", "org/repo", "2.1.2", package) is True
+    assert _reconcile_chart_nix(nix, "ghcr.io", "org/repo", "2.1.2", release) is True
     assert 'version = "2.1.2"' in nix.read_text()
     assert 'chartHash = "sha256-new"' in nix.read_text()
     pull.assert_not_called()
 
 
+def test_reconcile_chart_nix_stale_hashes_matching_local_build(tmp_path: Path, mocker):
+    """A stale chart.nix is reconciled from a local rebuild when it is
+    byte-identical to the published chart, without pulling."""
+    nix = _write_nix(tmp_path, "2.1.1")
+    local = mocker.Mock(version="2.1.2", layer_digest="sha256:abc", sri_hash="sha256-local")
+    mocker.patch("zero_cache_chart.oci.prepare_release", return_value=local)
+    mocker.patch("zero_cache_chart.oci.published_layer_digest", return_value="sha256:abc")
+    pull = mocker.patch("zero_cache_chart.oci.fetch_chart")
+
+    assert _reconcile_chart_nix(nix, "ghcr.io", "org/repo", "2.1.2", None) is True
+    assert 'chartHash = "sha256-local"' in nix.read_text()
+    pull.assert_not_called()
+
+
 def test_reconcile_chart_nix_stale_pulls_from_registry(tmp_path: Path, mocker):
-    """When the package already exists in the registry, a stale chart.nix is
-    reconciled by pulling the published chart and hashing it."""
+    """When the local build differs from the published chart, a stale
+    chart.nix is reconciled by pulling the published chart and hashing it."""
     nix = _write_nix(tmp_path, "2.1.1")
-    pull = mocker.patch("zero_cache_chart.cli.pull_chart", return_value=tmp_path / "pulled.tgz")
-    mocker.patch("zero_cache_chart.cli.sri_hash", return_value="sha256-new")
+    local = mocker.Mock(version="2.1.2", layer_digest="sha256:local")
+    mocker.patch("zero_cache_chart.oci.prepare_release", return_value=local)
+    mocker.patch("zero_cache_chart.oci.published_layer_digest", return_value="sha256:published")
+    pull = mocker.patch("zero_cache_chart.oci.fetch_chart", return_value=b"tgz")
+    mocker.patch("zero_cache_chart.chart.sri_hash_bytes", return_value="sha256-new")
 
     assert _reconcile_chart_nix(nix, "ghcr.io", "org/repo", "2.1.2", None) is True
     assert 'version = "2.1.2"' in nix.read_text()
@@ -85,7 +326,7 @@ def test_reconcile_chart_nix_stale_pulls_from_registry(tmp_path: Path, mocker):
 
 def test_reconcile_chart_nix_up_to_date_is_noop(tmp_path: Path, mocker):
     nix = _write_nix(tmp_path, "2.1.2")
-    pull = mocker.patch("zero_cache_chart.cli.pull_chart")
+    pull = mocker.patch("zero_cache_chart.oci.fetch_chart")
 
     assert _reconcile_chart_nix(nix, "ghcr.io", "org/repo", "2.1.2", None) is False
     assert 'chartHash = "sha256-old"' in nix.read_text()
@@ -95,3 +336,139 @@ def test_reconcile_chart_nix_up_to_date_is_noop(tmp_path: Path, mocker):
 def test_reconcile_chart_nix_missing_file(tmp_path: Path):
     nix = tmp_path / "chart.nix"
     assert _reconcile_chart_nix(nix, "ghcr.io", "org/repo", "2.1.2", None) is False
+
+
+def test_catch_up_publishes_each_version_in_order(tmp_path: Path, mocker):
+    chart = tmp_path / "Chart.yaml"
+    chart.write_text("apiVersion: v2\nappVersion: 0.25.0\nversion: 1.0.5\nname: zero-cache\n")
+    (tmp_path / "values.yaml").write_text("replicas: 1\n")
+    nix = _write_nix(tmp_path, "1.0.5")
+    push = mocker.patch("zero_cache_chart.oci.push_release_if_not_exists", return_value=True)
+    git = mocker.Mock()
+    git.stage_release.side_effect = lambda paths, message, tags: tags
+    result = VersionManagementResult()
+
+    _catch_up(chart, [Version.parse("0.25.2"), Version.parse("0.26.1")], "ghcr.io", "org/repo", git, result)
+
+    assert [c.args[2].version for c in push.call_args_list] == ["1.0.6", "2.0.0"]
+    assert [c.args[1] for c in git.stage_release.call_args_list] == [
+        "chore(chart): update appVersion to 0.25.2",
+        "chore(chart): update appVersion to 0.26.1",
+    ]
+    git.push_atomic.assert_called_once_with("main", ["v1.0.6", "v2.0.0"])
+    assert result.created_tags == ["v1.0.6", "v2.0.0"]
+    assert "appVersion: 0.26.1" in chart.read_text()
+    assert 'version = "2.0.0"' in nix.read_text()
+
+
+def test_catch_up_rejects_published_version_with_different_content(tmp_path: Path, registry, mocker):
+    chart = tmp_path / "Chart.yaml"
+    chart.write_text("apiVersion: v2\nappVersion: 0.25.0\nversion: 1.0.5\nname: zero-cache\n")
+    (tmp_path / "values.yaml").write_text("replicas: 1\n")
+    nix = _write_nix(tmp_path, "1.0.5")
+    registry.manifests[("org/repo/zero-cache", "2.0.0")] = b"{}"
+    git = mocker.Mock()
+    git.stage_release.side_effect = lambda paths, message, tags: tags
+    result = VersionManagementResult()
+
+    with pytest.raises(RuntimeError, match="2.0.0 is already published .* with different content"):
+        _catch_up(chart, [Version.parse("0.25.2"), Version.parse("0.26.1")], "registry.test", "org/repo", git, result)
+
+    assert result.pushed_oci_packages == ["1.0.6"]
+    assert git.stage_release.call_count == 1
+    git.push_atomic.assert_not_called()
+    assert 'version = "1.0.6"' in nix.read_text()
+
+
+def test_profile_out_writes_trace_and_metrics(tmp_path: Path, mocker):
+    mocker.patch(
+        "zero_cache_chart.github.prune_untagged",
+        side_effect=lambda *a, **kw: _traced_result(),
+    )
+    trace = tmp_path / "profile.json"
+    runner = CliRunner()
+    result = runner.invoke(main, [f"--profile-out={trace}", "prune", "--oci-repo=org/repo"])
+    assert result.exit_code == 0, result.output
+
+    data = json.loads(trace.read_text())
+    assert data["summary"]["github.delete_version"]["count"] == 1
+    assert data["traceEvents"][0]["name"] == "github.delete_version"
+    metrics = (tmp_path / "profile.prom").read_text()
+    assert 'zero_cache_chart_spans_total{span="github.delete_version"} 1' in metrics
+    assert metrics.endswith("# EOF\n")
+
+
+def _traced_result() -> DeletionResult:
+    with timing.span("github.delete_version", version_id=1):
+        pass
+    return DeletionResult(deleted=1)
+
+
+def test_audit_reports_drift(mocker):
+    report = AuditReport(git_tags=3, published=2, findings=[Finding("v1.0.2", "git tag has no OCI artifact")])
+    audit = mocker.patch("zero_cache_chart.audit.audit_releases", return_value=report)
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["audit", "--oci-repo=org/repo", "--jobs=4"])
+    assert result.exit_code == 1
+    assert "DRIFT v1.0.2: git tag has no OCI artifact" in result.output
+    assert "1 drift finding(s)" in result.output
+    assert audit.call_args.kwargs["jobs"] == 4
+
+
+# Runs `zero-cache-chart <args>` in a fresh interpreter, as the console script
+# runs it, and prints the heavy modules it loaded. `prune` gets its GitHub
+# calls stubbed out after its own imports.
+_PROBE = """
+import sys
+from zero_cache_chart.cli import main
+from zero_cache_chart.types import DeletionResult
+if sys.argv[1] == "prune":
+    import zero_cache_chart.github
+    zero_cache_chart.github.prune_untagged = lambda *args, **kwargs: DeletionResult()
+try:
+    main(sys.argv[1:], prog_name="zero-cache-chart")
+except SystemExit:
+    pass
+heavy = ("requests", "yaml", "semver", "zero_cache_chart.chart", "zero_cache_chart.package")
+print(sorted(m for m in heavy if m in sys.modules))
+"""
+
+# Wall time of the whole `--help` run, interpreter startup included: about 135ms
+# here, and about 300ms when the command modules are imported eagerly.
+HELP_BUDGET_MS = 250
+
+
+def _run_probe(*args: str) -> tuple[str, float]:
+    """Output of the probe, ending in the loaded heavy modules, and its wall time."""
+    import os
+    import subprocess
+    import sys
+    import time
+
+    src = str(Path(__file__).resolve().parents[1] / "src")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [src, os.environ.get("PYTHONPATH")]))}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args], capture_output=True, text=True, env=env, check=True
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return proc.stdout, elapsed_ms
+
+
+def test_help_does_not_load_command_dependencies():
+    output, _ = _run_probe("--help")
+    assert "Usage: zero-cache-chart" in output
+    assert output.endswith("\n[]\n")
+
+
+def test_prune_does_not_load_chart_packaging():
+    output, _ = _run_probe("prune", "--oci-repo=org/repo", "--dry-run")
+    assert "Would delete 0 untagged version(s)" in output
+    assert output.endswith("\n['requests']\n")
+
+
+def test_help_time_budget():
+    # Best of three, so one slow run on a busy machine does not fail the build
+    best = min(_run_probe("--help")[1] for _ in range(3))
+    assert best <= HELP_BUDGET_MS, f"zero-cache-chart --help took {best:.0f}ms (budget {HELP_BUDGET_MS}ms)"
@@ -1,6 +1,9 @@
+import json
+from pathlib import Path
+
 import responses
 from semver.version import Version
-from zero_cache_chart.docker import fetch_docker_versions
+from zero_cache_chart.docker import _iter_tags, fetch_docker_versions, fetch_newest_tag, fetch_version_summary
 
 
 @responses.activate
@@ -28,6 +31,29 @@ def test_fetch_docker_versions_basic():
     ]
 
 
+@responses.activate
+def test_fetch_version_summary():
+    responses.add(
+        responses.GET,
+        "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/",
+        json={
+            "count": 4,
+            "next": None,
+            "results": [
+                {"name": "0.26.1-canary.4"},
+                {"name": "0.26.0"},
+                {"name": "latest"},
+                {"name": "0.25.3"},
+            ],
+        },
+    )
+
+    summary = fetch_version_summary("rocicorp/zero")
+    assert summary.count == 3
+    assert summary.latest_stable == Version.parse("0.26.0")
+    assert summary.missing_since(Version.parse("0.25.0")) == [Version.parse("0.25.3"), Version.parse("0.26.0")]
+
+
 @responses.activate
 def test_fetch_docker_versions_pagination():
     responses.add(
@@ -51,3 +77,200 @@ def test_fetch_docker_versions_pagination():
 
     versions = fetch_docker_versions("rocicorp/zero")
     assert versions == [Version.parse("0.25.0"), Version.parse("0.26.0")]
+
+
+@responses.activate
+def test_fetch_docker_versions_concurrent_pages():
+    base = "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/"
+    responses.add(
+        responses.GET,
+        base,
+        match=[responses.matchers.query_param_matcher({"page_size": "100"})],
+        json={
+            "count": 5,
+            "next": f"{base}?page=2&page_size=2",
+            "results": [{"name": "0.26.0"}, {"name": "latest"}],
+        },
+    )
+    for page, names in [(2, ["0.24.0", "0.25.1"]), (3, ["0.25.0"])]:
+        responses.add(
+            responses.GET,
+            base,
+            match=[responses.matchers.query_param_matcher({"page": str(page), "page_size": "2"})],
+            json={
+                "count": 5,
+                "next": None,
+                "results": [{"name": n} for n in names],
+            },
+        )
+
+    versions = fetch_docker_versions("rocicorp/zero", max_workers=2)
+    assert versions == [
+        Version.parse("0.24.0"),
+        Version.parse("0.25.0"),
+        Version.parse("0.25.1"),
+        Version.parse("0.26.0"),
+    ]
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_fetch_docker_versions_without_count_follows_next():
+    base = "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/"
+    responses.add(
+        responses.GET,
+        base,
+        match=[responses.matchers.query_param_matcher({"page_size": "100"})],
+        json={"next": f"{base}?page=2", "results": [{"name": "0.25.0"}]},
+    )
+    responses.add(
+        responses.GET,
+        base,
+        match=[responses.matchers.query_param_matcher({"page": "2"})],
+        json={"next": None, "results": [{"name": "0.26.0"}]},
+    )
+
+    versions = fetch_docker_versions("rocicorp/zero")
+    assert versions == [Version.parse("0.25.0"), Version.parse("0.26.0")]
+
+
+@responses.activate
+def test_tags_are_streamed_with_bounded_read_ahead():
+    base = "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/"
+
+    def page(request):
+        n = int(request.params.get("page", "1"))
+        body = {"count": 20, "next": f"{base}?page=2", "results": [{"name": f"0.{n}.0"}]}
+        return 200, {}, json.dumps(body)
+
+    responses.add_callback(responses.GET, base, callback=page)
+
+    tags = _iter_tags(f"{base}?page_size=1", max_workers=1)
+    assert next(tags) == {"name": "0.1.0"}
+    assert next(tags) == {"name": "0.2.0"}
+    # page 1, the two pages requested ahead, and the one refilling the window
+    assert len(responses.calls) <= 4
+    assert [t["name"] for t in tags] == [f"0.{n}.0" for n in range(3, 21)]
+    assert len(responses.calls) == 20
+
+
+ORDERED = {"page_size": "100", "ordering": "last_updated"}
+
+
+@responses.activate
+def test_fetch_docker_versions_incremental_cold_cache(tmp_path: Path):
+    cache = tmp_path / "tags.json"
+    responses.add(
+        responses.GET,
+        "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/",
+        match=[responses.matchers.query_param_matcher(ORDERED)],
+        json={
+            "count": 2,
+            "next": None,
+            "results": [
+                {"name": "0.26.0", "last_updated": "2026-02-01T00:00:00.000000Z"},
+                {"name": "0.25.0", "last_updated": "2026-01-01T00:00:00.000000Z"},
+            ],
+        },
+    )
+
+    versions = fetch_docker_versions("rocicorp/zero", tag_cache=cache)
+    assert versions == [Version.parse("0.25.0"), Version.parse("0.26.0")]
+    saved = json.loads(cache.read_text())
+    assert saved["watermark"] == "2026-02-01T00:00:00.000000Z"
+    assert saved["tags"] == ["0.25.0", "0.26.0"]
+
+
+@responses.activate
+def test_fetch_docker_versions_incremental_stops_at_watermark(tmp_path: Path):
+    cache = tmp_path / "tags.json"
+    cache.write_text(json.dumps({
+        "watermark": "2026-02-01T00:00:00.000000Z",
+        "tags": ["0.25.0", "0.26.0", "latest"],
+    }))
+    responses.add(
+        responses.GET,
+        "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/",
+        match=[responses.matchers.query_param_matcher(ORDERED)],
+        json={
+            "count": 300,
+            "next": "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/?page=2",
+            "results": [
+                {"name": "0.26.1", "last_updated": "2026-03-01T00:00:00.000000Z"},
+                {"name": "0.26.0", "last_updated": "2026-02-01T00:00:00.000000Z"},
+            ],
+        },
+    )
+
+    versions = fetch_docker_versions("rocicorp/zero", tag_cache=cache)
+    assert versions == [Version.parse("0.25.0"), Version.parse("0.26.0"), Version.parse("0.26.1")]
+    assert len(responses.calls) == 1
+    saved = json.loads(cache.read_text())
+    assert saved["watermark"] == "2026-03-01T00:00:00.000000Z"
+    assert "0.26.1" in saved["tags"]
+
+
+@responses.activate
+def test_fetch_docker_versions_incremental_nothing_new(tmp_path: Path):
+    cache = tmp_path / "tags.json"
+    cache.write_text(json.dumps({"watermark": "2026-02-01T00:00:00Z", "tags": ["0.26.0"]}))
+    responses.add(
+        responses.GET,
+        "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/",
+        match=[responses.matchers.query_param_matcher(ORDERED)],
+        json={
+            "count": 1,
+            "next": None,
+            "results": [{"name": "0.26.0", "last_updated": "2026-02-01T00:00:00Z"}],
+        },
+    )
+
+    assert fetch_docker_versions("rocicorp/zero", tag_cache=cache) == [Version.parse("0.26.0")]
+    assert json.loads(cache.read_text())["watermark"] == "2026-02-01T00:00:00Z"
+
+
+@responses.activate
+def test_fetch_docker_versions_refresh_rebuilds_cache_from_full_listing(tmp_path: Path):
+    cache = tmp_path / "tags.json"
+    # 0.25.0 was deleted upstream after it was cached
+    cache.write_text(json.dumps({"watermark": "2026-03-01T00:00:00Z", "tags": ["0.25.0", "0.26.0"]}))
+    responses.add(
+        responses.GET,
+        "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/",
+        match=[responses.matchers.query_param_matcher(ORDERED)],
+        json={
+            "count": 2,
+            "next": None,
+            "results": [
+                {"name": "0.26.0", "last_updated": "2026-02-01T00:00:00Z"},
+                {"name": "0.24.0", "last_updated": "2026-01-01T00:00:00Z"},
+            ],
+        },
+    )
+
+    versions = fetch_docker_versions("rocicorp/zero", tag_cache=cache, refresh_tag_cache=True)
+    assert versions == [Version.parse("0.24.0"), Version.parse("0.26.0")]
+    assert json.loads(cache.read_text()) == {"watermark": "2026-02-01T00:00:00Z", "tags": ["0.24.0", "0.26.0"]}
+
+
+@responses.activate
+def test_fetch_newest_tag():
+    responses.add(
+        responses.GET,
+        "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/",
+        match=[responses.matchers.query_param_matcher({"page_size": "1", "ordering": "last_updated"})],
+        json={"count": 500, "results": [{"name": "0.26.1-canary.2", "digest": "sha256:abc"}]},
+    )
+    assert fetch_newest_tag("rocicorp/zero") == {"name": "0.26.1-canary.2", "digest": "sha256:abc"}
+
+
+@responses.activate
+def test_unchanged_pages_are_revalidated_from_the_http_cache():
+    url = "https://hub.docker.com/v2/repositories/rocicorp/zero/tags/"
+    body = {"count": 1, "next": None, "results": [{"name": "0.26.0"}]}
+    responses.add(responses.GET, url, json=body, headers={"ETag": '"page-1"'})
+    responses.add(responses.GET, url, status=304)
+
+    assert fetch_docker_versions("rocicorp/zero") == [Version.parse("0.26.0")]
+    assert fetch_docker_versions("rocicorp/zero") == [Version.parse("0.26.0")]
+    assert responses.calls[1].request.headers["If-None-Match"] == '"page-1"'
@@ -50,3 +50,49 @@ def test_git_tag_exists(tmp_path: Path):
     assert git.tag_exists("v0.1.0") is False
     git.create_tag("v0.1.0")
     assert git.tag_exists("v0.1.0") is True
+
+
+def init_with_remote(tmp_path: Path) -> tuple[Path, Path]:
+    remote = tmp_path / "remote.git"
+    subprocess.run(["git", "init", "--bare", str(remote)], check=True, capture_output=True)
+    repo = tmp_path / "work"
+    repo.mkdir()
+    init_repo(repo)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=repo, check=True, capture_output=True)
+    return repo, remote
+
+
+def remote_refs(remote: Path) -> set[str]:
+    result = subprocess.run(["git", "for-each-ref", "--format=%(refname)"], cwd=remote, capture_output=True, text=True)
+    return set(result.stdout.split())
+
+
+def test_commit_and_release_pushes_branch_and_tags_atomically(tmp_path: Path):
+    repo, remote = init_with_remote(tmp_path)
+    git = Git(cwd=repo)
+    branch = git.current_branch()
+    (repo / "Chart.yaml").write_text("version: 1.0.1\n")
+
+    created = git.commit_and_release(["Chart.yaml"], "bump", branch=branch, tags=["v1.0.1"])
+    assert created == ["v1.0.1"]
+    assert remote_refs(remote) == {f"refs/heads/{branch}", "refs/tags/v1.0.1"}
+
+
+def test_stage_release_skips_existing_tags(tmp_path: Path):
+    repo = init_repo(tmp_path)
+    git = Git(cwd=repo)
+    git.create_tag("v1.0.0")
+    (repo / "Chart.yaml").write_text("version: 1.0.1\n")
+
+    created = git.stage_release(["Chart.yaml"], "bump", ["v1.0.0", "v1.0.1"])
+    assert created == ["v1.0.1"]
+    assert git.tag_exists("v1.0.1")
+
+
+def test_git_list_tags(tmp_path: Path):
+    repo = init_repo(tmp_path)
+    git = Git(cwd=repo)
+    assert git.list_tags() == []
+    for tag in ("v1.0.0", "v1.1.0", "other"):
+        git.create_tag(tag)
+    assert git.list_tags("v*") == ["v1.0.0", "v1.1.0"]
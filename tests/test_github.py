@@ -0,0 +1,230 @@
+import json
+import re
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import responses
+from zero_cache_chart import github as github_module
+from zero_cache_chart.transport import transport
+from zero_cache_chart.github import (
+    _parse_package_versions,
+    delete_all_versions,
+    delete_versions,
+    list_package_versions,
+    prune_untagged,
+)
+
+VERSIONS_URL = "https://api.github.com/orgs/org/packages/container/repo%2Fzero-cache/versions"
+
+
+def test_parse_package_versions():
+    data = [
+        {"id": 1, "metadata": {"container": {"tags": ["0.26.0"]}}, "created_at": "2026-01-01T00:00:00Z"},
+        {"id": 2, "metadata": {"container": {"tags": []}}, "created_at": "2026-01-01T00:00:00Z"},
+        {"id": 3, "metadata": {"container": {"tags": []}}, "created_at": "2025-01-01T00:00:00Z"},
+    ]
+    tagged, untagged = _parse_package_versions(data)
+    assert len(tagged) == 1
+    assert len(untagged) == 2
+
+
+def test_parse_package_versions_empty():
+    tagged, untagged = _parse_package_versions([])
+    assert tagged == []
+    assert untagged == []
+
+
+def test_parse_package_versions_all_tagged():
+    data = [
+        {"id": 1, "metadata": {"container": {"tags": ["0.26.0"]}}, "created_at": "2026-01-01T00:00:00Z"},
+        {"id": 2, "metadata": {"container": {"tags": ["0.25.0"]}}, "created_at": "2026-01-01T00:00:00Z"},
+    ]
+    tagged, untagged = _parse_package_versions(data)
+    assert len(tagged) == 2
+    assert len(untagged) == 0
+
+
+@responses.activate
+def test_delete_versions_collects_failures():
+    for version_id in (1, 2, 4):
+        responses.add(responses.DELETE, f"{VERSIONS_URL}/{version_id}", status=204)
+    responses.add(responses.DELETE, f"{VERSIONS_URL}/3", status=500)
+
+    result = delete_versions("org", "repo/zero-cache", [1, 2, 3, 4], concurrency=32)
+    assert result.deleted == 3
+    assert transport().pool_size == 32
+    assert list(result.failed) == [3]
+    assert result.attempted == 4
+
+
+def test_delete_versions_dry_run_matches_attempted():
+    result = delete_versions("org", "repo/zero-cache", [1, 2, 3], dry_run=True)
+    assert result.deleted == 3
+    assert result.failed == {}
+    assert result.attempted == 3
+
+
+class FakePackages:
+    """Stateful stand-in for the GitHub package versions API: deletions shift later pages forward."""
+
+    def __init__(self, versions: list[dict], *, per_page: int = 2, failing: tuple[int, ...] = ()):
+        self.versions = versions
+        self.per_page = per_page
+        self.failing = set(failing)
+        self.pages_fetched: list[int] = []
+        self.interrupt_after: int | None = None
+        responses.add_callback(responses.GET, VERSIONS_URL, callback=self._list)
+        responses.add_callback(responses.DELETE, re.compile(rf"{re.escape(VERSIONS_URL)}/\d+"), callback=self._delete)
+
+    def _list(self, request):
+        page = int(parse_qs(urlsplit(request.url).query).get("page", ["1"])[0])
+        self.pages_fetched.append(page)
+        start = (page - 1) * self.per_page
+        headers = {}
+        if start + self.per_page < len(self.versions):
+            headers["Link"] = f'<{VERSIONS_URL}?per_page=100&page={page + 1}>; rel="next"'
+        return 200, headers, json.dumps(self.versions[start:start + self.per_page])
+
+    def _delete(self, request):
+        version_id = int(request.url.rsplit("/", 1)[1])
+        if version_id in self.failing:
+            return 500, {}, ""
+        if self.interrupt_after is not None:
+            if self.interrupt_after == 0:
+                raise KeyboardInterrupt
+            self.interrupt_after -= 1
+        self.versions = [v for v in self.versions if v["id"] != version_id]
+        return 204, {}, ""
+
+
+def _version(version_id: int, *, tagged: bool = False, created: str = "2020-01-01T00:00:00Z") -> dict:
+    tags = [f"1.0.{version_id}"] if tagged else []
+    return {"id": version_id, "metadata": {"container": {"tags": tags}}, "created_at": created}
+
+
+@responses.activate
+def test_prune_untagged_deletes_only_old_untagged():
+    fake = FakePackages([
+        _version(1, tagged=True),
+        _version(2),
+        _version(3, created="2999-01-01T00:00:00Z"),
+    ])
+
+    result = prune_untagged("org", "repo/zero-cache", max_age_days=7)
+    assert result.deleted == 1
+    assert result.failed == {}
+    assert [v["id"] for v in fake.versions] == [1, 3]
+
+
+@responses.activate
+def test_prune_untagged_streams_pages_and_refetches_after_deletions():
+    fake = FakePackages([_version(i, tagged=i % 3 == 0) for i in range(1, 10)], per_page=2)
+
+    result = prune_untagged("org", "repo/zero-cache", prune_all=True, concurrency=2)
+    assert result.deleted == 6
+    assert [v["id"] for v in fake.versions] == [3, 6, 9]
+    # page 1 is fetched again after each round of deletions shifts versions forward
+    assert fake.pages_fetched[:2] == [1, 1]
+
+
+@responses.activate
+def test_prune_untagged_skips_failed_versions_on_refetch():
+    fake = FakePackages([_version(1), _version(2), _version(3)], per_page=2, failing=(1,))
+
+    result = prune_untagged("org", "repo/zero-cache", prune_all=True)
+    assert result.deleted == 2
+    assert list(result.failed) == [1]
+    assert [v["id"] for v in fake.versions] == [1]
+
+
+@responses.activate
+def test_prune_untagged_dry_run_walks_every_page_once():
+    fake = FakePackages([_version(i) for i in range(1, 6)], per_page=2)
+
+    result = prune_untagged("org", "repo/zero-cache", prune_all=True, dry_run=True)
+    assert result.deleted == 5
+    assert fake.pages_fetched == [1, 2, 3]
+    assert len(fake.versions) == 5
+
+
+@responses.activate
+def test_prune_untagged_resumes_from_checkpoint(tmp_path: Path):
+    checkpoint = tmp_path / "prune.json"
+    fake = FakePackages([_version(i, tagged=i <= 4) for i in range(1, 9)], per_page=2)
+    fake.interrupt_after = 1
+
+    with pytest.raises(KeyboardInterrupt):
+        prune_untagged("org", "repo/zero-cache", prune_all=True, checkpoint=checkpoint, concurrency=1)
+    # the batch for page 3 was cut short; the checkpoint still points at it
+    state = json.loads(checkpoint.read_text())
+    assert state == {
+        "criteria": {"untagged": True, "max_age_days": None},
+        "page": 3,
+        "deleted": 0,
+        "failed": {},
+    }
+
+    fake.interrupt_after = None
+    fake.pages_fetched.clear()
+    result = prune_untagged("org", "repo/zero-cache", prune_all=True, checkpoint=checkpoint)
+    assert result.deleted == 3
+    assert fake.pages_fetched[0] == 3
+    assert [v["id"] for v in fake.versions] == [1, 2, 3, 4]
+    assert not checkpoint.exists()
+
+
+@responses.activate
+def test_prune_untagged_ignores_checkpoint_for_other_criteria(tmp_path: Path):
+    checkpoint = tmp_path / "prune.json"
+    checkpoint.write_text(json.dumps({
+        "criteria": {"untagged": True, "max_age_days": 30},
+        "page": 5,
+        "deleted": 0,
+        "failed": {},
+    }))
+    fake = FakePackages([_version(1)], per_page=2)
+
+    result = prune_untagged("org", "repo/zero-cache", prune_all=True, checkpoint=checkpoint)
+    assert result.deleted == 1
+    assert fake.pages_fetched[0] == 1
+
+
+@responses.activate
+def test_delete_all_versions_deletes_tagged_too():
+    fake = FakePackages([_version(1, tagged=True), _version(2), _version(3, tagged=True)], per_page=2)
+
+    result = delete_all_versions("org", "repo/zero-cache")
+    assert result.deleted == 3
+    assert fake.versions == []
+
+
+@responses.activate
+def test_list_package_versions_revalidates_with_etag():
+    first = f"{VERSIONS_URL}?per_page=100"
+    second = f"{VERSIONS_URL}?per_page=100&page=2"
+    link = {"Link": f'<{second}>; rel="next"'}
+    responses.add(responses.GET, first, json=[_version(1)], headers={"ETag": '"p1"', **link})
+    responses.add(responses.GET, second, json=[_version(2)], headers={"ETag": '"p2"'})
+    responses.add(responses.GET, first, status=304)
+    responses.add(responses.GET, second, status=304)
+
+    assert [v["id"] for v in list_package_versions("org", "repo/zero-cache")] == [1, 2]
+    # the cached Link header still drives pagination when the pages are unchanged
+    assert [v["id"] for v in list_package_versions("org", "repo/zero-cache")] == [1, 2]
+    assert [c.request.headers.get("If-None-Match") for c in responses.calls] == [None, None, '"p1"', '"p2"']
+
+
+@responses.activate
+def test_github_auth_lives_on_the_shared_session(monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", "ghp_x")
+    responses.add(responses.GET, f"{VERSIONS_URL}?per_page=100", json=[_version(1)])
+    responses.add(responses.DELETE, f"{VERSIONS_URL}/1", status=204)
+
+    list_package_versions("org", "repo/zero-cache")
+    github_module.delete_package_version("org", "repo/zero-cache", 1)
+
+    session = transport().session(github_module.GITHUB_API)
+    assert session.headers["Authorization"] == "Bearer ghp_x"
+    assert [c.request.headers["Authorization"] for c in responses.calls] == ["Bearer ghp_x"] * 2
+    assert responses.calls[1].request.headers["Accept"] == "application/vnd.github+json"
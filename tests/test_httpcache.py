@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import responses
+from zero_cache_chart.httpcache import HttpCache, http_cache
+
+URL = "https://api.test/items?page=1"
+
+
+def _revalidating(etag: str, body: str, headers: dict[str, str] | None = None):
+    """Callback answering 304 when the request carries the current ETag."""
+    seen: list[str | None] = []
+
+    def callback(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, ""
+        return 200, {"ETag": etag, "Content-Type": "application/json", **(headers or {})}, body
+
+    responses.add_callback(responses.GET, URL, callback=callback)
+    return seen
+
+
+@responses.activate
+def test_revalidated_response_is_replayed_from_disk(tmp_path: Path):
+    link = '<https://api.test/items?page=2>; rel="next"'
+    seen = _revalidating('"v1"', '[{"id": 1}]', {"Link": link})
+    cache = HttpCache(tmp_path)
+
+    first = cache.get(URL)
+    second = cache.get(URL)
+
+    assert seen == [None, '"v1"']
+    assert first.from_cache is False
+    assert second.from_cache is True
+    assert second.status_code == 200
+    assert second.json() == [{"id": 1}]
+    assert second.headers["link"] == link
+
+
+@responses.activate
+def test_changed_response_replaces_entry(tmp_path: Path):
+    cache = HttpCache(tmp_path)
+    responses.add(responses.GET, URL, json=[1], headers={"ETag": '"v1"'})
+    responses.add(responses.GET, URL, json=[2], headers={"ETag": '"v2"'})
+    assert cache.get(URL).json() == [1]
+    assert cache.get(URL).json() == [2]
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+
+@responses.activate
+def test_last_modified_is_sent_as_if_modified_since(tmp_path: Path):
+    stamp = "Wed, 01 Jan 2026 00:00:00 GMT"
+    responses.add(responses.GET, URL, json=[1], headers={"Last-Modified": stamp})
+    responses.add(responses.GET, URL, status=304)
+    cache = HttpCache(tmp_path)
+    cache.get(URL)
+    assert cache.get(URL).json() == [1]
+    assert responses.calls[1].request.headers["If-Modified-Since"] == stamp
+
+
+@responses.activate
+def test_responses_without_validators_or_errors_are_not_stored(tmp_path: Path):
+    responses.add(responses.GET, URL, json=[1])
+    responses.add(responses.GET, URL, status=500, headers={"ETag": '"v1"'})
+    cache = HttpCache(tmp_path)
+    cache.get(URL)
+    cache.get(URL)
+    assert list(tmp_path.glob("*.http")) == []
+
+
+@responses.activate
+def test_request_headers_are_forwarded(tmp_path: Path):
+    responses.add(responses.GET, URL, json=[])
+    HttpCache(tmp_path).get(URL, headers={"Authorization": "Bearer t"})
+    assert responses.calls[0].request.headers["Authorization"] == "Bearer t"
+
+
+def test_shared_cache_follows_cache_dir(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("ZERO_CACHE_CHART_CACHE_DIR", str(tmp_path))
+    assert http_cache() is http_cache()
+    assert http_cache().root == tmp_path / "http"
@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import io
+import shutil
+import struct
+import subprocess
+import tarfile
+from pathlib import Path
+
+import pytest
+from zero_cache_chart.nar import nar_hash_tarball
+
+
+def make_tgz(files: dict[str, bytes], *, modes: dict[str, int] | None = None,
+             symlinks: dict[str, str] | None = None) -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = (modes or {}).get(name, 0o644)
+            tar.addfile(info, io.BytesIO(data))
+        for name, target in (symlinks or {}).items():
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.SYMTYPE
+            info.linkname = target
+            tar.addfile(info)
+    return buf.getvalue()
+
+
+def s(data: bytes) -> bytes:
+    return struct.pack("<Q", len(data)) + data + b"\0" * (-len(data) % 8)
+
+
+def nar(*tokens: bytes) -> bytes:
+    return b"".join(s(t) for t in tokens)
+
+
+def sri(data: bytes) -> str:
+    return "sha256-" + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+def test_single_file_directory():
+    tgz = make_tgz({"chart/Chart.yaml": b"name: x\n"})
+    expected = nar(
+        b"nix-archive-1", b"(", b"type", b"directory",
+        b"entry", b"(", b"name", b"Chart.yaml", b"node",
+        b"(", b"type", b"regular", b"contents", b"name: x\n", b")",
+        b")",
+        b")",
+    )
+    assert nar_hash_tarball(tgz) == sri(expected)
+
+
+def test_entries_sorted_regardless_of_member_order():
+    ordered = make_tgz({"chart/a.yaml": b"a", "chart/templates/b.yaml": b"b", "chart/values.yaml": b"v"})
+    shuffled = make_tgz({"chart/values.yaml": b"v", "chart/templates/b.yaml": b"b", "chart/a.yaml": b"a"})
+    assert nar_hash_tarball(ordered) == nar_hash_tarball(shuffled)
+
+
+def test_nested_directory_executable_and_symlink():
+    tgz = make_tgz(
+        {"chart/bin/run.sh": b"#!/bin/sh\n"},
+        modes={"chart/bin/run.sh": 0o755},
+        symlinks={"chart/link": "bin/run.sh"},
+    )
+    expected = nar(
+        b"nix-archive-1", b"(", b"type", b"directory",
+        b"entry", b"(", b"name", b"bin", b"node",
+        b"(", b"type", b"directory",
+        b"entry", b"(", b"name", b"run.sh", b"node",
+        b"(", b"type", b"regular", b"executable", b"", b"contents", b"#!/bin/sh\n", b")",
+        b")",
+        b")",
+        b")",
+        b"entry", b"(", b"name", b"link", b"node",
+        b"(", b"type", b"symlink", b"target", b"bin/run.sh", b")",
+        b")",
+        b")",
+    )
+    assert nar_hash_tarball(tgz) == sri(expected)
+
+
+@pytest.mark.skipif(shutil.which("nix") is None, reason="needs nix (CI runs the tests in nix develop)")
+def test_matches_nix_hash_path(tmp_path: Path):
+    chart = tmp_path / "chart"
+    (chart / "templates" / "tests").mkdir(parents=True)
+    (chart / "Chart.yaml").write_text("apiVersion: v2\nname: zero-cache\nversion: 1.0.0\n")
+    (chart / "templates" / "tests" / "hook.yaml").write_text("kind: Pod\n")
+    (chart / "templates" / "empty.txt").write_bytes(b"")
+    run = chart / "run.sh"
+    run.write_text("#!/bin/sh\necho ok\n")
+    run.chmod(0o755)
+    (chart / "link").symlink_to("run.sh")
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        tar.add(chart, arcname="chart")
+
+    nix = subprocess.run(
+        ["nix", "--extra-experimental-features", "nix-command", "hash", "path", "--sri", str(chart)],
+        capture_output=True, text=True, check=True,
+    )
+    assert nar_hash_tarball(buf.getvalue()) == nix.stdout.strip()
+
+
+def test_multiple_top_level_entries_rejected():
+    tgz = make_tgz({"a/Chart.yaml": b"", "b/Chart.yaml": b""})
+    with pytest.raises(RuntimeError, match="single chart directory"):
+        nar_hash_tarball(tgz)
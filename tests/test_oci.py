@@ -1,28 +1,109 @@
-from zero_cache_chart.oci import _parse_package_versions
-
-
-def test_parse_package_versions():
-    data = [
-        {"id": 1, "metadata": {"container": {"tags": ["0.26.0"]}}, "created_at": "2026-01-01T00:00:00Z"},
-        {"id": 2, "metadata": {"container": {"tags": []}}, "created_at": "2026-01-01T00:00:00Z"},
-        {"id": 3, "metadata": {"container": {"tags": []}}, "created_at": "2025-01-01T00:00:00Z"},
-    ]
-    tagged, untagged = _parse_package_versions(data)
-    assert len(tagged) == 1
-    assert len(untagged) == 2
-
-
-def test_parse_package_versions_empty():
-    tagged, untagged = _parse_package_versions([])
-    assert tagged == []
-    assert untagged == []
-
-
-def test_parse_package_versions_all_tagged():
-    data = [
-        {"id": 1, "metadata": {"container": {"tags": ["0.26.0"]}}, "created_at": "2026-01-01T00:00:00Z"},
-        {"id": 2, "metadata": {"container": {"tags": ["0.25.0"]}}, "created_at": "2026-01-01T00:00:00Z"},
-    ]
-    tagged, untagged = _parse_package_versions(data)
-    assert len(tagged) == 2
-    assert len(untagged) == 0
+import json
+from pathlib import Path
+
+import pytest
+from zero_cache_chart import oci as oci_module
+from zero_cache_chart.cache import ChartCache
+from zero_cache_chart.registry import client_for
+from zero_cache_chart.oci import (
+    fetch_chart,
+    prepare_release,
+    push_chart,
+    published_layer_digest,
+    published_versions,
+    push_if_not_exists,
+    version_exists_in_registry,
+)
+
+
+def _write_chart(root: Path, version: str) -> Path:
+    (root / "Chart.yaml").write_text(f"apiVersion: v2\nname: zero-cache\nversion: {version}\ndescription: test\n")
+    (root / "values.yaml").write_text("replicas: 1\n")
+    return root
+
+
+def test_push_if_not_exists_pushes_helm_artifact(tmp_path: Path, registry):
+    chart_dir = _write_chart(tmp_path, "1.0.0")
+
+    release, pushed = push_if_not_exists("registry.test", "org/chart", "1.0.0", chart_dir)
+    assert pushed
+    manifest = json.loads(registry.manifests[("org/chart/zero-cache", "1.0.0")])
+    assert manifest["layers"][0]["digest"] == release.layer_digest
+    assert manifest["config"]["mediaType"] == "application/vnd.cncf.helm.config.v1+json"
+    assert registry.blobs[("org/chart/zero-cache", release.layer_digest)] == release.archive.data
+    assert published_layer_digest("registry.test", "org/chart", "1.0.0") == release.layer_digest
+    assert published_layer_digest("registry.test", "org/chart", "2.0.0") is None
+    assert registry.uploads == 2
+
+
+def test_push_if_not_exists_skips_published_version(tmp_path: Path, registry, mocker):
+    chart_dir = _write_chart(tmp_path, "1.0.0")
+    push_chart(prepare_release(chart_dir), "registry.test", "org/chart")
+    uploads = registry.uploads
+    client_for.cache_clear()
+    prepare = mocker.spy(oci_module, "prepare_release")
+
+    release, pushed = push_if_not_exists("registry.test", "org/chart", "1.0.0", chart_dir)
+    assert not pushed
+    assert release.version == "1.0.0"
+    assert prepare.call_count == 1
+    assert registry.uploads == uploads
+
+
+def test_push_if_not_exists_rejects_different_content_under_same_version(tmp_path: Path, registry):
+    chart_dir = _write_chart(tmp_path, "1.0.0")
+    registry.manifests[("org/chart/zero-cache", "1.0.0")] = b"{}"
+
+    with pytest.raises(RuntimeError, match="already published .* with different content"):
+        push_if_not_exists("registry.test", "org/chart", "1.0.0", chart_dir)
+    assert registry.uploads == 0
+
+
+def test_push_if_not_exists_rejects_version_mismatch(tmp_path: Path, registry):
+    chart_dir = _write_chart(tmp_path, "1.0.0")
+
+    with pytest.raises(ValueError, match="expected 1.0.1"):
+        push_if_not_exists("registry.test", "org/chart", "1.0.1", chart_dir)
+    assert registry.uploads == 0
+
+
+def test_push_skips_blobs_already_in_registry(tmp_path: Path, registry):
+    chart_dir = _write_chart(tmp_path, "1.0.0")
+    assert push_if_not_exists("registry.test", "org/chart", "1.0.0", chart_dir)[1]
+
+    # Re-tagging identical content uploads no blobs, only the new manifest
+    registry.manifests.pop(("org/chart/zero-cache", "1.0.0"))
+    client_for.cache_clear()  # a later run lists the tags afresh
+    assert push_if_not_exists("registry.test", "org/chart", "1.0.0", chart_dir)[1]
+    assert registry.uploads == 2
+
+
+def test_prepare_release_builds_once_for_digest_and_hash(tmp_path: Path, mocker):
+    chart_dir = _write_chart(tmp_path, "1.0.0")
+    build = mocker.spy(oci_module, "build_chart_archive")
+
+    release = prepare_release(chart_dir)
+    manifest = json.loads(release.manifest)
+    assert manifest["layers"][0]["digest"] == release.layer_digest
+    assert release.sri_hash.startswith("sha256-")
+    assert build.call_count == 1
+
+
+def test_fetch_chart_uses_cache_after_first_download(tmp_path: Path, registry):
+    chart_dir = _write_chart(tmp_path, "1.0.0")
+    release, _ = push_if_not_exists("registry.test", "org/chart", "1.0.0", chart_dir)
+    cache = ChartCache(tmp_path / "charts")
+
+    assert fetch_chart("registry.test", "org/chart", "1.0.0", cache=cache) == release.archive.data
+    assert fetch_chart("registry.test", "org/chart", "1.0.0", cache=cache) == release.archive.data
+    assert registry.blob_downloads == 1
+
+
+def test_version_exists_lists_tags_once(registry):
+    for tag in ("1.0.0", "1.0.1"):
+        registry.manifests[("org/chart/zero-cache", tag)] = b"{}"
+
+    exists = [version_exists_in_registry("registry.test", "org/chart", v) for v in ("1.0.0", "1.0.1", "1.0.2")]
+    assert exists == [True, True, False]
+    assert published_versions("registry.test", "org/chart") == {"1.0.0", "1.0.1"}
+    assert registry.tag_list_requests == 1
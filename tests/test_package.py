@@ -0,0 +1,94 @@
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+from zero_cache_chart.package import HelmIgnore, build_chart_archive, chart_files
+
+
+def write_chart(root: Path, files: dict[str, str]) -> Path:
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root
+
+
+CHART = {
+    "Chart.yaml": "apiVersion: v2\nname: zero-cache\nversion: 1.2.3\nappVersion: 0.26.0\n",
+    "values.yaml": "replicas: 1\n",
+    "templates/deployment.yaml": "kind: Deployment\n",
+    "templates/.hidden": "x",
+    "src/tool.py": "print()\n",
+    "notes.swp": "",
+}
+
+
+class TestHelmIgnore:
+    def test_basename_pattern_matches_anywhere(self):
+        ignore = HelmIgnore.parse("*.swp\n")
+        assert ignore.ignored("notes.swp", False)
+        assert ignore.ignored("templates/notes.swp", False)
+        assert not ignore.ignored("notes.yaml", False)
+
+    def test_directory_only_pattern(self):
+        ignore = HelmIgnore.parse("build/\n")
+        assert ignore.ignored("build", True)
+        assert not ignore.ignored("build", False)
+
+    def test_structural_star_stops_at_slash(self):
+        ignore = HelmIgnore.parse("templates/*.txt\n")
+        assert ignore.ignored("templates/NOTES.txt", False)
+        assert not ignore.ignored("templates/sub/NOTES.txt", False)
+
+    def test_comments_and_blank_lines(self):
+        ignore = HelmIgnore.parse("# comment\n\n*.log\n")
+        assert ignore.ignored("debug.log", False)
+        assert not ignore.ignored("# comment", False)
+
+    def test_hidden_templates_ignored_by_default(self):
+        ignore = HelmIgnore.parse("")
+        assert ignore.ignored("templates/.hidden", False)
+        assert not ignore.ignored(".hidden", False)
+
+    def test_double_star_rejected(self):
+        with pytest.raises(ValueError, match="double-star"):
+            HelmIgnore.parse("**/*.py\n")
+
+
+def test_chart_files_honors_helmignore(tmp_path: Path):
+    write_chart(tmp_path, {**CHART, ".helmignore": "src/\n*.swp\n.helmignore\n"})
+    assert chart_files(tmp_path) == ["Chart.yaml", "templates/deployment.yaml", "values.yaml"]
+
+
+def test_build_chart_archive_is_deterministic(tmp_path: Path):
+    write_chart(tmp_path, {**CHART, ".helmignore": "src/\n*.swp\n.helmignore\n"})
+    first = build_chart_archive(tmp_path)
+    (tmp_path / "values.yaml").touch()
+    second = build_chart_archive(tmp_path)
+
+    assert first.data == second.data
+    assert first.digest == second.digest
+    assert first.filename == "zero-cache-1.2.3.tgz"
+
+    with tarfile.open(fileobj=io.BytesIO(first.data)) as tar:
+        members = tar.getmembers()
+    assert [m.name for m in members] == [
+        "zero-cache/Chart.yaml",
+        "zero-cache/templates/deployment.yaml",
+        "zero-cache/values.yaml",
+    ]
+    assert {m.mtime for m in members} == {0}
+
+
+def test_build_chart_archive_chart_yaml_override(tmp_path: Path):
+    write_chart(tmp_path, CHART)
+    override = CHART["Chart.yaml"].replace("1.2.3", "1.2.4")
+    archive = build_chart_archive(tmp_path, chart_yaml=override)
+
+    assert archive.version == "1.2.4"
+    assert archive.metadata["appVersion"] == "0.26.0"
+    with tarfile.open(fileobj=io.BytesIO(archive.data)) as tar:
+        member = tar.extractfile("zero-cache/Chart.yaml")
+        assert member is not None
+        assert member.read().decode() == override
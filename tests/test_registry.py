@@ -0,0 +1,77 @@
+import base64
+import json
+
+import pytest
+from zero_cache_chart.registry import RegistryClient, RegistryError, _docker_credentials
+
+from tests.conftest import MANIFEST_TYPE
+
+
+def test_manifest_exists_caches_token(registry):
+    registry.manifests[("org/chart/zero-cache", "1.0.0")] = b"{}"
+    client = RegistryClient("registry.test", credentials=("u", "p"))
+
+    assert client.manifest_exists("org/chart/zero-cache", "1.0.0") is True
+    assert client.manifest_exists("org/chart/zero-cache", "2.0.0") is False
+    assert registry.token_requests == 1
+
+
+def test_get_and_put_manifest(registry):
+    registry.manifests[("org/chart/zero-cache", "1.0.0")] = b'{"schemaVersion":2}'
+    client = RegistryClient("registry.test", credentials=("u", "p"))
+
+    manifest, media_type = client.get_manifest("org/chart/zero-cache", "1.0.0")
+    client.put_manifest("org/chart/zero-cache", "latest", manifest, media_type)
+
+    assert registry.manifests[("org/chart/zero-cache", "latest")] == b'{"schemaVersion":2}'
+    assert media_type == MANIFEST_TYPE
+    # One token for pull, one for pull,push
+    assert registry.token_requests == 2
+
+
+def test_get_missing_manifest_raises(registry):
+    client = RegistryClient("registry.test", credentials=("u", "p"))
+    with pytest.raises(RegistryError, match="404"):
+        client.get_manifest("org/chart/zero-cache", "9.9.9")
+
+
+def test_docker_credentials_from_config(tmp_path, monkeypatch):
+    auth = base64.b64encode(b"octocat:secret").decode()
+    (tmp_path / "config.json").write_text(json.dumps({"auths": {"ghcr.io": {"auth": auth}}}))
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    assert _docker_credentials("ghcr.io") == ("octocat", "secret")
+
+
+def test_docker_credentials_github_token_fallback(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    monkeypatch.setenv("GITHUB_TOKEN", "ghp_x")
+    assert _docker_credentials("ghcr.io") == ("token", "ghp_x")
+    assert _docker_credentials("registry.test") is None
+
+
+def test_list_tags_follows_pagination(registry):
+    for tag in ("1.0.0", "1.0.1", "1.1.0", "2.0.0", "2.0.1"):
+        registry.manifests[("org/chart/zero-cache", tag)] = b"{}"
+    registry.manifests[("org/chart/zero-cache", "sha256:" + "0" * 64)] = b"{}"
+    client = RegistryClient("registry.test", credentials=("u", "p"))
+
+    assert client.list_tags("org/chart/zero-cache", page_size=2) == ["1.0.0", "1.0.1", "1.1.0", "2.0.0", "2.0.1"]
+    assert registry.tag_list_requests == 3
+
+
+def test_list_tags_of_missing_repository_is_empty(registry):
+    client = RegistryClient("registry.test", credentials=("u", "p"))
+    assert client.list_tags("org/chart/zero-cache") == []
+
+
+def test_tag_set_is_listed_once_and_tracks_pushes(registry):
+    registry.manifests[("org/chart/zero-cache", "1.0.0")] = b"{}"
+    client = RegistryClient("registry.test", credentials=("u", "p"))
+
+    assert client.has_tag("org/chart/zero-cache", "1.0.0")
+    assert not client.has_tag("org/chart/zero-cache", "1.0.1")
+    client.put_manifest("org/chart/zero-cache", "1.0.1", b"{}", MANIFEST_TYPE)
+    client.put_manifest("org/chart/zero-cache", "sha256:" + "1" * 64, b"{}", MANIFEST_TYPE)
+
+    assert client.tag_set("org/chart/zero-cache") == {"1.0.0", "1.0.1"}
+    assert registry.tag_list_requests == 1
@@ -0,0 +1,122 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+import pytest
+from semver.version import Version
+from zero_cache_chart.retention import (
+    KEEP_GIT_TAG,
+    KEEP_LATEST,
+    KEEP_RECENT,
+    RetentionPlan,
+    RetentionPolicy,
+    estimate_storage,
+    git_tag_versions,
+    plan_retention,
+)
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _version(version_id: int, *tags: str, created: str = "2026-01-01T00:00:00Z", name: str | None = None) -> dict:
+    return {
+        "id": version_id,
+        "name": name or f"sha256:{version_id:064x}",
+        "metadata": {"container": {"tags": list(tags)}},
+        "created_at": created,
+    }
+
+
+def _ids(versions: list[dict]) -> list[int]:
+    return [v["id"] for v in versions]
+
+
+def test_policy_rejects_keeping_no_patches():
+    with pytest.raises(ValueError):
+        RetentionPolicy(keep_patches=0)
+
+
+def test_git_tag_versions_skips_non_release_tags():
+    assert git_tag_versions(["v1.2.3", "v1.3.0-rc.1", "latest", "v1.2"]) == {
+        Version.parse("1.2.3"),
+        Version.parse("1.3.0-rc.1"),
+    }
+
+
+def test_plan_keeps_latest_patches_per_line():
+    versions = [_version(i, f"1.0.{i}") for i in range(5)] + [_version(10, "1.1.0"), _version(11, "2.0.0")]
+    plan = plan_retention(versions, RetentionPolicy(keep_patches=2, keep_days=None), now=NOW)
+    assert sorted(_ids(plan.keep)) == [3, 4, 10, 11]
+    assert sorted(_ids(plan.delete)) == [0, 1, 2]
+    assert set(plan.reasons.values()) == {KEEP_LATEST}
+
+
+def test_plan_keeps_git_tagged_and_recent_versions():
+    versions = [
+        _version(0, "1.0.0"),
+        _version(1, "1.0.1"),
+        _version(2, "1.0.2", created="2026-05-20T00:00:00Z"),
+        _version(3, "1.0.3"),
+    ]
+    policy = RetentionPolicy(keep_patches=1, keep_days=30, pinned=frozenset({Version.parse("1.0.0")}))
+    plan = plan_retention(versions, policy, now=NOW)
+    assert _ids(plan.delete) == [1]
+    assert plan.reasons == {0: KEEP_GIT_TAG, 2: KEEP_RECENT, 3: KEEP_LATEST}
+    assert plan.kept_by() == {KEEP_GIT_TAG: 1, KEEP_LATEST: 1, KEEP_RECENT: 1}
+
+
+def test_plan_ignores_untagged_and_non_semver_versions():
+    versions = [_version(0), _version(1, "latest"), _version(2, "1.0.0"), _version(3, "1.0.1")]
+    plan = plan_retention(versions, RetentionPolicy(keep_patches=1, keep_days=None), now=NOW)
+    assert _ids(plan.other) == [0, 1]
+    assert _ids(plan.delete) == [2]
+    assert (plan.listed_before, plan.listed_after) == (4, 3)
+
+
+def test_plan_keeps_version_if_any_tag_is_kept():
+    versions = [_version(0, "1.0.0", "1.0.5"), _version(1, "1.0.1")]
+    plan = plan_retention(versions, RetentionPolicy(keep_patches=1, keep_days=None), now=NOW)
+    assert _ids(plan.keep) == [0]
+    assert _ids(plan.delete) == [1]
+
+
+def test_prereleases_do_not_count_as_patches():
+    versions = [_version(0, "1.0.0"), _version(1, "1.0.1-rc.1")]
+    plan = plan_retention(versions, RetentionPolicy(keep_patches=1, keep_days=None), now=NOW)
+    assert _ids(plan.keep) == [0]
+    assert _ids(plan.delete) == [1]
+
+
+def test_pages():
+    assert [RetentionPlan.pages(n) for n in (0, 1, 100, 101, 250)] == [1, 1, 1, 2, 3]
+
+
+def _publish(registry, repo: str, version: str, layer: bytes) -> str:
+    config = json.dumps({"version": version}).encode()
+    manifest = json.dumps({
+        "config": {"digest": f"sha256:{hashlib.sha256(config).hexdigest()}", "size": len(config)},
+        "layers": [{"digest": f"sha256:{hashlib.sha256(layer).hexdigest()}", "size": len(layer)}],
+    }).encode()
+    digest = f"sha256:{hashlib.sha256(manifest).hexdigest()}"
+    registry.manifests[(repo, digest)] = manifest
+    return digest
+
+
+def test_estimate_storage_skips_blobs_shared_with_kept_versions(registry):
+    repo = "org/repo/zero-cache"
+    shared = b"x" * 1000
+    kept = _version(0, "1.0.1", name=_publish(registry, repo, "1.0.1", shared))
+    same_layer = _version(1, "1.0.0", name=_publish(registry, repo, "1.0.0", shared))
+    own_layer = _version(2, "0.9.0", name=_publish(registry, repo, "0.9.0", b"y" * 500))
+    missing = _version(3, "0.8.0")
+    plan = RetentionPlan(keep=[kept], delete=[same_layer, own_layer, missing])
+
+    estimate = estimate_storage(registry.host, repo, plan, concurrency=2)
+
+    blobs = {k: len(v) for k, v in registry.manifests.items()}
+    own_manifest = blobs[(repo, own_layer["name"])]
+    same_manifest = blobs[(repo, same_layer["name"])]
+    config = len(json.dumps({"version": "1.0.0"}))
+    assert estimate.unknown == 1
+    assert estimate.reclaimed == same_manifest + config + own_manifest + config + 500
+    assert estimate.before == sum(blobs.values()) + 3 * config + 1000 + 500
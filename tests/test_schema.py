@@ -0,0 +1,148 @@
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from zero_cache_chart.cli import main
+from zero_cache_chart.schema import SCHEMA_FILE, compile_schema, dump_schema, generate_schema, validate_values_file
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _chart(tmp_path: Path) -> Path:
+    (tmp_path / "values.yaml").write_text(
+        "# Number of replicas\n"
+        "replicas: 2\n"
+        "\n"
+        "database:\n"
+        "  # Connection string\n"
+        "  url: {}\n"
+        "  maxConns: 20\n"
+        "resources:\n"
+        "  limits:\n"
+        "    cpu: 1\n"
+        "pdb:\n"
+        "  minAvailable: 1\n"
+        "storageClass: null\n"
+        "tolerations: []\n"
+    )
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "deploy.yaml").write_text(
+        "replicas: {{ .Values.replicas }}\n"
+        "url: {{ .Values.database.url.value }}\n"
+        "ssl: {{ .Values.database.sslMode }}\n"
+        "{{- with .Values.pdb.maxUnavailable }}{{ . }}{{ end }}\n"
+        "resources:\n"
+        "  {{- toYaml .Values.resources | nindent 2 }}\n"
+    )
+    return tmp_path
+
+
+def test_committed_schema_is_up_to_date():
+    """values.schema.json must be regenerated whenever values.yaml or the templates change."""
+    assert (REPO_ROOT / SCHEMA_FILE).read_text() == dump_schema(generate_schema(REPO_ROOT))
+
+
+@pytest.mark.parametrize("path", ["values.yaml", *sorted(p.name for p in (REPO_ROOT / "examples").glob("*.yaml"))])
+def test_shipped_values_are_valid(path: str):
+    validate = compile_schema(json.loads((REPO_ROOT / SCHEMA_FILE).read_text()))
+    file = REPO_ROOT / path if path == "values.yaml" else REPO_ROOT / "examples" / path
+    assert validate_values_file(validate, file) == []
+
+
+def test_generate_schema(tmp_path: Path):
+    schema = generate_schema(_chart(tmp_path))
+    props = schema["properties"]
+    assert schema["additionalProperties"] is False
+    assert props["replicas"] == {"description": "Number of replicas", "type": "integer"}
+    assert props["database"]["properties"]["url"] == {
+        "description": "Connection string",
+        "type": "object",
+        "properties": {"value": {}},
+        "additionalProperties": False,
+    }
+    assert props["database"]["properties"]["sslMode"] == {}
+    assert props["resources"] == {"type": "object"}
+    assert props["pdb"]["properties"]["minAvailable"] == {"type": ["integer", "string"]}
+    assert props["pdb"]["properties"]["maxUnavailable"] == {}
+    assert props["storageClass"] == {}
+    assert props["tolerations"] == {"type": "array"}
+    assert props["global"] == {"type": "object"}
+
+
+def test_validator_reports_unknown_keys_and_types(tmp_path: Path):
+    validate = compile_schema(generate_schema(_chart(tmp_path)))
+    assert validate({"replicas": 3, "resources": {"limits": {"cpu": "500m"}}, "pdb": {"minAvailable": "50%"}}) == []
+    assert validate(None) == []
+    assert validate({"storageClass": None, "replicas": None}) == []
+    assert validate({"replicaz": 3, "database": {"maxConns": "many"}, "tolerations": {}}) == [
+        "replicaz: unknown key (did you mean 'replicas'?)",
+        "database.maxConns: expected integer, got str",
+        "tolerations: expected array, got dict",
+    ]
+    assert validate({"replicas": True}) == ["replicas: expected integer, got bool"]
+
+
+def test_validator_rejects_misspelled_subkey_of_empty_default(tmp_path: Path):
+    validate = compile_schema(generate_schema(_chart(tmp_path)))
+    assert validate({"database": {"url": {"value": "postgres://db"}}}) == []
+    assert validate({"database": {"url": {"vaule": "postgres://db"}}}) == [
+        "database.url.vaule: unknown key (did you mean 'value'?)",
+    ]
+
+
+def test_shipped_schema_closes_secret_values():
+    validate = compile_schema(json.loads((REPO_ROOT / SCHEMA_FILE).read_text()))
+    assert validate({"common": {"database": {"upstream": {"url": {"vaule": "x"}}}}}) == [
+        "common.database.upstream.url.vaule: unknown key (did you mean 'value'?)",
+    ]
+    assert validate({"common": {"auth": {"secret": {"valueFrom": {"secretKeyRef": {"name": "jwt"}}}}}}) == []
+
+
+def test_validator_supports_items_required_and_enum():
+    validate = compile_schema({
+        "type": "object",
+        "required": ["mode"],
+        "properties": {
+            "mode": {"enum": ["a", "b"]},
+            "hosts": {"type": "array", "items": {"type": "string"}},
+        },
+    })
+    assert validate({"mode": "a", "hosts": ["x"]}) == []
+    assert sorted(validate({"hosts": ["x", 1]})) == ["hosts[1]: expected string, got int", "mode: required"]
+    assert validate({"mode": "c"}) == ["mode: 'c' is not one of ['a', 'b']"]
+
+
+def test_validator_rejects_unsupported_keywords():
+    with pytest.raises(ValueError, match="oneOf"):
+        compile_schema({"oneOf": [{"type": "string"}]})
+
+
+def test_validate_values_file_reports_bad_yaml(tmp_path: Path):
+    path = tmp_path / "bad.yaml"
+    path.write_text("a: [\n")
+    errors = validate_values_file(compile_schema({"type": "object"}), path)
+    assert len(errors) == 1 and "invalid YAML" in errors[0]
+
+
+def test_generate_schema_command_check(tmp_path: Path):
+    chart = _chart(tmp_path)
+    runner = CliRunner()
+    assert runner.invoke(main, ["generate-schema", f"--chart-dir={chart}", "--check"]).exit_code == 1
+    assert runner.invoke(main, ["generate-schema", f"--chart-dir={chart}"]).exit_code == 0
+    result = runner.invoke(main, ["generate-schema", f"--chart-dir={chart}", "--check"])
+    assert result.exit_code == 0, result.output
+
+
+def test_validate_values_command(tmp_path: Path):
+    chart = _chart(tmp_path)
+    good = tmp_path / "good.yaml"
+    good.write_text("replicas: 1\n")
+    bad = tmp_path / "bad.yaml"
+    bad.write_text("replicas: 1\ndatabse: {}\n")
+
+    result = CliRunner().invoke(main, ["validate-values", f"--chart-dir={chart}", str(good), str(bad)])
+    assert result.exit_code == 1
+    assert "databse: unknown key (did you mean 'database'?)" in result.output
+    assert "1/2 values file(s) valid" in result.output
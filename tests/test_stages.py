@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from zero_cache_chart import timing
+from zero_cache_chart.stages import Stage, run_stages
+
+
+def test_passes_dependency_results_as_keywords():
+    results = run_stages([
+        Stage("total", lambda a, b: a + b, needs=("a", "b")),
+        Stage("a", lambda: 1),
+        Stage("b", lambda a: a + 1, needs=("a",)),
+    ])
+    assert results == {"a": 1, "b": 2, "total": 3}
+
+
+def test_independent_stages_overlap():
+    barrier = threading.Barrier(2, timeout=5)
+    results = run_stages([
+        Stage("left", lambda: barrier.wait() is not None),
+        Stage("right", lambda: barrier.wait() is not None),
+    ])
+    assert results == {"left": True, "right": True}
+
+
+def test_failure_cancels_dependents():
+    ran: list[str] = []
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_stages([
+            Stage("fail", boom),
+            Stage("after", lambda fail: ran.append("after"), needs=("fail",)),
+        ])
+    assert ran == []
+
+
+def test_rejects_unknown_dependency():
+    with pytest.raises(ValueError, match="unknown stage"):
+        run_stages([Stage("a", lambda missing: None, needs=("missing",))])
+
+
+def test_rejects_cycle():
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages([
+            Stage("a", lambda b: None, needs=("b",)),
+            Stage("b", lambda a: None, needs=("a",)),
+        ])
+
+
+def test_rejects_duplicate_names():
+    with pytest.raises(ValueError, match="Duplicate"):
+        run_stages([Stage("a", lambda: 1), Stage("a", lambda: 2)])
+
+
+def test_records_a_span_per_stage():
+    recorder = timing.reset(keep_spans=True)
+    run_stages([Stage("a", lambda: 1), Stage("b", lambda a: a, needs=("a",))])
+    assert sorted(s.attrs["stage"] for s in recorder.spans if s.name == "stage") == ["a", "b"]
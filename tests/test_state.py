@@ -0,0 +1,65 @@
+import dataclasses
+from pathlib import Path
+
+from zero_cache_chart.state import RunFingerprint, load_fingerprint, save_fingerprint
+
+TAG = {"name": "0.26.0", "digest": "sha256:abc", "last_updated": "2026-02-01T00:00:00Z"}
+
+
+def write_chart(tmp_path: Path) -> Path:
+    chart = tmp_path / "Chart.yaml"
+    chart.write_text("apiVersion: v2\nappVersion: 0.26.0\nversion: 2.1.3\nname: zero-cache\n")
+    (tmp_path / "chart.nix").write_text('{\n  version = "2.1.3";\n  chartHash = "sha256-x";\n}\n')
+    return chart
+
+
+def test_capture(tmp_path: Path):
+    fp = RunFingerprint.capture(write_chart(tmp_path), TAG)
+    assert fp.chart_nix_version == "2.1.3"
+    assert fp.upstream_tag == "0.26.0"
+    assert fp.upstream_digest == "sha256:abc"
+
+
+def test_fingerprint_changes_with_chart_and_upstream(tmp_path: Path):
+    chart = write_chart(tmp_path)
+    before = RunFingerprint.capture(chart, TAG)
+    assert RunFingerprint.capture(chart, dict(TAG)) == before
+    assert RunFingerprint.capture(chart, {**TAG, "last_updated": "2026-02-02T00:00:00Z"}) != before
+    chart.write_text(chart.read_text().replace("2.1.3", "2.1.4"))
+    assert RunFingerprint.capture(chart, TAG) != before
+
+
+def test_unchanged_since_checks_the_published_manifest(tmp_path: Path):
+    chart = write_chart(tmp_path)
+    fp = RunFingerprint.capture(chart, TAG)
+    saved = dataclasses.replace(fp, oci_manifest_digest="sha256:m1")
+    heads: list[str] = []
+
+    def head(digest: str | None):
+        def manifest_digest() -> str | None:
+            heads.append("HEAD")
+            return digest
+        return manifest_digest
+
+    assert fp.unchanged_since(saved, head("sha256:m1"))
+    assert not fp.unchanged_since(saved, head(None))
+    assert not fp.unchanged_since(saved, head("sha256:other"))
+    assert len(heads) == 3
+    # the registry is not asked when the local or upstream state already differs
+    assert not fp.unchanged_since(dataclasses.replace(saved, upstream_tag="0.25.0"), head("sha256:m1"))
+    assert not fp.unchanged_since(fp, head(None))
+    assert not fp.unchanged_since(None, head(None))
+    assert len(heads) == 3
+
+
+def test_round_trip(tmp_path: Path):
+    fp = RunFingerprint.capture(write_chart(tmp_path), None)
+    path = tmp_path / "state" / "run.json"
+    save_fingerprint(path, fp)
+    assert load_fingerprint(path) == fp
+
+
+def test_load_missing_or_stale_schema(tmp_path: Path):
+    assert load_fingerprint(tmp_path / "missing.json") is None
+    (tmp_path / "old.json").write_text('{"unexpected": 1}')
+    assert load_fingerprint(tmp_path / "old.json") is None
@@ -0,0 +1,39 @@
+import pytest
+from zero_cache_chart import timing
+
+
+def test_span_records_duration_bytes_and_errors():
+    recorder = timing.reset(keep_spans=True)
+    with timing.span("docker.tags_page", url="https://example") as s:
+        s.bytes = 10
+        s.retries = 2
+    with pytest.raises(ValueError):
+        with timing.span("docker.tags_page"):
+            raise ValueError("boom")
+
+    summary = recorder.summary()["docker.tags_page"]
+    assert summary["count"] == 2
+    assert summary["bytes"] == 10
+    assert summary["retries"] == 2
+    assert summary["errors"] == 1
+    assert recorder.spans[0].attrs == {"url": "https://example"}
+    assert recorder.spans[0].duration >= 0
+
+
+def test_openmetrics_format():
+    recorder = timing.reset()
+    with timing.span("git", subcommand="push") as s:
+        s.bytes = 3
+    text = recorder.to_openmetrics()
+    assert "# TYPE zero_cache_chart_span_bytes counter" in text
+    assert 'zero_cache_chart_span_bytes_total{span="git"} 3' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_spans_are_only_totalled_unless_kept():
+    recorder = timing.reset()
+    for _ in range(3):
+        with timing.span("github.delete_version"):
+            pass
+    assert recorder.spans == []
+    assert recorder.summary()["github.delete_version"]["count"] == 3
@@ -0,0 +1,145 @@
+import pytest
+import requests
+import responses
+from zero_cache_chart import timing, transport as transport_module
+from zero_cache_chart.transport import CircuitOpenError, Transport, _retry_after
+
+URL = "https://api.test/items"
+
+
+@pytest.fixture
+def sleeps(monkeypatch) -> list[float]:
+    delays: list[float] = []
+    monkeypatch.setattr(transport_module, "_sleep", delays.append)
+    return delays
+
+
+@responses.activate
+def test_retries_transient_status_and_counts_span_retries(sleeps):
+    responses.add(responses.GET, URL, status=503)
+    responses.add(responses.GET, URL, json={"ok": True})
+
+    with timing.span("call") as s:
+        resp = Transport(backoff=1.0).get(URL)
+
+    assert resp.json() == {"ok": True}
+    assert len(responses.calls) == 2
+    assert s.retries == 1
+    assert 0 <= sleeps[0] <= 1.0
+
+
+@responses.activate
+def test_honors_retry_after(sleeps):
+    responses.add(responses.GET, URL, status=429, headers={"Retry-After": "7"})
+    responses.add(responses.GET, URL, json={})
+
+    assert Transport().get(URL).status_code == 200
+    assert sleeps == [7.0]
+
+
+@responses.activate
+def test_gives_up_when_retry_after_is_too_long(sleeps):
+    responses.add(responses.GET, URL, status=429, headers={"Retry-After": "3600"})
+
+    assert Transport(max_retry_after=60).get(URL).status_code == 429
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_returns_last_response_after_exhausting_retries(sleeps):
+    responses.add(responses.DELETE, URL, status=502)
+
+    assert Transport(retries=2).delete(URL).status_code == 502
+    assert len(responses.calls) == 3
+    assert len(sleeps) == 2
+
+
+@responses.activate
+def test_does_not_retry_non_idempotent_or_client_errors(sleeps):
+    responses.add(responses.POST, URL, status=503)
+    responses.add(responses.GET, URL, status=404)
+
+    t = Transport()
+    assert t.request("POST", URL).status_code == 503
+    assert t.get(URL).status_code == 404
+    assert len(responses.calls) == 2
+    assert sleeps == []
+
+
+@responses.activate
+def test_retries_connection_errors_then_raises(sleeps):
+    responses.add(responses.GET, URL, body=requests.ConnectionError("reset"))
+
+    with pytest.raises(requests.ConnectionError):
+        Transport(retries=1).get(URL)
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_circuit_opens_after_consecutive_failures(sleeps):
+    responses.add(responses.GET, URL, status=500)
+    t = Transport(retries=0, failure_threshold=2, reset_after=60)
+
+    t.get(URL)
+    t.get(URL)
+    with pytest.raises(CircuitOpenError):
+        t.get(URL)
+    assert len(responses.calls) == 2
+    # other hosts are unaffected
+    responses.add(responses.GET, "https://other.test/", json={})
+    assert t.get("https://other.test/").status_code == 200
+
+
+@responses.activate
+def test_circuit_probe_closes_or_reopens(sleeps):
+    responses.add(responses.GET, URL, status=500)
+    responses.add(responses.GET, URL, status=500)
+    responses.add(responses.GET, URL, json={})
+    t = Transport(retries=0, failure_threshold=1, reset_after=0)
+
+    t.get(URL)  # opens the circuit
+    t.get(URL)  # probe fails, circuit reopens
+    assert t.get(URL).status_code == 200  # probe succeeds, circuit closes
+    assert t.get(URL).status_code == 200
+    assert len(responses.calls) == 4
+
+
+@responses.activate
+def test_probe_raising_other_errors_reopens_the_circuit(sleeps):
+    responses.add(responses.GET, URL, status=500)
+    responses.add(responses.GET, URL, body=requests.exceptions.ChunkedEncodingError("truncated"))
+    responses.add(responses.GET, URL, json={})
+    t = Transport(retries=0, failure_threshold=1, reset_after=0)
+
+    t.get(URL)  # opens the circuit
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        t.get(URL)  # probe fails with a non-connection error
+    assert t.get(URL).status_code == 200  # a new probe is admitted and closes the circuit
+    assert len(responses.calls) == 3
+
+
+def test_sessions_are_shared_per_origin():
+    t = Transport()
+    assert t.session("https://a.test/x") is t.session("https://a.test/y")
+    assert t.session("https://a.test/x") is not t.session("https://b.test/x")
+
+
+def test_reserve_grows_existing_and_future_pools():
+    t = Transport(pool_size=2)
+    url = "https://a.test/x"
+    t.reserve(1)
+    assert t.session(url).get_adapter(url)._pool_maxsize == 2
+
+    t.reserve(32)
+    assert t.session(url).get_adapter(url)._pool_maxsize == 32
+    assert t.session("https://b.test/x").get_adapter("https://b.test/x")._pool_maxsize == 32
+
+
+def test_retry_after_parses_seconds_and_dates():
+    resp = requests.Response()
+    resp.headers["Retry-After"] = "12"
+    assert _retry_after(resp) == 12.0
+    resp.headers["Retry-After"] = "Wed, 01 Jan 2020 00:00:00 GMT"
+    assert _retry_after(resp) == 0.0
+    resp.headers["Retry-After"] = "soon"
+    assert _retry_after(resp) is None
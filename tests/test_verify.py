@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from zero_cache_chart.cli import main
+from zero_cache_chart.types import CommandResult
+from zero_cache_chart.verify import CaseResult, RenderCase, build_matrix, matrix_app_versions, verify_chart
+
+
+def _chart(tmp_path: Path) -> Path:
+    (tmp_path / "Chart.yaml").write_text("apiVersion: v2\nname: zero-cache\nversion: 2.1.3\nappVersion: 0.26.0\n")
+    (tmp_path / "values.yaml").write_text("image:\n  tag: ''\n")
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "_helpers.tpl").write_text(
+        '{{- if semverCompare ">=0.24.0" $zv }}A{{- end }}\n{{- if semverCompare "<1.0.0" $zv }}B{{- end }}\n'
+    )
+    (tmp_path / "examples").mkdir()
+    (tmp_path / "examples" / "single-node.yaml").write_text("singleNode:\n  enabled: true\n")
+    return tmp_path
+
+
+@pytest.fixture
+def tools(mocker):
+    """Fake helm and kubeconform: every render succeeds unless the case's appVersion is 0.23.0."""
+    mocker.patch("zero_cache_chart.verify.shutil.which", return_value="/usr/bin/true")
+
+    def fake_run(cmd, *, check=True, input=None):
+        if cmd[:2] == ["helm", "template"]:
+            if "image.tag=0.23.0" in cmd:
+                return CommandResult(stdout="", stderr="render error", returncode=1)
+            return CommandResult(stdout="kind: Service\n", stderr="", returncode=0)
+        if cmd[0] == "kubeconform" and input is not None:
+            return CommandResult(stdout="Summary: 1 resource found", stderr="", returncode=0)
+        return CommandResult(stdout=f"{cmd[0]} v1", stderr="", returncode=0)
+
+    return mocker.patch("zero_cache_chart.verify.run", side_effect=fake_run)
+
+
+def test_matrix_app_versions_straddles_boundaries(tmp_path: Path):
+    assert matrix_app_versions(_chart(tmp_path)) == ["0.0.0", "0.23.0", "0.24.0", "0.26.0", "1.0.0"]
+
+
+def test_build_matrix(tmp_path: Path):
+    cases = build_matrix(_chart(tmp_path), ["0.23.0", "0.24.0"])
+    assert len(cases) == 2 * 2 * 2
+    assert RenderCase("examples/single-node.yaml", "0.24.0", True) in cases
+    assert RenderCase(None, "0.23.0", False) in cases
+
+
+def test_verify_chart_renders_and_validates(tmp_path: Path, tools):
+    chart = _chart(tmp_path)
+    results = verify_chart(chart, build_matrix(chart, ["0.23.0", "0.24.0"]), jobs=1)
+    assert [r.ok for r in results] == [False, False, True, True] * 2
+    helm = [c.args[0] for c in tools.call_args_list if c.args[0][:2] == ["helm", "template"]]
+    assert len(helm) == 8
+    assert any("--values" in cmd and str(chart / "examples/single-node.yaml") in cmd for cmd in helm)
+    assert any("singleNode.enabled=true" in cmd for cmd in helm)
+
+
+def test_verify_chart_caches_passing_cases(tmp_path: Path, tools):
+    chart = _chart(tmp_path)
+    cases = build_matrix(chart, ["0.23.0", "0.24.0"])
+    verify_chart(chart, cases, jobs=1)
+    tools.reset_mock()
+
+    results = verify_chart(chart, cases, jobs=1)
+    assert [r.cached for r in results] == [False, False, True, True] * 2
+    helm = [c.args[0] for c in tools.call_args_list if c.args[0][:2] == ["helm", "template"]]
+    assert len(helm) == 4  # only the failing cases are rendered again
+
+    (chart / "values.yaml").write_text("image:\n  tag: latest\n")
+    tools.reset_mock()
+    results = verify_chart(chart, cases, jobs=1)
+    assert not any(r.cached for r in results)
+
+
+def test_verify_chart_requires_tools(tmp_path: Path, mocker):
+    mocker.patch("zero_cache_chart.verify.shutil.which", return_value=None)
+    with pytest.raises(RuntimeError, match="helm not found"):
+        verify_chart(_chart(tmp_path), [], jobs=1)
+
+
+def test_verify_command_reports_failures(tmp_path: Path, mocker):
+    chart = _chart(tmp_path)
+    cases = build_matrix(chart, ["0.24.0"])
+    verify = mocker.patch("zero_cache_chart.verify.verify_chart")
+    verify.return_value = [CaseResult(case, ok=case.single_node, output="bad") for case in cases]
+
+    result = CliRunner().invoke(main, ["verify", f"--chart-dir={chart}", "--app-version=0.24.0", "--jobs=2"])
+    assert result.exit_code == 1
+    assert "2/4 passed" in result.output
+    assert "2 render case(s) failed" in result.output
+    verify.assert_called_once_with(chart, cases, jobs=2, use_cache=True)
@@ -4,6 +4,11 @@ from zero_cache_chart.versions import (
     get_latest_stable,
     is_stable,
     classify_version_tag,
+    iter_versions,
+    summarize_versions,
+    key_version,
+    version_key,
+    VersionIndex,
 )
 
 
@@ -46,6 +51,127 @@ class TestGetLatestStable:
         assert get_latest_stable([]) is None
 
 
+class TestIterVersions:
+    def test_skips_non_semver_tags(self):
+        tags = ["latest", "0.26", "0.26.0", "sha-1a2b3c", "v0.26.0", "0.26.1-canary.4", "01.2.3", "0.27.0+build.5"]
+        assert list(iter_versions(tags)) == [v("0.26.0"), v("0.26.1-canary.4"), v("0.27.0+build.5")]
+
+    def test_rejects_tags_that_pass_the_prefilter(self):
+        assert list(iter_versions(["1.2.3-", "1.2.3-01", "1.2.3-a..b"])) == []
+
+    def test_is_lazy(self):
+        tags = iter(["0.25.0", "0.26.0"])
+        versions = iter_versions(tags)
+        assert next(versions) == v("0.25.0")
+        assert next(tags) == "0.26.0"
+
+
+class TestVersionSummary:
+    def test_matches_list_based_helpers(self):
+        versions = [v("0.26.1"), v("0.25.0"), v("0.27.0-canary.1"), v("0.25.2"), v("0.26.0"), v("0.25.1")]
+        summary = summarize_versions(versions)
+        assert summary.count == 6
+        assert summary.latest_stable == get_latest_stable(sorted(versions))
+        assert summary.missing_since(None) == VersionIndex(versions).latest_per_line()
+
+    def test_missing_since_is_latest_of_each_newer_line(self):
+        versions = [v("0.25.0"), v("0.25.1"), v("0.25.2"), v("0.26.0"), v("0.26.1"), v("0.27.0-canary.1")]
+        assert summarize_versions(versions).missing_since(v("0.25.0")) == [v("0.25.2"), v("0.26.1")]
+
+    def test_missing_since_nothing_newer(self):
+        summary = summarize_versions([v("0.25.0"), v("0.26.0-canary.1")])
+        assert summary.missing_since(v("0.25.0")) == []
+
+    def test_only_prereleases(self):
+        summary = summarize_versions([v("0.26.0-canary.1"), v("0.26.0-canary.4")])
+        assert summary.count == 2
+        assert summary.latest_stable is None
+        assert summary.stable_by_minor == {}
+
+
+class TestVersionKey:
+    def test_orders_like_semver(self):
+        ordered = [
+            "0.9.0", "1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-alpha.beta", "1.0.0-beta",
+            "1.0.0-beta.2", "1.0.0-beta.11", "1.0.0-rc.1", "1.0.0", "1.0.1", "1.10.0",
+        ]
+        shuffled = sorted(ordered, key=lambda s: s[::-1])
+        assert sorted(shuffled, key=lambda s: version_key(v(s))) == ordered
+
+    def test_ignores_build_metadata(self):
+        assert version_key(v("1.0.0+build.1")) == version_key(v("1.0.0"))
+
+    def test_round_trips_through_key_version(self):
+        assert version_key(v("1.0.0")) == (1, 0, 0, 1, ())
+        assert version_key(v("1.0.0-rc.1")) == (1, 0, 0, 0, ((1, "rc"), (0, 1)))
+        for s in ("0.26.0", "0.26.1-canary.4", "1.0.0-alpha.beta.0"):
+            assert str(key_version(version_key(v(s)))) == s
+        assert str(key_version(version_key(v("0.27.0+build.5")))) == "0.27.0"
+
+
+class TestVersionIndex:
+    versions = [
+        v("0.25.0"), v("0.25.1"), v("0.25.2-canary.1"), v("0.26.0-canary.3"), v("0.26.0"),
+        v("0.26.1"), v("0.27.0-canary.1"), v("1.0.0"), v("1.2.0"),
+    ]
+
+    def index(self) -> VersionIndex:
+        return VersionIndex(reversed(self.versions))
+
+    def test_sorted_and_deduplicated(self):
+        index = VersionIndex([*self.versions, v("0.26.0")])
+        assert list(index) == self.versions
+        assert len(index) == len(self.versions)
+        assert v("0.26.1") in index
+        assert v("0.26.2") not in index
+
+    def test_latest_stable(self):
+        assert self.index().latest_stable() == v("1.2.0")
+        assert VersionIndex([v("0.1.0-canary.1")]).latest_stable() is None
+
+    def test_latest_in_line(self):
+        index = self.index()
+        assert index.latest_in_line(0, 25) == v("0.25.1")
+        assert index.latest_in_line(0, 25, stable=False) == v("0.25.2-canary.1")
+        assert index.latest_in_line(0, 27) is None
+        assert index.latest_in_line(0, 27, stable=False) == v("0.27.0-canary.1")
+        assert index.latest_in_line(0, 30) is None
+
+    def test_range(self):
+        index = self.index()
+        assert index.range(v("0.26.0"), v("1.0.0")) == [v("0.26.0"), v("0.26.1"), v("0.27.0-canary.1")]
+        assert index.range(v("0.26.0"), v("1.0.0"), stable=True) == [v("0.26.0"), v("0.26.1")]
+        assert index.range(upper=v("0.25.1")) == [v("0.25.0")]
+        assert index.range(lower=v("1.1.0")) == [v("1.2.0")]
+
+    def test_next_breaking(self):
+        index = self.index()
+        assert index.next_breaking(v("0.25.1")) == v("0.26.0")
+        assert index.next_breaking(v("0.26.0")) == v("1.0.0")
+        assert index.next_breaking(v("1.0.0")) is None
+
+    def test_latest_per_line(self):
+        assert self.index().latest_per_line() == [v("0.25.1"), v("0.26.1"), v("1.0.0"), v("1.2.0")]
+        assert self.index().latest_per_line(stable=False)[:3] == [
+            v("0.25.2-canary.1"), v("0.26.1"), v("0.27.0-canary.1"),
+        ]
+
+    def test_insert_keeps_order(self):
+        index = VersionIndex()
+        for version in reversed(self.versions):
+            assert index.insert(version) is True
+        assert index.insert(v("0.26.0")) is False
+        assert list(index) == self.versions
+        assert index.latest_in_line(0, 26) == v("0.26.1")
+
+    def test_agrees_with_list_helpers(self):
+        index = self.index()
+        assert index.latest_stable() == get_latest_stable(self.versions)
+        assert index.latest_per_line() == sorted(
+            build_version_map([x for x in self.versions if is_stable(x)]).values()
+        )
+
+
 class TestClassifyVersionTag:
     def test_stable(self):
         name, kind = classify_version_tag(v("0.26.0"))